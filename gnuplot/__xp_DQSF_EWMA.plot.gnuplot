@@ -1,6 +1,6 @@
 # Actual plotting
-plot DATA using 0:13 w lines lt ST_UNUSED    title 'cells unused', \
-     DATA using 0:11 w lines lt ST_ALLOCATED title 'cells allocated', \
+plot DATA using 1:13 w lines lt ST_UNUSED    title 'cells unused', \
+     DATA using 1:11 w lines lt ST_ALLOCATED title 'cells allocated', \
      TARGET title 'cells target' w lines lt ST_TARGET, \
-     DATA using 0:14 w lines lt ST_DQ        title 'EWMA(ΔQ)', \
-     DATA using 0:15 w lines lt ST_U         title 'EWMA(U)'
+     DATA using 1:14 w lines lt ST_DQ        title 'EWMA(ΔQ)', \
+     DATA using 1:15 w lines lt ST_U         title 'EWMA(U)'
@@ -1,7 +1,7 @@
 # Actual plotting
-plot DATA using 0:13 w lines lt ST_UNUSED    title 'cells unused', \
-     DATA using 0:11 w lines lt ST_ALLOCATED title 'cells allocated', \
-     DATA using 0:14 w lines lt ST_DQ        title 'EWMA(ΔQ)', \
-     DATA using 0:15 w lines lt ST_U         title 'EWMA(U)', \
-     DATA using 0:16 w lines lt ST_EWMM_U    title 'WMM(U)',  \
-     DATA using 0:17 w lines lt ST_TXQLEFT   title 'WMM(TxQ)'
+plot DATA using 1:13 w lines lt ST_UNUSED    title 'cells unused', \
+     DATA using 1:11 w lines lt ST_ALLOCATED title 'cells allocated', \
+     DATA using 1:14 w lines lt ST_DQ        title 'EWMA(ΔQ)', \
+     DATA using 1:15 w lines lt ST_U         title 'EWMA(U)', \
+     DATA using 1:16 w lines lt ST_EWMM_U    title 'WMM(U)',  \
+     DATA using 1:17 w lines lt ST_TXQLEFT   title 'WMM(TxQ)'
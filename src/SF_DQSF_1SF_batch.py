@@ -0,0 +1,59 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import simbatch
+import numpy as np
+
+# Same scheduling function over a batch of parameter sets (see simbatch).
+class BatchSchedulingFunction(simbatch.SchedulingFunction):
+  def __init__(self, alpha, overprovision):
+    alpha, overprovision = np.broadcast_arrays(np.asarray(alpha, dtype=float), overprovision)
+
+    # params
+    self.size  = alpha.size
+    self.alpha = alpha.ravel()
+    self.overprovision = overprovision.ravel()
+
+  def apply_batch(self,
+      iter_idx,  # Give some kind of SFrame Number
+      sframe,    # The batch of slotframes
+      traffic,   # The traffic that was intended for this SFrame (not counting the drop)
+      drop,      # Number of drop in this SFrame
+      txq,       # Current size of TxQ
+      old_txq):  # TxQ of the last SFrame
+    dq = txq - old_txq + drop # immediately allocate cells on drop
+    u  = sframe.get_cells_unused()
+
+    decision = np.where(u > self.overprovision, -(u - self.overprovision), 0)
+    decision = np.where(dq > 0, dq, decision)
+
+    return {
+      "decision": decision
+    }
+
+  def schema(self):
+    return ["decision"]
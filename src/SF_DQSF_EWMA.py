@@ -36,6 +36,29 @@ import math
 #  This is caused by the fact that it estimates the average number of unused cells
 #  and doesn't see that this "average" is not available for each point in time.
 
+# SchedulingFunction.apply for Simulation.run() (see sim.SchedulingFunction.inline)
+INLINE = """
+dq = txq - old_txq
+
+ewma_dq = dq * alpha + (1 - alpha) * ewma_dq
+ewma_u  = (cells - used) * alpha + (1 - alpha) * ewma_u
+
+if drop > 0:
+  ewma_dq += drop
+  ewma_u   = 0
+
+decision        = 0
+rounded_ewma_dq = round(ewma_dq)
+if rounded_ewma_dq > 0:
+  decision = rounded_ewma_dq
+  ewma_dq -= decision
+else:
+  rounded_ewma_u = math.floor(ewma_u)
+  if rounded_ewma_u > overprovision:
+    decision = -(rounded_ewma_u - overprovision)
+    ewma_u  += decision
+"""
+
 class SchedulingFunction(sim.SchedulingFunction):
   def __init__(self, alpha, overprovision):
     # params
@@ -84,4 +107,36 @@ class SchedulingFunction(sim.SchedulingFunction):
     }
 
   def schema(self):
-    return ["ewma_dq", "ewma_u", "decision"]
\ No newline at end of file
+    return ["ewma_dq", "ewma_u", "decision"]
+
+  def state(self):
+    return (self.ewma_dq, self.ewma_u)
+
+  def set_state(self, state):
+    self.ewma_dq, self.ewma_u = state
+
+  def inline(self):
+    return (("alpha", "overprovision", "ewma_dq", "ewma_u"), INLINE)
+
+  def skip_idle(self, sframe, n):
+    u = sframe.get_cells_unused()
+
+    def rounded_ewma_dq(j):
+      return round(sim.ewma_k(self.ewma_dq, 0, self.alpha, j))
+    def rounded_ewma_u(j):
+      return math.floor(sim.ewma_k(self.ewma_u, u, self.alpha, j))
+    def decide(j):
+      return rounded_ewma_dq(j) > 0 or rounded_ewma_u(j) > self.overprovision
+
+    skipped = sim.idle_sframes(n, decide, [ (rounded_ewma_dq, None), (rounded_ewma_u, None) ])
+    self.ewma_dq = sim.ewma_k(self.ewma_dq, 0, self.alpha, skipped)
+    self.ewma_u  = sim.ewma_k(self.ewma_u, u, self.alpha, skipped)
+    return skipped
+
+# Same scheduling function over a batch of parameter sets (see simbatch), in
+# SF_DQSF_EWMA_batch as it needs NumPy. It is only imported when asked for.
+def __getattr__(name):
+  if name == "BatchSchedulingFunction":
+    import SF_DQSF_EWMA_batch
+    return SF_DQSF_EWMA_batch.BatchSchedulingFunction
+  raise AttributeError("module %r has no attribute %r" % (__name__, name))
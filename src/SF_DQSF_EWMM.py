@@ -34,6 +34,35 @@ import math
 # So we never decide to deallocate, we just keep the number of unused cells at a minimum.
 # That does not go well for bursty traffic that could be handled with DQSF EWMA
 
+# SchedulingFunction.apply for Simulation.run() (see sim.SchedulingFunction.inline)
+INLINE = """
+dq = txq - old_txq
+
+ewma_dq = dq * alpha0 + (1 - alpha0) * ewma_dq
+ewma_u  = (cells - used) * alpha1 + (1 - alpha1) * ewma_u
+
+if used >= ewmm_n:
+  ewmm_n = used
+else:
+  ewmm_n = (1 - alpha1) * ewmm_n
+ewmm_u = cells - ewmm_n
+
+if drop > 0:
+  ewma_dq += drop
+  ewma_u   = 0
+
+decision        = 0
+rounded_ewma_dq = math.floor(ewma_dq)
+if rounded_ewma_dq > 0:
+  decision = rounded_ewma_dq
+  ewma_dq -= decision
+else:
+  rounded_ewmm_u = math.floor(ewmm_u)
+  if rounded_ewmm_u > overprovision:
+    decision = -(rounded_ewmm_u - overprovision)
+    ewmm_n  -= decision
+"""
+
 class SchedulingFunction(sim.SchedulingFunction):
   def __init__(self, alpha0, alpha1, overprovision):
     # params
@@ -94,4 +123,39 @@ class SchedulingFunction(sim.SchedulingFunction):
     }
 
   def schema(self):
-    return ["ewma_dq", "ewma_u", "ewmm_n", "ewmm_u", "decision"]
\ No newline at end of file
+    return ["ewma_dq", "ewma_u", "ewmm_n", "ewmm_u", "decision"]
+
+  def state(self):
+    return (self.ewma_dq, self.ewma_u, self.ewmm_n)
+
+  def set_state(self, state):
+    self.ewma_dq, self.ewma_u, self.ewmm_n = state
+
+  def inline(self):
+    return (("alpha0", "alpha1", "overprovision", "ewma_dq", "ewma_u", "ewmm_n", "ewmm_u"), INLINE)
+
+  def skip_idle(self, sframe, n):
+    cells = sframe.get_cells_allocated()
+    stick = sim.ewmm_stick(self.ewmm_n, 0, self.alpha1)
+
+    def rounded_ewma_dq(j):
+      return math.floor(sim.ewma_k(self.ewma_dq, 0, self.alpha0, j))
+    def rounded_ewmm_u(j):
+      return math.floor(cells - sim.ewmm_k(self.ewmm_n, 0, self.alpha1, j))
+    def decide(j):
+      return rounded_ewma_dq(j) > 0 or rounded_ewmm_u(j) > self.overprovision
+
+    skipped = sim.idle_sframes(n, decide, [ (rounded_ewma_dq, None), (rounded_ewmm_u, stick) ])
+    self.ewma_dq = sim.ewma_k(self.ewma_dq, 0, self.alpha0, skipped)
+    self.ewma_u  = sim.ewma_k(self.ewma_u, cells, self.alpha1, skipped)
+    self.ewmm_n  = sim.ewmm_k(self.ewmm_n, 0, self.alpha1, skipped)
+    self.ewmm_u  = cells - self.ewmm_n
+    return skipped
+
+# Same scheduling function over a batch of parameter sets (see simbatch), in
+# SF_DQSF_EWMM_batch as it needs NumPy. It is only imported when asked for.
+def __getattr__(name):
+  if name == "BatchSchedulingFunction":
+    import SF_DQSF_EWMM_batch
+    return SF_DQSF_EWMM_batch.BatchSchedulingFunction
+  raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -29,6 +29,53 @@ import math
 
 BIG_M = 1000 # should be more like MaxCells + MaxTxQ but this also works
 
+# SchedulingFunction.apply for Simulation.run() (see sim.SchedulingFunction.inline)
+INLINE = """
+unused   = cells - used
+dq       = txq - old_txq
+txq_left = config.max_txq - txq
+
+ewma_dq = dq * alpha0 + (1 - alpha0) * ewma_dq
+ewma_u  = unused * alpha1 + (1 - alpha1) * ewma_u
+
+x = BIG_M - unused
+if x >= ewmm_u:
+  ewmm_u = x
+else:
+  ewmm_u -= alpha1
+  if ewmm_u < 0:
+    ewmm_u = 0
+x = BIG_M - txq_left
+if x >= ewmm_txql:
+  ewmm_txql = x
+else:
+  ewmm_txql -= alpha1
+  if ewmm_txql < 0:
+    ewmm_txql = 0
+
+if drop > 0:
+  ewma_dq += drop
+
+decision        = 0
+rounded_ewma_dq = round(ewma_dq)
+if rounded_ewma_dq > 0:
+  decision = rounded_ewma_dq
+  ewma_dq -= decision
+else:
+  rounded_ewmm_u = math.floor(BIG_M - ewmm_u)
+  if rounded_ewmm_u > overprovision_cells:
+    decision = -(rounded_ewmm_u - overprovision_cells)
+    ewmm_u  -= decision
+  else:
+    rounded_ewmm_txql = math.floor(BIG_M - ewmm_txql)
+    if rounded_ewmm_txql > overprovision_txq:
+      decision = -(rounded_ewmm_txql - overprovision_txq)
+      if math.floor(ewma_u) + decision > overprovision_cells:
+        ewmm_txql -= decision
+      else:
+        decision = 0
+"""
+
 class SchedulingFunction(sim.SchedulingFunction):
   def __init__(self, alpha0, alpha1, overprovision_cells, overprovision_txq, show_alloc=False):
     # params
@@ -55,7 +102,7 @@ class SchedulingFunction(sim.SchedulingFunction):
     alloc_because_drop = False
 
     dq       = txq - old_txq
-    txq_left = sim.MAX_TXQ - txq
+    txq_left = sframe.config.max_txq - txq
 
     self.ewma_dq = sim.ewma(self.ewma_dq, dq, self.alpha0)
     self.ewma_u  = sim.ewma(self.ewma_u, sframe.get_cells_unused(), self.alpha1) # for stats purpose only
@@ -86,9 +133,9 @@ class SchedulingFunction(sim.SchedulingFunction):
 
       if self.show_alloc:
         if alloc_because_drop:
-         print("%d DROP_ALLOC %d" % (iter_idx, decision))
+         print("%d DROP_ALLOC %d" % (iter_idx, decision), file=self.out)
         else:
-         print("%d DQ_ALLOC %d" % (iter_idx, decision))
+         print("%d DQ_ALLOC %d" % (iter_idx, decision), file=self.out)
     elif rounded_ewmm_u > self.overprovision_cells:
       decision     = -(rounded_ewmm_u - self.overprovision_cells)
       self.ewmm_u -= decision # mark our budget for the fact that we deallocated
@@ -110,3 +157,54 @@ class SchedulingFunction(sim.SchedulingFunction):
 
   def schema(self):
     return ["ewma_dq", "ewma_u", "ewmm_u", "ewmm_txql", "decision"]
+
+  def state(self):
+    return (self.ewma_dq, self.ewma_u, self.ewmm_u, self.ewmm_txql)
+
+  def set_state(self, state):
+    self.ewma_dq, self.ewma_u, self.ewmm_u, self.ewmm_txql = state
+
+  def inline(self):
+    if self.show_alloc:
+      return None
+    return (("alpha0", "alpha1", "overprovision_cells", "overprovision_txq",
+             "ewma_dq", "ewma_u", "ewmm_u", "ewmm_txql"), INLINE)
+
+  def skip_idle(self, sframe, n):
+    unused     = sframe.get_cells_unused()
+    ewmm_u     = BIG_M - unused
+    ewmm_txql  = BIG_M - sframe.config.max_txq # the TxQ is empty
+    stick_u    = sim.ewmm2_stick(self.ewmm_u, ewmm_u, self.alpha1)
+    stick_txql = sim.ewmm2_stick(self.ewmm_txql, ewmm_txql, self.alpha1)
+
+    def rounded_ewma_dq(j):
+      return round(sim.ewma_k(self.ewma_dq, 0, self.alpha0, j))
+    def rounded_ewma_u(j):
+      return math.floor(sim.ewma_k(self.ewma_u, unused, self.alpha1, j))
+    def rounded_ewmm_u(j):
+      return math.floor(BIG_M - sim.ewmm2_k(self.ewmm_u, ewmm_u, self.alpha1, j))
+    def rounded_ewmm_txql(j):
+      return math.floor(BIG_M - sim.ewmm2_k(self.ewmm_txql, ewmm_txql, self.alpha1, j))
+    # same branches as apply()
+    def decide(j):
+      if rounded_ewma_dq(j) > 0 or rounded_ewmm_u(j) > self.overprovision_cells:
+        return True
+      decision = -(rounded_ewmm_txql(j) - self.overprovision_txq)
+      return decision < 0 and rounded_ewma_u(j) + decision > self.overprovision_cells
+
+    skipped = sim.idle_sframes(n, decide, [
+      (rounded_ewma_dq, None), (rounded_ewma_u, None),
+      (rounded_ewmm_u, stick_u), (rounded_ewmm_txql, stick_txql) ])
+    self.ewma_dq   = sim.ewma_k(self.ewma_dq, 0, self.alpha0, skipped)
+    self.ewma_u    = sim.ewma_k(self.ewma_u, unused, self.alpha1, skipped)
+    self.ewmm_u    = sim.ewmm2_k(self.ewmm_u, ewmm_u, self.alpha1, skipped)
+    self.ewmm_txql = sim.ewmm2_k(self.ewmm_txql, ewmm_txql, self.alpha1, skipped)
+    return skipped
+
+# Same scheduling function over a batch of parameter sets (see simbatch), in
+# SF_DQSF_EWMM_BUDGET2_batch as it needs NumPy. It is only imported when asked for.
+def __getattr__(name):
+  if name == "BatchSchedulingFunction":
+    import SF_DQSF_EWMM_BUDGET2_batch
+    return SF_DQSF_EWMM_BUDGET2_batch.BatchSchedulingFunction
+  raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,108 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import simbatch
+import numpy as np
+from SF_DQSF_EWMM_BUDGET2 import BIG_M
+
+# Same scheduling function over a batch of parameter sets.
+# The parameters can be scalars or arrays, they are broadcast against each other
+# and each element is an independent simulation (see simbatch).
+class BatchSchedulingFunction(simbatch.SchedulingFunction):
+  def __init__(self, alpha0, alpha1, overprovision_cells, overprovision_txq):
+    alpha0, alpha1, overprovision_cells, overprovision_txq = np.broadcast_arrays(
+      np.asarray(alpha0, dtype=float), np.asarray(alpha1, dtype=float),
+      overprovision_cells, overprovision_txq)
+
+    # params
+    self.size   = alpha0.size
+    self.alpha0 = alpha0.ravel()
+    self.alpha1 = alpha1.ravel()
+    self.overprovision_cells = overprovision_cells.ravel()
+    self.overprovision_txq   = overprovision_txq.ravel()
+
+    # metrics
+    self.ewma_dq   = np.zeros(self.size)
+    self.ewma_u    = np.zeros(self.size)
+    self.ewmm_u    = np.zeros(self.size)
+    self.ewmm_txql = np.zeros(self.size)
+
+  def apply_batch(self,
+      iter_idx,  # Give some kind of SFrame Number
+      sframe,    # The batch of slotframes
+      traffic,   # The traffic that was intended for this SFrame (not counting the drop)
+      drop,      # Number of drop in this SFrame
+      txq,       # Current size of TxQ
+      old_txq):  # TxQ of the last SFrame
+    dq       = txq - old_txq
+    txq_left = sframe.config.max_txq - txq
+    unused   = sframe.get_cells_unused()
+
+    self.ewma_dq = sim.ewma(self.ewma_dq, dq, self.alpha0)
+    self.ewma_u  = sim.ewma(self.ewma_u, unused, self.alpha1) # for stats purpose only
+
+    # compute the minimum number of cells and TxQLeft we encountered in the past with alpha1 as time period
+    self.ewmm_u    = simbatch.ewmm2(self.ewmm_u, BIG_M - unused, self.alpha1)
+    self.ewmm_txql = simbatch.ewmm2(self.ewmm_txql, BIG_M - txq_left, self.alpha1)
+    real_ewmm_u    = BIG_M - self.ewmm_u
+    real_ewmm_txql = BIG_M - self.ewmm_txql
+
+    self.ewma_dq = np.where(drop > 0, self.ewma_dq + drop, self.ewma_dq) # immediately allocate cells
+
+    rounded_ewma_dq   = np.round(self.ewma_dq)
+    rounded_ewma_u    = np.floor(self.ewma_u)
+    rounded_ewmm_u    = np.floor(real_ewmm_u)
+    rounded_ewmm_txql = np.floor(real_ewmm_txql)
+
+    # each branch of SchedulingFunction.apply as a mask
+    alloc        = rounded_ewma_dq > 0
+    dealloc_u    = ~alloc & (rounded_ewmm_u > self.overprovision_cells)
+    dealloc_txql = ~alloc & ~dealloc_u & (rounded_ewmm_txql > self.overprovision_txq)
+
+    decision = np.where(alloc, rounded_ewma_dq, 0)
+    self.ewma_dq = np.where(alloc, self.ewma_dq - decision, self.ewma_dq)
+
+    decision_u   = -(rounded_ewmm_u - self.overprovision_cells)
+    decision     = np.where(dealloc_u, decision_u, decision)
+    self.ewmm_u  = np.where(dealloc_u, self.ewmm_u - decision_u, self.ewmm_u)
+
+    # check that we still have our overprovision in cells (compared to the avg.)
+    decision_txql  = -(rounded_ewmm_txql - self.overprovision_txq)
+    dealloc_txql  &= rounded_ewma_u + decision_txql > self.overprovision_cells
+    decision       = np.where(dealloc_txql, decision_txql, decision)
+    self.ewmm_txql = np.where(dealloc_txql, self.ewmm_txql - decision_txql, self.ewmm_txql)
+
+    return {
+      "ewma_dq"  : self.ewma_dq,
+      "ewma_u"   : self.ewma_u,
+      "ewmm_u"   : real_ewmm_u,
+      "ewmm_txql": real_ewmm_txql,
+      "decision" : decision.astype(np.int64)
+    }
+
+  def schema(self):
+    return ["ewma_dq", "ewma_u", "ewmm_u", "ewmm_txql", "decision"]
@@ -29,6 +29,36 @@ import math
 
 BIG_M = 1000 # should be more like MaxCells + MaxTxQ but this also works
 
+# SchedulingFunction.apply for Simulation.run() (see sim.SchedulingFunction.inline)
+INLINE = """
+dq = txq - old_txq
+
+ewma_dq = dq * alpha0 + (1 - alpha0) * ewma_dq
+ewma_u  = (cells - used) * alpha1 + (1 - alpha1) * ewma_u
+
+current_budget = BIG_M - ((cells - used) + (config.max_txq - txq))
+if current_budget >= ewmm_budget:
+  ewmm_budget = current_budget
+else:
+  ewmm_budget -= alpha1
+  if ewmm_budget < 0:
+    ewmm_budget = 0
+
+if drop > 0:
+  ewma_dq += drop
+
+decision        = 0
+rounded_ewma_dq = math.floor(ewma_dq)
+if rounded_ewma_dq > 0:
+  decision = rounded_ewma_dq
+  ewma_dq -= decision
+else:
+  rounded_ewmm_budget = math.floor(BIG_M - ewmm_budget)
+  if rounded_ewmm_budget > overprovision:
+    decision     = -(rounded_ewmm_budget - overprovision)
+    ewmm_budget -= 2*decision
+"""
+
 class SchedulingFunction(sim.SchedulingFunction):
   def __init__(self, alpha0, alpha1, overprovision):
     # params
@@ -54,7 +84,7 @@ class SchedulingFunction(sim.SchedulingFunction):
     self.ewma_u  = sim.ewma(self.ewma_u, sframe.get_cells_unused(), self.alpha1) # for stats purpose only
 
     # compute the minimum budget we encountered in the past with alpha1 as time period
-    txq_left       = sim.MAX_TXQ - txq
+    txq_left       = sframe.config.max_txq - txq
     current_budget = BIG_M - (sframe.get_cells_unused() + txq_left)
     self.ewmm_budget = sim.ewmm2(self.ewmm_budget, current_budget, self.alpha1)
     real_ewmm_budget = BIG_M - self.ewmm_budget
@@ -87,4 +117,39 @@ class SchedulingFunction(sim.SchedulingFunction):
     }
 
   def schema(self):
-    return ["ewma_dq", "ewma_u", "ewmm", "ewmm_budget", "decision"]
\ No newline at end of file
+    return ["ewma_dq", "ewma_u", "ewmm", "ewmm_budget", "decision"]
+
+  def state(self):
+    return (self.ewma_dq, self.ewma_u, self.ewmm_budget)
+
+  def set_state(self, state):
+    self.ewma_dq, self.ewma_u, self.ewmm_budget = state
+
+  def inline(self):
+    return (("alpha0", "alpha1", "overprovision", "ewma_dq", "ewma_u", "ewmm_budget"), INLINE)
+
+  def skip_idle(self, sframe, n):
+    cells  = sframe.get_cells_allocated()
+    budget = BIG_M - (cells + sframe.config.max_txq) # the TxQ is empty
+    stick  = sim.ewmm2_stick(self.ewmm_budget, budget, self.alpha1)
+
+    def rounded_ewma_dq(j):
+      return math.floor(sim.ewma_k(self.ewma_dq, 0, self.alpha0, j))
+    def rounded_ewmm_budget(j):
+      return math.floor(BIG_M - sim.ewmm2_k(self.ewmm_budget, budget, self.alpha1, j))
+    def decide(j):
+      return rounded_ewma_dq(j) > 0 or rounded_ewmm_budget(j) > self.overprovision
+
+    skipped = sim.idle_sframes(n, decide, [ (rounded_ewma_dq, None), (rounded_ewmm_budget, stick) ])
+    self.ewma_dq     = sim.ewma_k(self.ewma_dq, 0, self.alpha0, skipped)
+    self.ewma_u      = sim.ewma_k(self.ewma_u, cells, self.alpha1, skipped)
+    self.ewmm_budget = sim.ewmm2_k(self.ewmm_budget, budget, self.alpha1, skipped)
+    return skipped
+
+# Same scheduling function over a batch of parameter sets (see simbatch), in
+# SF_DQSF_EWMM_TXQ_batch as it needs NumPy. It is only imported when asked for.
+def __getattr__(name):
+  if name == "BatchSchedulingFunction":
+    import SF_DQSF_EWMM_TXQ_batch
+    return SF_DQSF_EWMM_TXQ_batch.BatchSchedulingFunction
+  raise AttributeError("module %r has no attribute %r" % (__name__, name))
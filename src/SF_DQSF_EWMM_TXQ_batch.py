@@ -0,0 +1,93 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import simbatch
+import numpy as np
+from SF_DQSF_EWMM_TXQ import BIG_M
+
+# Same scheduling function over a batch of parameter sets (see simbatch).
+class BatchSchedulingFunction(simbatch.SchedulingFunction):
+  def __init__(self, alpha0, alpha1, overprovision):
+    alpha0, alpha1, overprovision = np.broadcast_arrays(
+      np.asarray(alpha0, dtype=float), np.asarray(alpha1, dtype=float), overprovision)
+
+    # params
+    self.size   = alpha0.size
+    self.alpha0 = alpha0.ravel()
+    self.alpha1 = alpha1.ravel()
+    self.overprovision = overprovision.ravel()
+
+    # metrics
+    self.ewma_dq = np.zeros(self.size)
+    self.ewma_u  = np.zeros(self.size)
+    self.ewmm_budget = np.zeros(self.size)
+
+  def apply_batch(self,
+      iter_idx,  # Give some kind of SFrame Number
+      sframe,    # The batch of slotframes
+      traffic,   # The traffic that was intended for this SFrame (not counting the drop)
+      drop,      # Number of drop in this SFrame
+      txq,       # Current size of TxQ
+      old_txq):  # TxQ of the last SFrame
+    dq     = txq - old_txq
+    unused = sframe.get_cells_unused()
+
+    self.ewma_dq = sim.ewma(self.ewma_dq, dq, self.alpha0)
+    self.ewma_u  = sim.ewma(self.ewma_u, unused, self.alpha1) # for stats purpose only
+
+    # compute the minimum budget we encountered in the past with alpha1 as time period
+    txq_left         = sframe.config.max_txq - txq
+    current_budget   = BIG_M - (unused + txq_left)
+    self.ewmm_budget = simbatch.ewmm2(self.ewmm_budget, current_budget, self.alpha1)
+    real_ewmm_budget = BIG_M - self.ewmm_budget
+
+    self.ewma_dq = np.where(drop > 0, self.ewma_dq + drop, self.ewma_dq) # immediately allocate cells
+
+    rounded_ewma_dq     = np.floor(self.ewma_dq)
+    rounded_ewmm_budget = np.floor(real_ewmm_budget) # floor(min(U + TxQLeft))
+
+    alloc   = rounded_ewma_dq > 0
+    dealloc = ~alloc & (rounded_ewmm_budget > self.overprovision)
+
+    decision     = np.where(alloc, rounded_ewma_dq, 0)
+    self.ewma_dq = np.where(alloc, self.ewma_dq - decision, self.ewma_dq)
+
+    # reverse because we are against the BIG_M (see SchedulingFunction)
+    decision_budget  = -(rounded_ewmm_budget - self.overprovision)
+    decision         = np.where(dealloc, decision_budget, decision)
+    self.ewmm_budget = np.where(dealloc, self.ewmm_budget - 2*decision_budget, self.ewmm_budget)
+
+    return {
+      "ewma_dq" : self.ewma_dq,
+      "ewma_u"  : self.ewma_u,
+      "ewmm" : self.ewmm_budget,
+      "ewmm_budget": real_ewmm_budget,
+      "decision": decision.astype(np.int64)
+    }
+
+  def schema(self):
+    return ["ewma_dq", "ewma_u", "ewmm", "ewmm_budget", "decision"]
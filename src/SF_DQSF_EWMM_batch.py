@@ -0,0 +1,90 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import simbatch
+import numpy as np
+
+# Same scheduling function over a batch of parameter sets (see simbatch).
+class BatchSchedulingFunction(simbatch.SchedulingFunction):
+  def __init__(self, alpha0, alpha1, overprovision):
+    alpha0, alpha1, overprovision = np.broadcast_arrays(
+      np.asarray(alpha0, dtype=float), np.asarray(alpha1, dtype=float), overprovision)
+
+    # params
+    self.size   = alpha0.size
+    self.alpha0 = alpha0.ravel()
+    self.alpha1 = alpha1.ravel()
+    self.overprovision = overprovision.ravel()
+
+    # metrics
+    self.ewma_dq = np.zeros(self.size)
+    self.ewma_u  = np.zeros(self.size)
+    self.ewmm_n  = np.zeros(self.size)
+    self.ewmm_u  = np.zeros(self.size)
+
+  def apply_batch(self,
+      iter_idx,  # Give some kind of SFrame Number
+      sframe,    # The batch of slotframes
+      traffic,   # The traffic that was intended for this SFrame (not counting the drop)
+      drop,      # Number of drop in this SFrame
+      txq,       # Current size of TxQ
+      old_txq):  # TxQ of the last SFrame
+    dq = txq - old_txq
+
+    self.ewma_dq = sim.ewma(self.ewma_dq, dq, self.alpha0)
+    self.ewma_u  = sim.ewma(self.ewma_u, sframe.get_cells_unused(), self.alpha1)
+
+    self.ewmm_n  = simbatch.ewmm(self.ewmm_n, sframe.get_cells_used(), self.alpha1)
+    self.ewmm_u  = sframe.get_cells_allocated() - self.ewmm_n # N = C - U => U = C - N
+
+    dropping     = drop > 0
+    self.ewma_dq = np.where(dropping, self.ewma_dq + drop, self.ewma_dq) # immediately allocate cells
+    self.ewma_u  = np.where(dropping, 0., self.ewma_u) # we must learn the unused state again
+
+    rounded_ewma_dq = np.floor(self.ewma_dq)
+    rounded_ewmm_u  = np.floor(self.ewmm_u)
+
+    alloc   = rounded_ewma_dq > 0
+    dealloc = ~alloc & (rounded_ewmm_u > self.overprovision)
+
+    decision     = np.where(alloc, rounded_ewma_dq, 0)
+    self.ewma_dq = np.where(alloc, self.ewma_dq - decision, self.ewma_dq)
+
+    decision_u  = -(rounded_ewmm_u - self.overprovision)
+    decision    = np.where(dealloc, decision_u, decision)
+    self.ewmm_n = np.where(dealloc, self.ewmm_n - decision_u, self.ewmm_n)
+
+    return {
+      "ewma_dq" : self.ewma_dq,
+      "ewma_u"  : self.ewma_u,
+      "ewmm_n"  : self.ewmm_n,
+      "ewmm_u"  : self.ewmm_u,
+      "decision": decision.astype(np.int64)
+    }
+
+  def schema(self):
+    return ["ewma_dq", "ewma_u", "ewmm_n", "ewmm_u", "decision"]
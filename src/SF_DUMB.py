@@ -59,4 +59,16 @@ class SchedulingFunction(sim.SchedulingFunction):
     }
 
   def schema(self):
-    return ["decision"]
\ No newline at end of file
+    return ["decision"]
+
+  def state(self):
+    return ()
+
+  def set_state(self, state):
+    pass
+
+  def skip_idle(self, sframe, n):
+    # without traffic nothing changes from one SFrame to the next
+    if sframe.get_cells_unused() > self.overprovision:
+      return 0
+    return n
@@ -47,4 +47,23 @@ class SchedulingFunction(sim.SchedulingFunction):
     }
 
   def schema(self):
-    return ["decision"]
\ No newline at end of file
+    return ["decision"]
+
+  def state(self):
+    return ()
+
+  def set_state(self, state):
+    pass
+
+  def skip_idle(self, sframe, n):
+    if sframe.get_cells_allocated() != self.n:
+      return 0
+    return n
+
+# Same scheduling function over a batch of parameter sets (see simbatch), in
+# SF_Fixed_batch as it needs NumPy. It is only imported when asked for.
+def __getattr__(name):
+  if name == "BatchSchedulingFunction":
+    import SF_Fixed_batch
+    return SF_Fixed_batch.BatchSchedulingFunction
+  raise AttributeError("module %r has no attribute %r" % (__name__, name))
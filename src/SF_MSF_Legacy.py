@@ -79,4 +79,27 @@ class SchedulingFunction(sim.SchedulingFunction):
     }
 
   def schema(self):
-    return ["usage", "decision"]
\ No newline at end of file
+    return ["usage", "decision"]
+
+  def state(self):
+    return (self.elapsed, self.used)
+
+  def set_state(self, state):
+    self.elapsed, self.used = state
+
+  def skip_idle(self, sframe, n):
+    cells = sframe.get_cells_allocated()
+    if cells == 0:
+      return 0
+    # nothing is used, the next decision is when enough cells have elapsed
+    skipped = min(n, max(0, (self.max_numcells - self.elapsed) // cells))
+    self.elapsed += skipped * cells
+    return skipped
+
+# Same scheduling function over a batch of parameter sets (see simbatch), in
+# SF_MSF_Legacy_batch as it needs NumPy. It is only imported when asked for.
+def __getattr__(name):
+  if name == "BatchSchedulingFunction":
+    import SF_MSF_Legacy_batch
+    return SF_MSF_Legacy_batch.BatchSchedulingFunction
+  raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,83 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import simbatch
+import numpy as np
+
+# Same scheduling function over a batch of parameter sets (see simbatch).
+class BatchSchedulingFunction(simbatch.SchedulingFunction):
+  def __init__(self, low, high, max_numcells):
+    low, high, max_numcells = np.broadcast_arrays(
+      np.asarray(low, dtype=float), np.asarray(high, dtype=float), max_numcells)
+
+    # params
+    self.size = low.size
+    self.low  = low.ravel()
+    self.high = high.ravel()
+    self.max_numcells = max_numcells.ravel()
+
+    self.elapsed = np.zeros(self.size, dtype=np.int64)
+    self.used    = np.zeros(self.size)
+
+  def apply_batch(self,
+      iter_idx,  # Give some kind of SFrame Number
+      sframe,    # The batch of slotframes
+      traffic,   # The traffic that was intended for this SFrame (not counting the drop)
+      drop,      # Number of drop in this SFrame
+      txq,       # Current size of TxQ
+      old_txq):  # TxQ of the last SFrame
+    cells = sframe.get_cells_allocated()
+
+    # ensure that we have at least one cell allocated
+    # those simulations do not update their state
+    empty = cells == 0
+
+    elapsed = self.elapsed + cells
+    used    = self.used + sframe.get_cells_used()
+    over    = ~empty & (elapsed > self.max_numcells)
+
+    usage = np.zeros(self.size)
+    np.divide(used, elapsed, out=usage, where=over)
+
+    decision = np.where(over & (usage > self.high), 1, 0)
+    decision = np.where(over & (usage < self.low), -1, decision)
+    decision = np.where(empty, 1, decision)
+
+    # we cheat a bit here
+    elapsed = np.where(over, np.maximum(0, elapsed - self.max_numcells), elapsed)
+    used    = np.where(over, np.maximum(0, used - usage * self.max_numcells), used)
+
+    self.elapsed = np.where(empty, self.elapsed, elapsed)
+    self.used    = np.where(empty, self.used, used)
+
+    return {
+      "usage"   : usage,
+      "decision": decision
+    }
+
+  def schema(self):
+    return ["usage", "decision"]
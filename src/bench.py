@@ -0,0 +1,232 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import SF_Fixed
+import SF_DQSF_1SF
+import SF_DQSF_EWMA
+import SF_DQSF_EWMM
+import SF_DQSF_EWMM_TXQ
+import SF_DQSF_EWMM_BUDGET2
+import SF_MSF_Legacy
+import argparse
+import contextlib
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# Throughput of the simulator: slotframes per second and peak memory of each
+# scheduling function, over the traffic patterns of the xp_* scripts and with
+# each print method (the text ones print into os.devnull).
+#
+#   python bench.py [--max-iter N] [--sf ...] [--pattern ...] [--print ...] -o run.json
+#   python bench.py compare old.json new.json [--threshold 0.1]
+#
+# A case is run repeat times, its throughput is the best of them. The peak
+# memory is measured on one more run under tracemalloc, which slows it down,
+# so it is not timed. compare flags the cases whose throughput dropped or
+# whose peak memory grew by more than threshold, and exits with 1 if any did.
+
+SIXP_DELAY          = 2
+ALPHA               = 0.1
+ALPHA0              = 0.1
+ALPHA1              = 0.01
+OVERPROVISION       = 1
+OVERPROVISION_CELLS = 1
+OVERPROVISION_TXQ   = math.floor(0.7*sim.MAX_TXQ)
+
+SCHEDFUNS = {
+  "SF_Fixed"             : lambda: SF_Fixed.SchedulingFunction(6),
+  "SF_DQSF_1SF"          : lambda: SF_DQSF_1SF.SchedulingFunction(ALPHA, OVERPROVISION),
+  "SF_DQSF_EWMA"         : lambda: SF_DQSF_EWMA.SchedulingFunction(ALPHA, OVERPROVISION),
+  "SF_DQSF_EWMM"         : lambda: SF_DQSF_EWMM.SchedulingFunction(ALPHA0, ALPHA1, OVERPROVISION),
+  "SF_DQSF_EWMM_TXQ"     : lambda: SF_DQSF_EWMM_TXQ.SchedulingFunction(ALPHA0, ALPHA1, OVERPROVISION),
+  "SF_DQSF_EWMM_BUDGET2" : lambda: SF_DQSF_EWMM_BUDGET2.SchedulingFunction(ALPHA0, ALPHA1, OVERPROVISION_CELLS, OVERPROVISION_TXQ),
+  "SF_MSF_Legacy"        : lambda: SF_MSF_Legacy.SchedulingFunction(0.25, 0.75, 100) }
+
+"""
+Traffic of xp_DQSF_EWMM_sin.py: 3600 slotframes at 4, then a cosine.
+"""
+def sin_pattern(max_iter):
+  return [ 4 ] * 3600 + [ int(4 + 3*math.cos(i*2*math.pi / 60)) for i in range(3600, max_iter) ]
+
+"""
+Traffic of xp_DQSF_EWMM_prog.py: 3600 slotframes at 2, a ramp up to 8 over
+720 slotframes, then 8.
+"""
+def prog_pattern(max_iter):
+  pattern = [ 2 ] * 3600
+  current = 2
+  for i in range(3600, 3600 + 120*6):
+    real = 2 + float(i - 3600) / 120
+    if abs(current - real) > 0.1:
+      current += 1 if current < real else -1
+    pattern.append(current)
+  return pattern + [ 8 ] * (max_iter - len(pattern))
+
+def random_pattern(max_iter):
+  rng = random.Random(1234)
+  return [ rng.randint(0, 6) for i in range(max_iter) ]
+
+PATTERNS = {
+  "regular" : lambda max_iter: [ 6 ],
+  "periodic": lambda max_iter: [ 6, 0 ],
+  "random"  : random_pattern,
+  "bursty"  : lambda max_iter: [ 5, 5, 5, 5 ] + [ 0 ] * 120,
+  "verylow" : lambda max_iter: [ 1 ] + [ 0 ] * 120,
+  "sin"     : sin_pattern,
+  "prog"    : prog_pattern }
+
+PRINTS = {
+  "PrintNull"    : lambda max_iter: sim.PrintNull,
+  "PrintDefault" : lambda max_iter: sim.PrintDefault,
+  "RecordColumns": lambda max_iter: sim.RecordColumns(max_iter),
+  "PrintPlot"    : lambda max_iter: sim.PrintPlot,
+  "PrintHuman"   : lambda max_iter: sim.PrintHuman,
+  "BufferedPlot" : lambda max_iter: sim.BufferedPlot(),
+  "BufferedHuman": lambda max_iter: sim.BufferedHuman() }
+
+def simulate(sf, pattern, print_method, max_iter):
+  simulation = sim.Simulation(max_iter, SIXP_DELAY, pattern, SCHEDFUNS[sf](),
+                              PRINTS[print_method](max_iter))
+  try:
+    for _ in simulation:
+      pass
+  except ZeroDivisionError:
+    # the summary of PrintPlot has no percentages for a window without
+    # traffic or cells; it comes after the last slotframe, which still counts
+    if print_method not in ("PrintPlot", "BufferedPlot"):
+      raise
+
+"""
+Throughput and peak memory of one case, as a dict for the JSON results.
+"""
+def bench(sf, pattern_name, print_method, max_iter, repeat, memory):
+  pattern = PATTERNS[pattern_name](max_iter)
+  with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+    best = math.inf
+    for _ in range(repeat):
+      start = time.perf_counter()
+      simulate(sf, pattern, print_method, max_iter)
+      best  = min(best, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+      tracemalloc.start()
+      simulate(sf, pattern, print_method, max_iter)
+      peak = tracemalloc.get_traced_memory()[1]
+      tracemalloc.stop()
+
+  return { "sf": sf, "pattern": pattern_name, "print": print_method,
+           "seconds": best, "sframes_per_second": (max_iter + 1) / best, "peak_bytes": peak }
+
+def run(args):
+  results = []
+  for sf in args.sf:
+    for pattern in args.pattern:
+      for print_method in args.print:
+        result = bench(sf, pattern, print_method, args.max_iter, args.repeat, not args.no_memory)
+        results.append(result)
+        print("%-22s %-9s %-13s %12.0f sframes/s %s" % (
+          sf, pattern, print_method, result["sframes_per_second"],
+          "" if result["peak_bytes"] is None else "%10d bytes" % result["peak_bytes"]),
+          file=sys.stderr)
+
+  report = {
+    "meta": {
+      "date"    : datetime.datetime.now().isoformat(timespec="seconds"),
+      "python"  : sys.version.replace("\n", " "),
+      "platform": platform.platform(),
+      "max_iter": args.max_iter,
+      "repeat"  : args.repeat },
+    "results": results }
+  if args.output is None:
+    json.dump(report, sys.stdout, indent=1)
+    print()
+  else:
+    with open(args.output, "w") as out:
+      json.dump(report, out, indent=1)
+
+"""
+Print the cases of both runs side by side, flag the regressions and
+return their number.
+"""
+def compare(old_path, new_path, threshold):
+  with open(old_path) as f:
+    old = json.load(f)
+  with open(new_path) as f:
+    new = json.load(f)
+
+  key = lambda r: (r["sf"], r["pattern"], r["print"])
+  before = { key(r): r for r in old["results"] }
+  regressions = 0
+  print("# sf pattern print    old_sframes_per_second new_sframes_per_second ratio    old_peak new_peak")
+  for r in new["results"]:
+    o = before.get(key(r))
+    if o is None:
+      continue
+    ratio = r["sframes_per_second"] / o["sframes_per_second"]
+    flags = []
+    if ratio < 1 - threshold:
+      flags.append("SLOWER")
+    if o["peak_bytes"] and r["peak_bytes"] and r["peak_bytes"] > (1 + threshold) * o["peak_bytes"]:
+      flags.append("MEMORY")
+    regressions += len(flags) > 0
+    print("%s %s %s    %.0f %.0f %.3f    %s %s %s" % (
+      r["sf"], r["pattern"], r["print"], o["sframes_per_second"], r["sframes_per_second"], ratio,
+      o["peak_bytes"], r["peak_bytes"], " ".join(flags)))
+  print("# %d regression(s) over a threshold of %g" % (regressions, threshold))
+  return regressions
+
+if __name__ == "__main__":
+  if len(sys.argv) > 1 and sys.argv[1] == "compare":
+    parser = argparse.ArgumentParser(prog="%s compare" % sys.argv[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative change flagged as a regression")
+    args = parser.parse_args(sys.argv[2:])
+    sys.exit(1 if compare(args.old, args.new, args.threshold) else 0)
+
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--max-iter", type=int, default=6*3600)
+  parser.add_argument("--repeat", type=int, default=3)
+  parser.add_argument("--sf", nargs="+", default=list(SCHEDFUNS), choices=list(SCHEDFUNS))
+  parser.add_argument("--pattern", nargs="+", default=list(PATTERNS), choices=list(PATTERNS))
+  parser.add_argument("--print", nargs="+", default=list(PRINTS), choices=list(PRINTS))
+  parser.add_argument("--no-memory", action="store_true", help="skip the peak memory runs")
+  parser.add_argument("-o", "--output", help="JSON results (stdout by default)")
+  args = parser.parse_args()
+  # the summary of PrintPlot divides by the traffic after the warm-up
+  if args.max_iter <= 3600:
+    parser.error("--max-iter must go past the warm-up of the default windows (3600)")
+  run(args)
@@ -0,0 +1,75 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import SF_DQSF_EWMM_BUDGET2
+import math
+import os
+import random
+import sys
+import time
+
+# Scaling of sim.sweep with the number of workers, threads against processes.
+# With the GIL the threads take turns, so the thread numbers of a standard build say
+# nothing about a free-threaded one: the output is flagged as not representative.
+
+SIXP_DELAY          = 2
+OVERPROVISION_CELLS = 1
+OVERPROVISION_TXQ   = math.floor(0.7*sim.MAX_TXQ)
+MAX_ITER            = 86400
+RUNS                = 16
+WORKERS             = [ 1, 2, 4, 8 ]
+
+random.seed(1234)
+TRAFFIC_PATTERN = [ random.randint(0, 6) for i in range(MAX_ITER) ]
+GRID = [ (0.05 + 0.01 * i, 0.01, OVERPROVISION_CELLS, OVERPROVISION_TXQ) for i in range(RUNS) ]
+
+def gil_enabled():
+  # sys._is_gil_enabled only exists since Python 3.13
+  is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+  return True if is_gil_enabled is None else is_gil_enabled()
+
+def bench(threads, max_workers):
+  start = time.perf_counter()
+  sim.sweep(SF_DQSF_EWMM_BUDGET2.SchedulingFunction, GRID, TRAFFIC_PATTERN, SIXP_DELAY, MAX_ITER,
+            max_workers=max_workers, threads=threads)
+  return time.perf_counter() - start
+
+if __name__ == "__main__":
+  print("# %s" % sys.version.replace("\n", " "))
+  print("# gil=%s cpus=%d runs=%d max_iter=%d" % (gil_enabled(), os.cpu_count(), RUNS, MAX_ITER))
+  if gil_enabled():
+    print("# GIL build, thread results not representative of a free-threaded Python")
+  if os.cpu_count() == 1:
+    print("# single CPU, speedups not representative")
+  print("# executor workers    seconds speedup sframes_per_second")
+  for executor in ("thread", "process"):
+    base = None
+    for workers in WORKERS:
+      elapsed = bench(executor == "thread", workers)
+      base    = base or elapsed
+      print("%s %d    %.3f %.2f %.0f" % (executor, workers, elapsed, base / elapsed,
+                                          RUNS * (MAX_ITER + 1) / elapsed))
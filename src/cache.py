@@ -0,0 +1,263 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import simtrace
+import array
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+# On-disk cache of the results of simulations, addressed by the hash of
+# everything they depend on:
+#   the source of the simulator (sim.py) and of the module of the SF class,
+#   the attributes of the SF once built (its parameters and initial state),
+#   a digest of the traffic pattern and, for a traffic.Source, the source of
+#   the modules of its classes (traffic.py, replay.py...), the 6P delay,
+#   max_iter, the windows and the Config.
+# Editing an SF file only changes the keys of the simulations of its SFs,
+# editing traffic.py those of the simulations of Sources, editing sim.py
+# changes all of them.
+#
+# An entry is the final report of a simulation (totals and windows, as in the
+# trailer of a simtrace file) in a small JSON file. Each hit touches its file,
+# once the directory gets over max_bytes the least recently used entries go
+# until it is back to EVICT_TO of max_bytes. The size of the directory is only
+# listed then: in between, each put adds the size of its entry to a running
+# total (the entries of other processes are counted at the next listing).
+
+# format of the entries, part of the keys
+VERSION = 1
+
+DEFAULT_PATH      = os.environ.get("SIMDQSF_CACHE",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "simdqsf"))
+DEFAULT_MAX_BYTES = 64 << 20
+EVICT_TO          = 0.75
+
+# digests of source files, by path and modification time
+_source_digests = {}
+
+def _source_digest(obj):
+  path = inspect.getsourcefile(obj)
+  stat = os.stat(path)
+  key  = (path, stat.st_mtime_ns, stat.st_size)
+  if key not in _source_digests:
+    with open(path, "rb") as f:
+      _source_digests[key] = hashlib.sha256(f.read()).hexdigest()
+  return _source_digests[key]
+
+"""
+Digest of a traffic pattern, a list or a traffic.Source.
+"""
+def pattern_digest(traffic_pattern):
+  if hasattr(traffic_pattern, "digest"):
+    return traffic_pattern.digest()
+  return hashlib.sha256(array.array("q", traffic_pattern).tobytes()).hexdigest()
+
+"""
+Digests of the source files of the classes a traffic pattern is computed by,
+a traffic.Source and the sources it is made of, from traffic.py to the modules
+of other sources (as replay.py for a replay.NodeTrace). None for a list.
+"""
+def pattern_code_digest(traffic_pattern):
+  if not hasattr(traffic_pattern, "digest"):
+    return None
+  digests = set()
+  def visit(value):
+    if hasattr(value, "digest"):
+      for cls in type(value).__mro__[:-1]:
+        digests.add(_source_digest(cls))
+      for name, v in vars(value).items():
+        if not name.startswith("_"):
+          visit(v)
+    elif isinstance(value, (list, tuple)):
+      for v in value:
+        visit(v)
+  visit(traffic_pattern)
+  return sorted(digests)
+
+def _sf_digest(schedfun):
+  state = repr(sorted(vars(schedfun).items()))
+  return [ type(schedfun).__module__, type(schedfun).__qualname__,
+           _source_digest(type(schedfun)), state ]
+
+def _windows_spec(windows):
+  return [ [ w.start, w.stop, w.name ] for w in windows ]
+
+class Cache(object):
+  def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+    self.path      = path
+    self.max_bytes = max_bytes
+    self.hits      = 0
+    self.misses    = 0
+    # bytes of the entries, None until the directory is listed
+    self.size      = None
+    os.makedirs(path, exist_ok=True)
+
+  """
+  Key of a simulation. kind tells what the entry holds: "run" for the report
+  of a whole simulation, "window" for the totals of its single window.
+  """
+  def key(self, schedfun, traffic_pattern, sixp_delay, max_iter, windows=None, config=None,
+          kind="run", traffic_digest=None):
+    if traffic_digest is None:
+      traffic_digest = pattern_digest(traffic_pattern)
+    windows = sim.default_windows() if windows is None else windows
+    config  = sim.DEFAULT_CONFIG if config is None else config
+    parts   = [ VERSION, kind, _source_digest(sim), _sf_digest(schedfun), traffic_digest,
+                pattern_code_digest(traffic_pattern), sixp_delay, max_iter,
+                _windows_spec(windows), repr(config) ]
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+  def __file(self, key):
+    return os.path.join(self.path, key + ".json")
+
+  """
+  The report stored under key (see simtrace.Report), None if there is none.
+  """
+  def get(self, key):
+    path = self.__file(key)
+    try:
+      with open(path) as f:
+        report = json.load(f)
+    except (OSError, ValueError):
+      self.misses += 1
+      return None
+    try:
+      os.utime(path) # most recently used
+    except FileNotFoundError:
+      # evicted in between, by another cache on the same directory
+      self.misses += 1
+      return None
+    self.hits += 1
+    return simtrace.Report(report)
+
+  """
+  Store the totals and windows of a finished simulation (or anything with
+  totals() and windows, as a simtrace.Report) under key, return them as a
+  simtrace.Report.
+  """
+  def put(self, key, simulation):
+    report = {
+      "totals" : simulation.totals(),
+      "windows": [ { "name": w.name, "start": w.start, "stop": w.stop, "totals": w.totals() }
+                   for w in simulation.windows ] }
+    fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+      json.dump(report, f)
+    length = os.path.getsize(tmp)
+    os.replace(tmp, self.__file(key))
+    if self.size is not None:
+      self.size += length
+    if self.size is None or self.size > self.max_bytes:
+      self.__evict()
+    return simtrace.Report(report)
+
+  def __evict(self):
+    entries = []
+    size    = 0
+    for entry in os.scandir(self.path):
+      if entry.name.endswith(".json"):
+        try:
+          stat = entry.stat()
+        except FileNotFoundError:
+          continue
+        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        size += stat.st_size
+    if size > self.max_bytes:
+      entries.sort()
+      for _, length, path in entries:
+        if size <= self.max_bytes * EVICT_TO:
+          break
+        try:
+          os.remove(path)
+        except OSError:
+          pass
+        size -= length
+    self.size = size
+
+  def clear(self):
+    for entry in os.scandir(self.path):
+      if entry.name.endswith(".json"):
+        os.remove(entry.path)
+    self.size = 0
+
+  """
+  Final report of a simulation, from the cache when it has it, else simulated
+  (with fast_forward) and stored. PrintPlot.end prints it, sim.Summary(params,
+  report) gives its percentages.
+  """
+  def report(self, schedfun, traffic_pattern, sixp_delay, max_iter, windows=None, config=None):
+    key    = self.key(schedfun, traffic_pattern, sixp_delay, max_iter, windows, config)
+    report = self.get(key)
+    if report is None:
+      simulation = sim.Simulation(max_iter, sixp_delay, traffic_pattern, schedfun, sim.PrintNull,
+                                  windows, fast_forward=True, config=config)
+      simulation.run()
+      report = self.put(key, simulation)
+    return report
+
+  """
+  Same as sim.sweep, only the parameter sets missing from the cache are simulated.
+  """
+  def sweep(self, sf_factory, grid, traffic_pattern, sixp_delay, max_iter, window=None,
+            max_workers=None, config=None, threads=False):
+    grid    = list(grid)
+    digest  = pattern_digest(traffic_pattern)
+    windows = [] if window is None else [ window ]
+    kind    = "run" if window is None else "window"
+
+    keys      = []
+    summaries = []
+    for params in grid:
+      schedfun = sf_factory(**params) if isinstance(params, dict) else sf_factory(*params)
+      key      = self.key(schedfun, traffic_pattern, sixp_delay, max_iter, windows, config,
+                          kind, digest)
+      report   = self.get(key)
+      keys.append(key)
+      summaries.append(None if report is None else sim.Summary(params, report))
+
+    missing = [ i for i, summary in enumerate(summaries) if summary is None ]
+    if missing:
+      results = sim.sweep(sf_factory, [ grid[i] for i in missing ], traffic_pattern, sixp_delay,
+                          max_iter, window, max_workers, config, threads)
+      for i, summary in zip(missing, results):
+        self.put(keys[i], _Totals(summary))
+        summaries[i] = summary
+    return summaries
+
+"""
+The totals of a Summary, stored without windows.
+"""
+class _Totals(object):
+  def __init__(self, summary):
+    self.summary = summary
+    self.windows = []
+
+  def totals(self):
+    return [ getattr(self.summary, k) for k in sim.TOTALS ]
@@ -0,0 +1,282 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import sys
+
+# Downsampling of the per-SFrame output for the plots. An 86400 rows .data
+# file holds far more points than a plot can show. The rows are grouped in
+# buckets of a fixed number of SFrames and each bucket is written as one or
+# two rows in the text layout of PrintPlot (same columns, final report
+# included), so the gnuplot scripts read them as they are, with the x axis
+# taken from the iter column (using 1:n).
+#
+# Each column is aggregated over the bucket as:
+#   min, max, mean: one value for the bucket
+#   last          : value at the iteration of the row
+#   minmax        : its two extremes, in the order they occurred (the bucket
+#                   then takes two rows, at its first and last iteration,
+#                   otherwise one row at its middle iteration)
+#   steps         : exact, the rows around each change of its value are
+#                   written as they are, in addition to those of the bucket
+#
+# The very first row is written as it is too, so that a steps column read as
+# a step function from the written rows is the one of the full output.
+#
+# In mode "lttb" (Largest-Triangle-Three-Buckets), each bucket is instead the
+# one row that keeps the shape of the minmax/mean columns best, that is the
+# largest sum of their triangles with the row kept in the previous bucket and
+# the average of the next one, plus the first and last rows and those of the
+# steps columns.
+#
+#   simulation = sim.Simulation(..., downsample.Downsample(bucket=100))
+#   python downsample.py xp.data [bucket [mode]] > xp.small.data
+
+BUCKET = 100
+MODES  = [ "minmax", "mean", "lttb" ]
+AGGREGATES = [ "min", "max", "mean", "last", "minmax", "steps" ]
+
+# running totals and averages are smooth, their value at the row is enough
+SMOOTH_COLUMNS = frozenset([ "iter", "avgtraf", "tottraf", "totsixp", "totdrop" ])
+
+"""
+Aggregate of each column, from the mode and the given ones.
+"""
+def aggregates(schema, mode="minmax", columns=None):
+  if mode not in MODES:
+    raise ValueError("unknown mode %r (%s)" % (mode, ", ".join(MODES)))
+  default = "mean" if mode == "mean" else "minmax"
+  result  = {}
+  for k in schema:
+    result[k] = "last" if k in SMOOTH_COLUMNS else "steps" if k == "cells" else default
+  for k, aggregate in (columns or {}).items():
+    if aggregate not in AGGREGATES:
+      raise ValueError("unknown aggregate %r for %s (%s)" % (aggregate, k, ", ".join(AGGREGATES)))
+    if k not in result:
+      raise ValueError("no column %s" % k)
+    result[k] = aggregate
+  if result["iter"] != "last":
+    raise ValueError("the iter column is the x axis, it must be last")
+  return result
+
+"""
+Takes the rows (tuples in the order of schema) one by one with add and
+hands the rows to keep to write, bucket by bucket. finish writes what is left.
+"""
+class Downsampler(object):
+  def __init__(self, schema, write, bucket=BUCKET, mode="minmax", columns=None):
+    if bucket < 1:
+      raise ValueError("bucket must be at least 1")
+    self.schema    = list(schema)
+    self.write     = write
+    self.bucket    = bucket
+    self.mode      = mode
+    self.aggregate = aggregates(self.schema, mode, columns)
+
+    kinds          = [ self.aggregate[k] for k in self.schema ]
+    self.steps     = [ j for j, a in enumerate(kinds) if a == "steps" ]
+    self.shape     = [ j for j, a in enumerate(kinds) if a in ("minmax", "mean") ]
+    self.two_rows  = mode != "lttb" and "minmax" in kinds
+    self.rows      = []
+    self.previous  = None # last row of the previous bucket
+    # lttb: row kept in the bucket before the waiting one
+    self.kept      = None
+    self.waiting   = None
+
+  def add(self, row):
+    rows = self.rows
+    rows.append(row)
+    if len(rows) == self.bucket:
+      self.__close()
+
+  def finish(self):
+    if self.rows:
+      self.__close()
+    if self.mode == "lttb" and self.waiting is not None:
+      rows, self.waiting = self.waiting, None
+      last = rows[-1]
+      kept = [ len(rows) - 1 ]
+      if len(rows) > 1:
+        self.__lttb(rows[:-1], last)
+        kept.append(rows.index(self.kept))
+      self.__write_rows(rows, kept)
+
+  """
+  Indexes of the rows of the bucket around the changes of a steps column.
+  """
+  def __changes(self, rows):
+    marks = set()
+    for j in self.steps:
+      prev = rows[0][j] if self.previous is None else self.previous[j]
+      for i, row in enumerate(rows):
+        if row[j] != prev:
+          if i > 0:
+            marks.add(i - 1)
+          marks.add(i)
+          prev = row[j]
+    return marks
+
+  def __write_rows(self, rows, kept, made=None):
+    marks = self.__changes(rows)
+    self.previous = rows[-1]
+    out = dict(made or {})
+    for i in marks | set(kept):
+      if i not in out:
+        out[i] = rows[i]
+    for i in sorted(out):
+      self.write(out[i])
+
+  def __close(self):
+    rows, self.rows = self.rows, []
+    if self.mode == "lttb":
+      self.__lttb_bucket(rows)
+      return
+
+    n    = len(rows)
+    cols = list(zip(*rows))
+    at   = [ 0, n - 1 ] if self.two_rows and n > 1 else [ (n - 1) // 2 ]
+    made = { i: [] for i in at }
+    for k, col in zip(self.schema, cols):
+      aggregate = self.aggregate[k]
+      if aggregate == "min":
+        values = [ min(col) ] * len(at)
+      elif aggregate == "max":
+        values = [ max(col) ] * len(at)
+      elif aggregate == "mean":
+        values = [ float(sum(col)) / n ] * len(at)
+      elif aggregate == "minmax":
+        lo, hi = min(col), max(col)
+        values = [ lo, hi ] if col.index(lo) <= col.index(hi) else [ hi, lo ]
+        values = values if len(at) == 2 else [ col[at[0]] ]
+      else: # last, steps
+        values = [ col[i] for i in at ]
+      for i, v in zip(at, values):
+        made[i].append(v)
+    # the very first row is always kept, as it is (see __lttb_bucket), so that
+    # the steps columns are known from the start
+    kept = [ 0 ] + at if self.previous is None and 0 not in at else at
+    self.__write_rows(rows, kept, { i: tuple(v) for i, v in made.items() })
+
+  def __lttb_bucket(self, rows):
+    if self.kept is None and self.waiting is None:
+      # the very first row is always kept
+      self.kept = rows[0]
+      self.__write_rows(rows[:1], [ 0 ])
+      rows = rows[1:]
+      if not rows:
+        return
+    if self.waiting is not None:
+      n       = len(rows)
+      average = [ float(sum(row[j] for row in rows)) / n for j in [ 0 ] + self.shape ]
+      self.__lttb(self.waiting, average)
+      self.__write_rows(self.waiting, [ self.waiting.index(self.kept) ])
+    self.waiting = rows
+
+  """
+  Keep the row of rows with the largest triangles between the row kept before
+  and next, which is a row or the average [x] + shape columns of the next bucket.
+  """
+  def __lttb(self, rows, next):
+    a  = self.kept
+    if len(next) == len(self.schema):
+      next = [ next[0] ] + [ next[j] for j in self.shape ]
+    xa, xc = a[0], next[0]
+    best, best_area = rows[0], -1.
+    for row in rows:
+      xb   = row[0]
+      area = 0.
+      for c, j in enumerate(self.shape, 1):
+        ya    = a[j]
+        area += abs((xa - xc) * (row[j] - ya) - (xa - xb) * (next[c] - ya))
+      if area > best_area:
+        best, best_area = row, area
+    self.kept = best
+
+"""
+Print method writing the downsampled rows in the text layout of PrintPlot,
+buffered like BufferedPlot (see sim.BufferedPrint).
+"""
+class Downsample(sim.BufferedPlot):
+  def __init__(self, bucket=BUCKET, mode="minmax", columns=None, out=None, threaded=False):
+    sim.BufferedPlot.__init__(self, out=out, threaded=threaded)
+    self.bucket  = bucket
+    self.mode    = mode
+    self.columns = columns
+
+  def header(self, schedfun):
+    header = sim.BufferedPlot.header(self, schedfun)
+    schema = sim.PrintMethod.DEFAULT_SIM_ORDER + schedfun.schema()
+    self.downsampler = Downsampler(schema, lambda row: self.write(self.format % row),
+                                   self.bucket, self.mode, self.columns)
+    return header + "# downsampled: bucket %d, mode %s\n" % (self.bucket, self.mode)
+
+  def print(self, schedfun, res):
+    self.downsampler.add(self.fields(res))
+
+  def end(self, simulation):
+    self.downsampler.finish()
+    sim.BufferedPlot.end(self, simulation)
+
+def _number(text):
+  try:
+    return int(text)
+  except ValueError:
+    return float(text)
+
+"""
+Downsample a .data file written by PrintPlot. The lines that are not rows
+of the schema go through as they are: those the SF printed right away, the
+comments (final report) after the rows that are left.
+"""
+def downsample_file(lines, out=sys.stdout, bucket=BUCKET, mode="minmax", columns=None):
+  downsampler = None
+  for line in lines:
+    fields = line.split()
+    if downsampler is None:
+      out.write(line)
+      if fields[:2] == [ "#", "iter" ]:
+        schema      = fields[1:]
+        downsampler = Downsampler(schema, lambda row: out.write("".join(str(v) + " " for v in row) + "\n"),
+                                  bucket, mode, columns)
+        out.write("# downsampled: bucket %d, mode %s\n" % (bucket, mode))
+      continue
+    if line.startswith("#"):
+      downsampler.finish()
+      out.write(line)
+    elif len(fields) == len(schema):
+      downsampler.add(tuple(map(_number, fields)))
+    else:
+      out.write(line)
+  if downsampler is not None:
+    downsampler.finish()
+
+if __name__ == "__main__":
+  if len(sys.argv) < 2:
+    sys.exit("usage: %s data [bucket [mode]]" % sys.argv[0])
+  bucket = int(sys.argv[2]) if len(sys.argv) > 2 else BUCKET
+  mode   = sys.argv[3] if len(sys.argv) > 3 else "minmax"
+  with open(sys.argv[1]) as f:
+    downsample_file(f, sys.stdout, bucket, mode)
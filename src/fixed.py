@@ -0,0 +1,151 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import simbatch
+import numpy as np
+
+# Fixed allocations (SF_Fixed) for many numbers of cells at once.
+#
+# With a fixed number of cells n there is no 6P request and no decision, what
+# is left of an iteration is the TxQ:
+#   txq  = txq + traffic, what is over MAX_TXQ is dropped
+#   sent = min(txq, n), txq = txq - sent
+# so all the candidate n are simulated in one pass over the pattern, each one
+# being a lane of the arrays as in simbatch. The pass is still a Python loop
+# over the slotframes (the TxQ of one depends on the one before), only each
+# step is vectorized across the candidates. Only the first iteration is
+# special: the cells are set by SF_Fixed once the traffic is sent, what is
+# sent there goes through the MIN_CELLS cells of the new Slotframe.
+
+# iterations of the pattern handled at once
+CHUNK = 1 << 16
+
+def _pattern_chunks(traffic_pattern, start, stop):
+  if hasattr(traffic_pattern, "block"):
+    for a in range(start, stop, CHUNK):
+      yield traffic_pattern.block(a, min(a + CHUNK, stop)).tolist()
+    return
+  period = len(traffic_pattern)
+  for a in range(start, stop, CHUNK):
+    b = min(a + CHUNK, stop)
+    yield [ traffic_pattern[i % period] for i in range(a, b) ]
+
+"""
+Totals of the simulations of SF_Fixed with each number of cells of ns, as a
+simbatch.Simulation of SF_Fixed.BatchSchedulingFunction(ns) would have them.
+"""
+class FixedCells(object):
+  def __init__(self, ns, max_iter, traffic_pattern, windows=None, config=None):
+    self.ns              = np.asarray(ns, dtype=np.int64).ravel()
+    self.size            = len(self.ns)
+    self.max_iter        = max_iter
+    self.traffic_pattern = traffic_pattern
+    self.config          = sim.DEFAULT_CONFIG if config is None else config
+    self.window_specs    = sim.default_windows() if windows is None else windows
+    self.run()
+
+  def totals(self):
+    return [
+      np.zeros(self.size, dtype=np.int64),
+      self.total_drop.copy(),
+      self.total_traffic,
+      self.total_cells.copy(),
+      self.total_cells - self.total_used_cells,
+      self.total_used_cells.copy() ]
+
+  def __advance(self, stop):
+    ns      = self.ns
+    max_txq = self.config.max_txq
+    txq     = self.txq
+    drop    = self.total_drop
+    used    = self.total_used_cells
+    for traffic in _pattern_chunks(self.traffic_pattern, self.iter_idx, stop):
+      for a in traffic:
+        txq += a
+        over = np.maximum(txq - max_txq, 0)
+        txq -= over
+        drop += over
+        sent = np.minimum(txq, ns)
+        txq -= sent
+        used += sent
+      self.total_traffic += sum(traffic)
+    self.total_cells += (stop - self.iter_idx) * ns
+    self.iter_idx     = stop
+
+  def run(self):
+    size = self.size
+    self.iter_idx         = 0
+    self.txq              = np.zeros(size, dtype=np.int64)
+    self.total_drop       = np.zeros(size, dtype=np.int64)
+    self.total_traffic    = 0
+    self.total_cells      = np.zeros(size, dtype=np.int64)
+    self.total_used_cells = np.zeros(size, dtype=np.int64)
+
+    self.windows = [ w.copy() for w in self.window_specs ]
+    stop         = self.max_iter + 1
+    boundaries   = sorted({ w.start for w in self.windows if w.start < stop } |
+                          { w.stop for w in self.windows if w.stop is not None and w.stop < stop })
+    snapshots    = {}
+
+    for boundary in boundaries + [ stop ]:
+      if boundary > 0 and self.iter_idx == 0:
+        # the first iteration sends through the MIN_CELLS cells of the new Slotframe
+        traffic = next(_pattern_chunks(self.traffic_pattern, 0, 1))[0]
+        self.txq += traffic
+        over = np.maximum(self.txq - self.config.max_txq, 0)
+        self.txq              -= over
+        self.total_drop       += over
+        sent = np.minimum(self.txq, self.config.min_cells)
+        self.txq              -= sent
+        self.total_used_cells += sent
+        self.total_traffic    += traffic
+        self.total_cells      += self.ns
+        self.iter_idx          = 1
+      if boundary > self.iter_idx:
+        self.__advance(boundary)
+      snapshots[boundary] = self.totals()
+
+    final = snapshots[stop]
+    for w in self.windows:
+      begin = snapshots.get(w.start, final)
+      end   = final if w.stop is None else snapshots.get(w.stop, final)
+      w.set_totals([ b - a for a, b in zip(begin, end) ])
+    self.total_sixp = np.zeros(size, dtype=np.int64)
+
+  """
+  Totals of each number of cells, in the order of ns.
+  """
+  def results(self):
+    return [ simbatch.Result(self, lane) for lane in range(self.size) ]
+
+"""
+Smallest number of cells of ns without any drop in the given window, None if
+there is none. ns may be in any order.
+"""
+def fewest_cells_without_drop(fixed, window=0):
+  ok = fixed.windows[window].total_drop == 0
+  return int(fixed.ns[ok].min()) if ok.any() else None
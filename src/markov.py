@@ -0,0 +1,198 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import table
+import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
+
+# Exact long-run behavior of a memoryless scheduling function (SF_Fixed,
+# SF_DQSF_1SF, SF_DUMB: state() is empty) under i.i.d. traffic.
+#
+# The simulation is then a Markov chain whose state, at the start of an
+# iteration, is the TxQ, the cells allocated and the pending 6P requests.
+# The chain is built by running one iteration of Simulation.__next__ from each
+# reachable state with each traffic value (table.step), so it has the exact
+# semantics of the simulator (bounds of the Config, 6P delay and the walk of
+# the pending requests). Its stationary distribution gives the expected drops, 6P
+# requests and cells per slotframe, the limits of the totals of a long
+# simulation with the same traffic distribution.
+#
+# The pending 6P requests are part of the state, and each of them multiplies
+# the number of states by the decisions it may hold. SF_Fixed has a handful of
+# states whatever the delay, but the SFs that change their cells every
+# slotframe (SF_DQSF_1SF, SF_DUMB) have tens of thousands of states at
+# sixp_delay 1 and more than 262144 at 2 with randint(0, 6). Lumping the lists
+# of pending requests with the same effect on the cells does not help: as the
+# cells are clamped after each request, no two of the lists reached have the
+# same effect. So the chains are for small delays, solve stops as soon as one
+# gets over max_states rather than building it for minutes.
+
+# default bound on the number of states of a chain, about a second to reach
+MAX_STATES = 1 << 16
+# chains solved by a direct method, the larger ones by an iterative one
+DIRECT_STATES = 4096
+TOLERANCE     = 1e-12
+POWER_ITERATIONS = 100000
+
+"""
+Distribution of random.randint(low, high), as {value: probability}.
+"""
+def randint(low, high):
+  return { v: 1. / (high - low + 1) for v in range(low, high + 1) }
+
+"""
+Stationary behavior of the chain, per slotframe, with the same percentages as sim.Summary.
+"""
+class Stationary(object):
+  def __init__(self, states, pi, traffic, drop, sixp, cells, used):
+    self.states  = states
+    self.pi      = pi
+    self.traffic = traffic
+    self.drop    = drop
+    self.sixp    = sixp
+    self.cells   = cells
+    self.used    = used
+    self.unused  = cells - used
+
+    self.pct_sixp         = sim.percent(sixp, traffic)
+    self.pct_drop         = sim.percent(drop, traffic)
+    self.pct_unused_cells = sim.percent(self.unused, cells)
+    self.pct_used_cells   = sim.percent(used, cells)
+
+  """
+  Stationary distribution of the TxQ, as {txq: probability}.
+  """
+  def txq_distribution(self):
+    dist = {}
+    for (txq, _, _), p in zip(self.states, self.pi):
+      dist[txq] = dist.get(txq, 0.) + p
+    return dist
+
+"""
+States of the only closed class of the chain, where it ends up whatever the
+state it starts from. The other states are transient.
+"""
+def _closed_class(P):
+  count, labels = scipy.sparse.csgraph.connected_components(P, directed=True, connection="strong")
+  src, dst = P.nonzero()
+  leaving  = set(labels[src[labels[src] != labels[dst]]].tolist())
+  closed   = [ c for c in range(count) if c not in leaving ]
+  if len(closed) != 1:
+    raise ValueError("the chain has %d closed classes, no single stationary distribution" % len(closed))
+  return np.flatnonzero(labels == closed[0])
+
+"""
+Stationary distribution of an irreducible chain: pi P = pi with pi[0] = 1,
+which drops one of the (redundant) balance equations and keeps the system as
+sparse as P, then normalized. Small chains are solved directly, the fill-in of
+the LU factors makes that too slow for large ones, they go through GMRES and
+then through the power method if it did not converge.
+"""
+def _stationary(P):
+  n = P.shape[0]
+  if n == 1:
+    return np.ones(1)
+  A = (P.T - scipy.sparse.identity(n)).tocsc()
+  B = A[1:, 1:]
+  r = -A[1:, 0].toarray().ravel()
+  if n <= DIRECT_STATES:
+    x = scipy.sparse.linalg.spsolve(B, r)
+  else:
+    x, info = scipy.sparse.linalg.gmres(B, r, rtol=TOLERANCE, restart=100, maxiter=1000)
+    if info != 0:
+      return _power(P)
+  pi = np.maximum(np.concatenate([ [ 1. ], np.atleast_1d(x) ]), 0)
+  return pi / pi.sum()
+
+"""
+Stationary distribution by iterating pi (I + P) / 2, the lazy chain has the
+same stationary distribution and is never periodic.
+"""
+def _power(P):
+  n  = P.shape[0]
+  PT = P.T.tocsr()
+  pi = np.full(n, 1. / n)
+  for _ in range(POWER_ITERATIONS):
+    nxt = 0.5 * (pi + PT @ pi)
+    if np.abs(nxt - pi).sum() < TOLERANCE:
+      return nxt / nxt.sum()
+    pi = nxt
+  raise ValueError("the power method did not converge in %d iterations" % POWER_ITERATIONS)
+
+"""
+Build the chain of schedfun over the traffic distribution ({value: probability})
+from the state of a new Simulation and solve its stationary distribution.
+The reachable states must end up in a single closed class, the transient
+states have a probability of 0. Raises ValueError once there are more than
+max_states states.
+"""
+def solve(schedfun, distribution, sixp_delay, config=None, max_states=MAX_STATES):
+  if schedfun.state() != ():
+    raise ValueError("the scheduling function has a state, the chain would not be finite")
+  config = sim.DEFAULT_CONFIG if config is None else config
+  sframe = sim.Slotframe(sixp_delay, config)
+  values = [ (v, p) for v, p in sorted(distribution.items()) if p > 0 ]
+
+  start  = (0, config.min_cells, ())
+  index  = { start: 0 }
+  states = [ start ]
+  src, dst, prob = [], [], []
+  # expected (drop, sixp, cells, used) of an iteration from each state
+  rewards = []
+
+  i = 0
+  while i < len(states):
+    expected = [ 0., 0., 0., 0. ]
+    for traffic, p in values:
+      nxt, reward = table.step(schedfun, sframe, states[i], traffic)
+      j = index.get(nxt)
+      if j is None:
+        if len(states) >= max_states:
+          raise ValueError("%s at sixp_delay=%d: more than %d states, the pending 6P requests "
+                           "make the chain too large (use a smaller sixp_delay or a larger "
+                           "max_states)" % (type(schedfun).__module__, sixp_delay, max_states))
+        j = index[nxt] = len(states)
+        states.append(nxt)
+      src.append(i)
+      dst.append(j)
+      prob.append(p)
+      for k in range(4):
+        expected[k] += p * reward[k]
+    rewards.append(expected)
+    i += 1
+
+  n  = len(states)
+  P  = scipy.sparse.csr_matrix((prob, (src, dst)), shape=(n, n))
+  pi = np.zeros(n)
+  members = _closed_class(P)
+  pi[members] = _stationary(P[members][:, members])
+
+  drop, sixp, cells, used = pi @ np.array(rewards)
+  traffic = sum(v * p for v, p in values)
+  return Stationary(states, pi, traffic, drop, sixp, cells, used)
@@ -0,0 +1,193 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import sys
+import tracemalloc
+
+# Memory used by a simulation, measured with tracemalloc, given to the
+# simulation as its memory:
+#
+#   tracker = memory.MemoryTracker(every=1000, budget=64 << 20)
+#   for _ in sim.Simulation(..., memory=tracker):
+#     pass
+#   tracker.json(open("xp.json", "w"))
+#
+# Bytes are counted from the start of the simulation on (the traffic pattern
+# and the scheduling function built before are not). The traced memory is
+# sampled every so many SFrames:
+#   peak  : highest traced memory, between the samples too
+#   steady: median of the samples over the second half of the run
+#   growth: bytes per SFrame over the second half, which should be 0 unless
+#           something is kept for each SFrame (RecordColumns, a leak)
+# Along with the blocks and bytes allocated per SFrame, by line of sim.py and
+# of the module of the scheduling function, and in total for each of them.
+# The heap is compared at each sample with the one of the sample before, the
+# blocks and bytes each line gained in between are added up (what it freed is
+# not taken off): a line that allocates at each SFrame counts even when its
+# blocks are freed later on. tracemalloc only sees the blocks alive at the
+# samples, with every=1 those allocated by each SFrame and alive at its end.
+#
+# tracemalloc slows the simulation down several times, it is only started
+# when it is not tracing yet (and stopped at the end). Without a tracker the
+# simulation only compares the iteration with the next sample (-1).
+
+TOP_LINES = 10
+
+class MemoryTracker(object):
+  def __init__(self, every=1000, budget=None, frames=1, report=True, file=None):
+    self.every  = every
+    self.budget = budget
+    self.frames = frames
+    self.report = report
+    self.file   = file
+    self.started = False
+    self.reset()
+
+  def reset(self):
+    self.schedfun   = None
+    self.iterations = 0
+    self.samples    = []
+    self.peak       = 0
+    self.lines      = []
+    self.modules    = {}
+    # (count, size) allocated by each line, see __allocated
+    self.allocated  = {}
+
+  def start(self, sim):
+    self.reset()
+    self.schedfun = type(sim.schedfun).__module__
+    self.files    = { os.path.abspath(sys.modules["sim"].__file__): "sim",
+                      os.path.abspath(sys.modules[self.schedfun].__file__): self.schedfun }
+    # the simulation may start over before its end (see Simulation.run)
+    tracing      = tracemalloc.is_tracing()
+    self.started = not tracing or self.started
+    if not tracing:
+      tracemalloc.start(self.frames)
+    self.snapshot = self.__snapshot()
+    tracemalloc.reset_peak()
+    self.baseline = tracemalloc.get_traced_memory()[0]
+
+  def __snapshot(self):
+    return tracemalloc.take_snapshot().filter_traces(
+      [ tracemalloc.Filter(True, path) for path in self.files ])
+
+  def sample(self, sim):
+    current, peak = tracemalloc.get_traced_memory()
+    self.samples.append((sim.iter_idx, current - self.baseline))
+    self.peak = max(self.peak, peak - self.baseline)
+    self.__allocated()
+
+  """
+  Add the blocks and bytes each line gained since the last snapshot.
+  """
+  def __allocated(self):
+    snapshot = self.__snapshot()
+    for stat in snapshot.compare_to(self.snapshot, "lineno"):
+      if stat.count_diff <= 0 and stat.size_diff <= 0:
+        continue
+      frame  = stat.traceback[0]
+      module = self.files.get(os.path.abspath(frame.filename))
+      if module is None:
+        continue
+      where = (module, frame.lineno)
+      count, size = self.allocated.get(where, (0, 0))
+      self.allocated[where] = (count + max(stat.count_diff, 0), size + max(stat.size_diff, 0))
+    self.snapshot = snapshot
+
+  def end(self, sim):
+    # tracemalloc is stopped even if the report fails
+    try:
+      self.sample(sim)
+      self.iterations = sim.iter_idx
+      self.snapshot   = None
+    finally:
+      if self.started:
+        tracemalloc.stop()
+        self.started = False
+
+    per_sframe = 1. / max(1, self.iterations)
+    self.lines   = []
+    self.modules = { name: [ 0, 0 ] for name in self.files.values() }
+    for (module, lineno), (count, size) in self.allocated.items():
+      self.modules[module][0] += count
+      self.modules[module][1] += size
+      self.lines.append(("%s:%d" % (module, lineno), count * per_sframe, size * per_sframe))
+    self.lines.sort(key=lambda line: -line[2])
+
+    if self.report:
+      self.print_report()
+
+  def steady(self):
+    tail = sorted(b for _, b in self.samples[len(self.samples) // 2:])
+    return tail[len(tail) // 2] if tail else 0
+
+  def growth(self):
+    tail = self.samples[len(self.samples) // 2:]
+    if len(tail) < 2 or tail[-1][0] == tail[0][0]:
+      return 0.
+    return float(tail[-1][1] - tail[0][1]) / (tail[-1][0] - tail[0][0])
+
+  def over_budget(self):
+    return self.budget is not None and self.peak > self.budget
+
+  def print_report(self):
+    out = self.file
+    print("#", file=out)
+    print("# Memory of the simulation (%s, %d iterations):" % (self.schedfun, self.iterations), file=out)
+    print("#   peak_bytes        :", self.peak, file=out)
+    print("#   steady_bytes      :", self.steady(), file=out)
+    print("#   growth_per_sframe : %.3f" % self.growth(), file=out)
+    if self.budget is not None:
+      print("#   budget_bytes      :", self.budget, "(over)" if self.over_budget() else "", file=out)
+    per_sframe = 1. / max(1, self.iterations)
+    for name, (count, size) in sorted(self.modules.items()):
+      print("#   %-18s: %10.4f blocks/sframe %12.3f bytes/sframe" % (
+        name, count * per_sframe, size * per_sframe), file=out)
+    for where, count, size in self.lines[:TOP_LINES]:
+      print("#     %-16s: %10.4f blocks/sframe %12.3f bytes/sframe" % (where, count, size), file=out)
+
+  def as_dict(self):
+    per_sframe = 1. / max(1, self.iterations)
+    return {
+      "schedfun"         : self.schedfun,
+      "iterations"       : self.iterations,
+      "peak_bytes"       : self.peak,
+      "steady_bytes"     : self.steady(),
+      "growth_per_sframe": self.growth(),
+      "budget_bytes"     : self.budget,
+      "over_budget"      : self.over_budget(),
+      "samples"          : self.samples,
+      "modules"          : { name: { "blocks_per_sframe": count * per_sframe,
+                                     "bytes_per_sframe" : size * per_sframe }
+                             for name, (count, size) in self.modules.items() },
+      "lines"            : [ { "line": where, "blocks_per_sframe": count, "bytes_per_sframe": size }
+                             for where, count, size in self.lines ] }
+
+  def json(self, out=sys.stdout):
+    json.dump(self.as_dict(), out, indent=1)
+    out.write("\n")
@@ -0,0 +1,130 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import sys
+import time
+
+# Time spent in each phase of Simulation.__next__, given to the simulation as
+# its timing:
+#
+#   timer = phases.PhaseTimer()
+#   for _ in sim.Simulation(..., timing=timer):
+#     pass
+#   timer.json(open("xp.json", "w"))
+#   timer.collapsed(open("xp.folded", "w")) # flamegraph.pl xp.folded > xp.svg
+#
+# The clock is read between the phases (time.perf_counter_ns), its own cost
+# goes to the phase that ends. A simulation with a timer iterates with its own
+# copy of __next__ (see sim._TimedSimulation), the one of the others does not
+# check for a timer, and Simulation.run() uses its specialized loop.
+
+PHASES = [
+  "checks",        # idle stretches, cycles and window snapshots (see Simulation)
+  "slotframe_end", # Slotframe.slotframe_end
+  "traffic",       # traffic of the SFrame, from the pattern or the Source
+  "queue",         # TxQ, drop and cells used
+  "apply",         # schedfun.apply
+  "totals",        # allocation of the decision and totals
+  "results",       # result dict, or the row of a recorder
+  "print",         # print_results.print, or the record of a recorder
+  "end" ]          # print_results.end
+
+(CHECKS, SLOTFRAME_END, TRAFFIC, QUEUE, APPLY, TOTALS, RESULTS, PRINT, END) = range(len(PHASES))
+
+clock = time.perf_counter_ns
+
+class PhaseTimer(object):
+  """
+  ns and calls are indexed like PHASES. With report, the breakdown is printed
+  after the end of the print method, as comments like those of PrintPlot.end.
+  """
+  def __init__(self, report=True, file=None):
+    self.report = report
+    self.file   = file
+    self.reset()
+
+  def reset(self):
+    self.ns         = [ 0 ] * len(PHASES)
+    self.calls      = [ 0 ] * len(PHASES)
+    self.iterations = 0
+    self.schedfun   = None
+    self.last       = 0
+
+  def start(self, sim):
+    self.schedfun = type(sim.schedfun).__module__
+
+  """
+  Start of an iteration, then end of each of its phases: the time since the
+  last reading of the clock goes to that phase.
+  """
+  def begin(self):
+    self.last = clock()
+
+  def lap(self, phase):
+    now = clock()
+    self.ns[phase]    += now - self.last
+    self.calls[phase] += 1
+    self.last          = now
+
+  def end(self, sim):
+    if self.report:
+      self.print_report()
+
+  def total_ns(self):
+    return sum(self.ns)
+
+  def print_report(self):
+    total = self.total_ns() or 1
+    out   = self.file
+    print("#", file=out)
+    print("# Phases of Simulation.__next__ (%s, %d iterations):" % (self.schedfun, self.iterations), file=out)
+    for name, ns, calls in zip(PHASES, self.ns, self.calls):
+      print("#   %-14s: %12.6f s %6.2f %% %10d calls %10.1f ns/call" % (
+        name, ns * 1e-9, 100. * ns / total, calls, float(ns) / calls if calls else 0.), file=out)
+    print("#   %-14s: %12.6f s" % ("total", self.total_ns() * 1e-9), file=out)
+
+  def as_dict(self):
+    return {
+      "schedfun"  : self.schedfun,
+      "iterations": self.iterations,
+      "total_ns"  : self.total_ns(),
+      "phases"    : [ { "name": name, "ns": ns, "calls": calls }
+                      for name, ns, calls in zip(PHASES, self.ns, self.calls) ] }
+
+  def json(self, out=sys.stdout):
+    json.dump(self.as_dict(), out, indent=1)
+    out.write("\n")
+
+  """
+  Collapsed stacks (one "frame;frame;... value" line per phase, in ns),
+  the input of flamegraph.pl and of most flame graph viewers.
+  """
+  def collapsed(self, out=sys.stdout):
+    root = "%s;Simulation.__next__" % (self.schedfun or "Simulation")
+    for name, ns in zip(PHASES, self.ns):
+      if ns > 0:
+        out.write("%s;%s %d\n" % (root, name, ns))
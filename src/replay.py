@@ -0,0 +1,223 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import traffic
+import itertools
+import json
+import math
+import struct
+import numpy as np
+
+# Replay of per-slotframe packet counts recorded on deployed nodes.
+#
+# Layout of a replay file:
+#   MAGIC
+#   header length (uint32) + JSON header (dtype, nodes, slotframes, node ids, meta)
+#   padding up to a multiple of ALIGN
+#   counts, node-major: all the slotframes of the first node, then of the second...
+#
+# The counts are a single uint8 or uint16 per slotframe and per node. The file
+# is accessed through numpy.memmap, the slotframes of a node are contiguous so
+# that a node and a time range of it are views of the file and nothing is read
+# before the simulation gets there.
+
+MAGIC = b"SFREPLAY"
+ALIGN = 64
+
+DTYPES = [ np.uint8, np.uint16 ]
+
+def _data_offset(header):
+  return -(-(len(MAGIC) + 4 + len(header)) // ALIGN) * ALIGN
+
+"""
+Write the counts of nodes x slotframes, node after node. Each call of write
+appends the next values, a node may be written in several calls.
+"""
+class ReplayWriter(object):
+  def __init__(self, path, nodes, slotframes, dtype=np.uint8, node_ids=None, meta=None):
+    dtype = np.dtype(dtype)
+    if dtype not in [ np.dtype(d) for d in DTYPES ]:
+      raise ValueError("counts are uint8 or uint16, not %s" % dtype)
+    if node_ids is not None and len(node_ids) != nodes:
+      raise ValueError("%d node ids for %d nodes" % (len(node_ids), nodes))
+
+    self.dtype   = dtype
+    self.count   = nodes * slotframes
+    self.written = 0
+    self.out     = open(path, "wb")
+
+    header = json.dumps({ "dtype": dtype.name, "nodes": nodes, "slotframes": slotframes,
+                          "node_ids": node_ids, "meta": meta }).encode()
+    self.out.write(MAGIC)
+    self.out.write(struct.pack("<I", len(header)))
+    self.out.write(header)
+    self.out.write(b"\0" * (_data_offset(header) - self.out.tell()))
+
+  def write(self, values):
+    values = np.asarray(values)
+    if len(values) and (values.min() < 0 or values.max() > np.iinfo(self.dtype).max):
+      raise ValueError("counts out of the range of %s" % self.dtype)
+    if self.written + len(values) > self.count:
+      raise ValueError("more than the %d counts of the header" % self.count)
+    self.out.write(values.astype(self.dtype.newbyteorder("<"), copy=False).tobytes())
+    self.written += len(values)
+
+  def close(self):
+    self.out.close()
+    if self.written != self.count:
+      raise ValueError("%d counts written, the header has %d" % (self.written, self.count))
+
+"""
+Write a whole replay at once from an array of nodes x slotframes.
+"""
+def write(path, counts, dtype=np.uint8, node_ids=None, meta=None):
+  counts = np.asarray(counts)
+  writer = ReplayWriter(path, counts.shape[0], counts.shape[1], dtype, node_ids, meta)
+  for series in counts:
+    writer.write(series)
+  writer.close()
+
+"""
+The counts of one node over a range of slotframes, as a traffic.Source that
+repeats after its end like a list. Values are read straight from the map.
+"""
+class NodeTrace(traffic.Source):
+  # see changes
+  _changes = None
+
+  def __init__(self, series):
+    if len(series) == 0:
+      raise ValueError("empty range of slotframes")
+    self.series = series
+    self.period = len(series)
+
+  def block(self, start, stop):
+    first = start % self.period
+    if first + stop - start <= self.period:
+      return self.series[first:first + stop - start].astype(np.int64)
+    return self.series[np.arange(start, stop) % self.period].astype(np.int64)
+
+  def values(self, start=0):
+    def chunks(first):
+      while True:
+        for i in range(first, self.period, traffic.CHUNK):
+          yield self.series[i:min(i + traffic.CHUNK, self.period)].tolist()
+        first = 0
+    return itertools.chain.from_iterable(chunks(start % self.period))
+
+  """
+  Slotframes of the range whose value differs from the one before, found
+  once, chunk by chunk, and kept (not pickled, as for traffic.RandomSource).
+  """
+  def changes(self):
+    if self._changes is None:
+      parts = [ np.zeros(0, dtype=np.int64) ]
+      for a in range(1, self.period, traffic.CHUNK):
+        b = min(a + traffic.CHUNK, self.period)
+        parts.append(np.flatnonzero(self.series[a:b] != self.series[a - 1:b - 1]) + a)
+      self._changes = np.concatenate(parts)
+    return self._changes
+
+  """
+  Value at slotframe i and the first slotframe after i with another value
+  (inf if the whole range is that value), see traffic.RunLength.run.
+  O(log changes) once the changes are known.
+  """
+  def run(self, i):
+    first   = i % self.period
+    value   = int(self.series[first])
+    changes = self.changes()
+    if len(changes) == 0:
+      return value, math.inf
+    k = int(np.searchsorted(changes, first, side="right"))
+    if k < len(changes):
+      return value, i - first + int(changes[k])
+    # the last run goes on with the first one as the range repeats
+    stop = i - first + self.period
+    if int(self.series[0]) == value:
+      stop += int(changes[0])
+    return value, stop
+
+  def __getstate__(self):
+    state = dict(vars(self))
+    state.pop("_changes", None)
+    return state
+
+  def __repr__(self):
+    return "NodeTrace(<%d slotframes>)" % self.period
+
+class Replay(object):
+  def __init__(self, path):
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+      raise ValueError("%s: not a replay" % path)
+
+    (length,)  = struct.unpack("<I", bytes(data[len(MAGIC):len(MAGIC) + 4]))
+    raw        = bytes(data[len(MAGIC) + 4:len(MAGIC) + 4 + length])
+    header     = json.loads(raw)
+
+    self.nodes      = header["nodes"]
+    self.slotframes = header["slotframes"]
+    self.node_ids   = header["node_ids"]
+    self.meta       = header["meta"]
+    self.dtype      = np.dtype(header["dtype"]).newbyteorder("<")
+    self.counts     = np.memmap(path, dtype=self.dtype, mode="r", offset=_data_offset(raw),
+                                shape=(self.nodes, self.slotframes))
+    self.rows       = None if self.node_ids is None else \
+                      { node: row for row, node in enumerate(self.node_ids) }
+
+  def __len__(self):
+    return self.nodes
+
+  """
+  Row of a node, given by its id when the replay has them, else by its index.
+  """
+  def row(self, node):
+    if self.rows is None:
+      if not 0 <= node < self.nodes:
+        raise KeyError(node)
+      return node
+    return self.rows[node]
+
+  """
+  Counts of a node for the slotframes [start, stop), a view of the file.
+  """
+  def series(self, node, start=0, stop=None):
+    return self.counts[self.row(node), start:stop]
+
+  """
+  Traffic pattern of a node for the slotframes [start, stop), for a Simulation.
+  """
+  def source(self, node, start=0, stop=None):
+    return NodeTrace(self.series(node, start, stop))
+
+  """
+  Traffic patterns of several nodes (all of them by default).
+  """
+  def sources(self, nodes=None, start=0, stop=None):
+    if nodes is None:
+      nodes = range(self.nodes) if self.node_ids is None else self.node_ids
+    return [ self.source(node, start, stop) for node in nodes ]
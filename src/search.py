@@ -0,0 +1,268 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import math
+import numpy as np
+
+# Search of the parameters of a scheduling function that minimize an objective
+# over the results of its simulations, in far fewer simulations than a grid.
+#
+#   golden   : one parameter, a coarse scan then a golden-section search
+#              around its best point
+#   bayesian : several parameters, a Gaussian process fitted to the results so
+#              far picks the next batch of points by expected improvement
+#
+# Each batch of simulations goes through sim.sweep (or Cache.sweep), so the
+# simulations of a batch run in parallel.
+
+GOLDEN = (math.sqrt(5) - 1) / 2
+
+"""
+Objective as a weighted sum of the percentages of the summary of a simulation.
+"""
+def weighted(sixp=1., drop=1., unused=1.):
+  def objective(summary):
+    return sixp * summary.pct_sixp + drop * summary.pct_drop + unused * summary.pct_unused_cells
+  return objective
+
+"""
+The simulations to run for a parameter set and the objective to minimize.
+The parameter sets are given to sf_factory as by sim.sweep, a cache.Cache
+avoids the simulations already done. Every evaluation is kept in history
+as (params, value, summary) and is done only once.
+"""
+class Problem(object):
+  def __init__(self, sf_factory, traffic_pattern, sixp_delay, max_iter, objective=None,
+               window=None, config=None, max_workers=None, threads=False, cache=None):
+    self.sf_factory      = sf_factory
+    self.traffic_pattern = traffic_pattern
+    self.sixp_delay      = sixp_delay
+    self.max_iter        = max_iter
+    self.objective       = weighted() if objective is None else objective
+    self.window          = window
+    self.config          = config
+    self.max_workers     = max_workers
+    self.threads         = threads
+    self.cache           = cache
+    self.history         = []
+    self.values          = {}
+
+  """
+  Values of the objective for the parameter sets, simulated in one sweep.
+  """
+  def evaluate(self, grid):
+    grid    = [ tuple(params) for params in grid ]
+    missing = list(dict.fromkeys(p for p in grid if p not in self.values))
+    if missing:
+      run = sim.sweep if self.cache is None else self.cache.sweep
+      summaries = run(self.sf_factory, missing, self.traffic_pattern, self.sixp_delay,
+                      self.max_iter, self.window, self.max_workers, self.config, self.threads)
+      for params, summary in zip(missing, summaries):
+        value = self.objective(summary)
+        self.values[params] = value
+        self.history.append((params, value, summary))
+    return [ self.values[params] for params in grid ]
+
+  """
+  Best (params, value, summary) evaluated so far.
+  """
+  def best(self):
+    return min(self.history, key=lambda h: h[1])
+
+"""
+A parameter in [low, high], spaced logarithmically with log, rounded with integer.
+"""
+class Dimension(object):
+  def __init__(self, low, high, log=False, integer=False):
+    if log and low <= 0:
+      raise ValueError("a logarithmic dimension needs low > 0")
+    self.low     = low
+    self.high    = high
+    self.log     = log
+    self.integer = integer
+
+  """
+  Value at u in [0, 1].
+  """
+  def value(self, u):
+    u = float(u)
+    if self.log:
+      x = math.exp(math.log(self.low) + u * (math.log(self.high) - math.log(self.low)))
+    else:
+      x = self.low + u * (self.high - self.low)
+    if self.integer:
+      return int(round(x))
+    return min(max(x, self.low), self.high)
+
+  """
+  Position in [0, 1] of a value.
+  """
+  def unit(self, x):
+    if self.high == self.low:
+      return 0.
+    if self.log:
+      return (math.log(x) - math.log(self.low)) / (math.log(self.high) - math.log(self.low))
+    return (x - self.low) / (self.high - self.low)
+
+"""
+Minimize over one parameter, a Dimension, the parameter set being make_params(x).
+The objective is first evaluated at scan points spread over the dimension (one
+sweep), then a golden-section search narrows the interval around the best of
+them until it is shorter than tol (as a fraction of the dimension). It assumes
+the objective has a single minimum around there, not on the whole dimension.
+Returns the best (params, value, summary) of the problem.
+"""
+def golden(problem, make_params, dimension, tol=1e-3, scan=16, max_evals=64):
+  f = lambda us: problem.evaluate([ make_params(dimension.value(u)) for u in us ])
+
+  us = [ i / (scan - 1) for i in range(scan) ]
+  ys = f(us)
+  lo = hi = min(range(scan), key=lambda i: ys[i])
+  # the objective is often a staircase, the whole step of the best point is bracketed
+  while lo > 0 and ys[lo - 1] == ys[lo]:
+    lo -= 1
+  while hi < scan - 1 and ys[hi + 1] == ys[hi]:
+    hi += 1
+  a = us[max(lo - 1, 0)]
+  b = us[min(hi + 1, scan - 1)]
+
+  # the two inner points of [a, b], only one new evaluation per step
+  c = b - GOLDEN * (b - a)
+  d = a + GOLDEN * (b - a)
+  fc, fd = f([ c, d ])
+  evals = scan + 2
+  while b - a > tol and evals < max_evals:
+    if fc <= fd:
+      b, d, fd = d, c, fc
+      c  = b - GOLDEN * (b - a)
+      fc = f([ c ])[0]
+    else:
+      a, c, fc = c, d, fd
+      d  = a + GOLDEN * (b - a)
+      fd = f([ d ])[0]
+    evals += 1
+  return problem.best()
+
+def _matern52(a, b, length):
+  r = np.sqrt(np.maximum(((a[:, None, :] - b[None, :, :]) ** 2).sum(-1), 0)) / length
+  return (1 + math.sqrt(5) * r + 5. / 3. * r * r) * np.exp(-math.sqrt(5) * r)
+
+"""
+Gaussian process on [0, 1]^d with a Matern 5/2 kernel. The length scale is
+the one of LENGTHS that maximizes the marginal likelihood of the observations.
+"""
+class _GaussianProcess(object):
+  LENGTHS = [ 0.05, 0.1, 0.2, 0.4, 0.8, 1.6 ]
+  NOISE   = 1e-4
+
+  def __init__(self, x, y, length=None):
+    self.x     = x
+    self.mean  = y.mean()
+    self.scale = y.std() if y.std() > 0 else 1.
+    z = (y - self.mean) / self.scale
+    if length is None:
+      length = max(self.LENGTHS, key=lambda l: self.__fit(z, l)[0])
+    _, self.chol, self.alpha = self.__fit(z, length)
+    self.length = length
+
+  def __fit(self, z, length):
+    k = _matern52(self.x, self.x, length) + self.NOISE * np.eye(len(self.x))
+    chol  = np.linalg.cholesky(k)
+    alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, z))
+    likelihood = -0.5 * z @ alpha - np.log(np.diag(chol)).sum()
+    return likelihood, chol, alpha
+
+  def predict(self, x):
+    ks  = _matern52(self.x, x, self.length)
+    mu  = ks.T @ self.alpha
+    v   = np.linalg.solve(self.chol, ks)
+    var = np.maximum(1 - (v * v).sum(0), 1e-12)
+    return self.mean + self.scale * mu, self.scale * np.sqrt(var)
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+def _expected_improvement(mu, sigma, best):
+  z   = (best - mu) / sigma
+  cdf = 0.5 * (1 + _erf(z / math.sqrt(2)).astype(float))
+  pdf = np.exp(-0.5 * z * z) / math.sqrt(2 * math.pi)
+  return (best - mu) * cdf + sigma * pdf
+
+"""
+Minimize over several parameters, one Dimension each, the parameter set being
+the tuple of their values. After initial random points, a Gaussian process
+fitted to all the evaluations picks each batch: the point of most expected
+improvement among random candidates (and around the best points), then again
+as if that point had the predicted value, batch times. A batch is one sweep.
+Returns the best (params, value, summary) of the problem.
+"""
+def bayesian(problem, dimensions, initial=None, batch=4, max_evals=60, candidates=2048, seed=None):
+  rng     = np.random.default_rng(seed)
+  d       = len(dimensions)
+  initial = 2 * d + 2 if initial is None else initial
+
+  def params(u):
+    return tuple(dim.value(x) for dim, x in zip(dimensions, u))
+
+  def unit(p):
+    return [ dim.unit(x) for dim, x in zip(dimensions, p) ]
+
+  problem.evaluate([ params(u) for u in rng.random((initial, d)) ])
+  while len(problem.history) < max_evals:
+    seen = [ h[0] for h in problem.history ]
+    x    = np.array([ unit(p) for p in seen ])
+    y    = np.array([ h[1] for h in problem.history ])
+    gp   = _GaussianProcess(x, y)
+
+    # random candidates, plus some around the best points
+    near = x[np.argsort(y)[:4]]
+    cand = np.concatenate([
+      rng.random((candidates, d)),
+      np.clip(np.repeat(near, candidates // 8, 0) + rng.normal(0, 0.05, (len(near) * (candidates // 8), d)), 0, 1) ])
+    # the values are rounded for integer dimensions, the process sees them as they are
+    cand = np.array([ unit(params(u)) for u in cand ])
+
+    chosen = []
+    taken  = set(seen)
+    for _ in range(min(batch, max_evals - len(problem.history))):
+      mu, sigma = gp.predict(cand)
+      ei = _expected_improvement(mu, sigma, y.min())
+      for j in np.argsort(-ei):
+        p = params(cand[j])
+        if p not in taken:
+          break
+      else:
+        break
+      taken.add(p)
+      chosen.append(p)
+      # believe the prediction for the rest of the batch
+      x  = np.vstack([ x, cand[j] ])
+      y  = np.append(y, mu[j])
+      gp = _GaussianProcess(x, y, gp.length)
+    if not chosen:
+      break
+    problem.evaluate(chosen)
+  return problem.best()
@@ -24,10 +24,41 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import array
+import bisect
+import functools
+import io
+import itertools
+import math
+import operator
+import phases
+import queue
+import sys
+import threading
+
+# defaults of Config
 MAX_TXQ   = 10
 MAX_CELLS = 100
 MIN_CELLS = 0
 
+"""
+Bounds of a simulation: size of the TxQ and number of cells that can be allocated.
+It is given to the Simulation, which hands it to its Slotframe, and the scheduling
+functions read it from there (sframe.config), so that simulations with different
+bounds can run side by side in the same process.
+"""
+class Config(object):
+  def __init__(self, max_txq=MAX_TXQ, max_cells=MAX_CELLS, min_cells=MIN_CELLS):
+    self.max_txq   = max_txq
+    self.max_cells = max_cells
+    self.min_cells = min_cells
+
+  def __repr__(self):
+    return "Config(max_txq=%r, max_cells=%r, min_cells=%r)" % (self.max_txq, self.max_cells, self.min_cells)
+
+DEFAULT_CONFIG = Config()
+
 """
 Compute the Exponential Weighter Moving Maximum.
 See ewmm_test for an example.
@@ -51,7 +82,125 @@ def ewmm2(e, x, alpha):
 def ewma(e, x, alpha):
   return x * alpha + (1 - alpha) * e
 
+"""
+Closed forms of k successive updates with the same x, used to skip idle SFrames.
+Up to floating point rounding they give what k calls of ewma or ewmm would.
+"""
+def ewma_k(e, x, alpha, k):
+  if k == 0:
+    return e
+  return x + (1 - alpha) ** k * (e - x)
+
+def ewmm_k(e, x, alpha, k):
+  if k == 0:
+    return e
+  prev = (1 - alpha) ** (k - 1) * e
+  if x >= prev:
+    return x
+  return (1 - alpha) * prev
+
+"""
+What k successive e = max(0, e - alpha) give, without rounding errors.
+The thresholds of the scheduling functions are often met exactly (e.g. 1000 - 0.05 * 20),
+so e - k * alpha is not enough. But as long as e stays within the same power of two,
+subtracting alpha always subtracts the same multiple of the ulp.
+"""
+def ewmm2_decay(e, alpha, k):
+  while k > 0 and e > 0:
+    _, exp = math.frexp(e)
+    ulp    = math.ldexp(1.0, exp - 53)
+    low    = math.ldexp(1.0, exp - 1)
+    steps  = alpha / ulp
+    if steps - math.floor(steps) != 0.5: # otherwise the rounding depends on e
+      step = round(steps) * ulp
+      if step == 0:
+        return e
+      # keep one step away from the lower power of two
+      bulk = min(k, int((e - low) // step) - 1)
+      if bulk > 0:
+        e -= bulk * step
+        k -= bulk
+        continue
+    e  = max(0, e - alpha)
+    k -= 1
+  return e
+
+def ewmm2_k(e, x, alpha, k):
+  if k == 0:
+    return e
+  prev = ewmm2_decay(e, alpha, k - 1)
+  if x >= prev:
+    return x
+  return max(0, prev - alpha)
+
+"""
+Smallest k >= 1 such that pred(k), pred being monotone. None if there is none.
+"""
+def first_true(pred):
+  hi = 1
+  while not pred(hi):
+    if hi >= 1 << 62:
+      return None
+    hi *= 2
+  lo = hi // 2
+  while hi - lo > 1:
+    mid = (lo + hi) // 2
+    if pred(mid):
+      hi = mid
+    else:
+      lo = mid
+  return hi
+
+"""
+Number of updates after which ewmm_k (or ewmm2_k) sticks to x, None if it never does.
+Before that the estimator only decays.
+"""
+def ewmm_stick(e, x, alpha):
+  return first_true(lambda k: x >= (1 - alpha) ** (k - 1) * e)
+
+def ewmm2_stick(e, x, alpha):
+  return first_true(lambda k: x >= ewmm2_decay(e, alpha, k - 1))
+
+"""
+Number of idle SFrames, at most n, that go by before the scheduling function
+takes a decision, decide(j) telling whether it does at the j-th one.
+The decision only depends on a few rounded estimators, quantities is a list of
+(f, stick) where f(j) is one of them after j idle SFrames. It is monotone,
+except that it may jump to its fixed point at the SFrame stick (None if never).
+The decision cannot change in between, so we only look where one of them moves.
+"""
+def idle_sframes(n, decide, quantities):
+  candidates = { 1 }
+  for f, stick in quantities:
+    pieces = [ (1, n) ]
+    if stick is not None and 1 < stick <= n:
+      pieces = [ (1, stick - 1), (stick, n) ]
+      candidates.add(stick)
+    for lo, hi in pieces:
+      j, v = lo, f(lo)
+      while j < hi and f(hi) != v:
+        # first SFrame of (j, hi] where f moves
+        a, b = j, hi
+        while b - a > 1:
+          mid = (a + b) // 2
+          if f(mid) == v:
+            a = mid
+          else:
+            b = mid
+        candidates.add(b)
+        j, v = b, f(b)
+  for j in sorted(candidates):
+    if j > n:
+      break
+    if decide(j):
+      return j - 1
+  return n
+
 class SchedulingFunction(object):
+  # file where the SF prints what it reports on its own (print(..., file=self.out)),
+  # None for sys.stdout; a buffered print method hands itself (see BufferedPrint)
+  out = None
+
   def schema(self):
     raise NotImplementedError
   def apply(self,
@@ -62,45 +211,53 @@ class SchedulingFunction(object):
       txq,       # Current size of TxQ
       old_txq):  # TxQ of the last SFrame
     raise NotImplementedError
-
-class SixpRequest(object):
-  sixp_request_id = 0
-
-  def __init__(self, ttl, decision):
-    self.ttl = ttl           # ttl until decision is done
-    self.decision = decision # number of cells to alloc/dealloc
-    self.id = SixpRequest.sixp_request_id
-    SixpRequest.sixp_request_id += 1
-
   """
-  If the request should be applied, updated the value of nb_cells_allocated accordingly.
-  Also update the TTL.
+  Hashable snapshot of everything that apply() carries from one SFrame to the next.
+  Used to detect when a simulation goes round in circles (see Simulation fast_forward).
   """
-  def apply(self):
-    if self.ttl == 0:
-      self.ttl -= 1
-      return self.decision
-    self.ttl -= 1
-    return 0
-
+  def state(self):
+    raise NotImplementedError
   """
-  Return true if the request has expired (the decision was applied)
-  and it should now be deleted.
+  Inverse of state(): apply() then goes on as from the SFrame of that snapshot.
+  Used to replay transitions from any state (see table.py).
   """
-  def is_expired(self):
-    return self.ttl < 0
-
-  def __repr__(self):
-    return "6P[%d,%d,%d]" % (self.id,self.ttl,self.decision)
+  def set_state(self, state):
+    raise NotImplementedError
+  """
+  Called by Simulation (see skip_idle) before an idle stretch of at most n SFrames,
+  i.e. no traffic, an empty TxQ and no pending 6P request, the cells of sframe
+  being all unused. Returns how many of these SFrames go by without any decision,
+  its state being updated as if apply() had been called for each of them.
+  """
+  def skip_idle(self, sframe, n):
+    raise NotImplementedError
+  """
+  Body of apply() for Simulation.run(), None (the default) to call apply().
+  Returns (attrs, code): code is run for each SFrame with iter_idx, sframe, traffic,
+  drop, txq and old_txq, the cells allocated and used in this SFrame as cells and used,
+  the Config of the simulation as config and each attribute in attrs as a local
+  variable, and it must set decision.
+  It must do the same floating point operations as apply() so that the results are the same.
+  """
+  def inline(self):
+    return None
 
 class Slotframe(object):
-  def __init__(self, sixp_delay):
-    self.cells_allocated = MIN_CELLS
+  def __init__(self, sixp_delay, config=DEFAULT_CONFIG):
+    self.config          = config
+    self.cells_allocated = config.min_cells
     self.cells_used      = 0
     self.sixp_delay      = sixp_delay
-    self.sixp_requests   = []
     self.total_sixp      = 0
 
+    # Pending 6P requests, oldest first, as the TTL until the decision is done
+    # and the number of cells to alloc/dealloc of each. All of them have the same
+    # delay, so there are never more than sixp_delay + 2 of them at once.
+    capacity = sixp_delay + 2
+    self.sixp_ttl      = [ 0 ] * capacity
+    self.sixp_decision = [ 0 ] * capacity
+    self.sixp_count    = 0
+
   # access by SF
   def get_cells_allocated(self):
     return self.cells_allocated
@@ -113,12 +270,18 @@ class Slotframe(object):
   Allocation of deallocation (use negative number to deallocate).
   """
   def allocate(self, n):
-    self.sixp_requests.append(SixpRequest(self.sixp_delay, n))
+    if self.sixp_count == len(self.sixp_ttl):
+      self.sixp_ttl      += [ 0 ] * len(self.sixp_ttl)
+      self.sixp_decision += [ 0 ] * len(self.sixp_decision)
+    self.sixp_ttl[self.sixp_count]      = self.sixp_delay
+    self.sixp_decision[self.sixp_count] = n
+    self.sixp_count += 1
     self.total_sixp += 1
 
   # accessed by Simulation
   def slotframe_end(self):
-    self.__apply_sixp_requests()
+    if self.sixp_count != 0:
+      self.__apply_sixp_requests()
     self.cells_used = 0
 
   """
@@ -133,46 +296,402 @@ class Slotframe(object):
     return self.cells_used
 
   def pending_sixp_requests(self):
-    return len(self.sixp_requests)
+    return self.sixp_count
 
   def total_sixp_requests(self):
     return self.total_sixp
 
   """
-  Effective allocation (the SixpRequest completed).
+  Pending 6P requests, oldest first, as (ttl, decision).
+  """
+  def sixp_requests(self):
+    return tuple(zip(self.sixp_ttl[:self.sixp_count], self.sixp_decision[:self.sixp_count]))
+
+  """
+  Effective allocation (the 6P request completed).
   """
   def __effective_allocation(self, n):
     self.cells_allocated += n
-    if self.cells_allocated > MAX_CELLS:
-      self.cells_allocated = MAX_CELLS
-    if self.cells_allocated < MIN_CELLS:
-      self.cells_allocated = MIN_CELLS
+    if self.cells_allocated > self.config.max_cells:
+      self.cells_allocated = self.config.max_cells
+    if self.cells_allocated < self.config.min_cells:
+      self.cells_allocated = self.config.min_cells
 
+  """
+  Each request counts down its TTL, the decision is done once it reaches 0
+  and the request is removed. The requests used to be a list that was shortened
+  while being enumerated, so the request that follows a removed one is skipped
+  for this slotframe (it is done one slotframe later). We keep doing so,
+  the results would change otherwise.
+  """
   def __apply_sixp_requests(self):
-    for i, req in enumerate(self.sixp_requests):
-      decision = req.apply()
-      if decision != 0:
-        self.__effective_allocation(decision)
-      if req.is_expired():
-        del self.sixp_requests[i]
+    ttls      = self.sixp_ttl
+    decisions = self.sixp_decision
+    kept      = 0
+    skip      = False
+    for i in range(self.sixp_count):
+      ttl = ttls[i]
+      if skip:
+        skip = False
+      else:
+        if ttl == 0:
+          self.__effective_allocation(decisions[i])
+        ttl -= 1
+        if ttl < 0:
+          skip = True
+          continue
+      ttls[kept]      = ttl
+      decisions[kept] = decisions[i]
+      kept += 1
+    self.sixp_count = kept
+
+# totals of a simulation, in the order of Simulation.totals
+TOTALS = [
+  "total_sixp",
+  "total_drop",
+  "total_traffic",
+  "total_cells",
+  "total_unused_cells",
+  "total_used_cells" ]
+
+"""
+Measurement window over the iterations [start, stop) of a simulation,
+stop=None being the end of the simulation.
+Once the simulation is over the window holds the totals of these iterations
+under the same names as the totals of Simulation.
+"""
+class Window(object):
+  def __init__(self, start, stop=None, name=None):
+    self.start = start
+    self.stop  = stop
+    if name is None:
+      if stop is None:
+        name = "After t=%d" % (start - 1)
+      else:
+        name = "From t=%d to t=%d" % (start, stop)
+    self.name = name
+    self.set_totals([ 0 ] * len(TOTALS))
+
+  def set_totals(self, totals):
+    (self.total_sixp,
+     self.total_drop,
+     self.total_traffic,
+     self.total_cells,
+     self.total_unused_cells,
+     self.total_used_cells) = totals
+
+  def totals(self):
+    return [ getattr(self, k) for k in TOTALS ]
+
+  def copy(self):
+    return Window(self.start, self.stop, self.name)
+
+  """
+  Consecutive windows of period iterations (e.g. hourly buckets) from start to stop.
+  """
+  @staticmethod
+  def every(period, stop, start=0):
+    return [ Window(t, min(t + period, stop)) for t in range(start, stop, period) ]
+
+  def __repr__(self):
+    return "Window[%s]" % self.name
+
+# everything after the first hour, which is the warm-up of the scheduling functions
+def default_windows():
+  return [ Window(3601, name="After t=3600") ]
+
+"""
+For each iteration of a traffic pattern, number of SFrames without traffic
+from there on, the pattern starting over after its end (inf if it is all zeros).
+"""
+def zero_runs(pattern):
+  runs = [ 0 ] * len(pattern)
+  run  = 0
+  for i in range(len(pattern) - 1, -1, -1):
+    run     = run + 1 if pattern[i] == 0 else 0
+    runs[i] = run
+  if runs[0] == len(pattern):
+    return [ math.inf ]
+  # the zeros at the end continue with those at the start
+  i = len(pattern) - 1
+  while i >= 0 and pattern[i] == 0:
+    runs[i] += runs[0]
+    i -= 1
+  return runs
+
+"""
+Spans of the iterations of a pattern from which at least min_skip SFrames have
+no traffic, from its zero_runs: the lists of their begins and of their ends.
+"""
+def idle_spans(runs, min_skip):
+  begins, ends = [], []
+  for i, n in enumerate(runs):
+    if n < min_skip:
+      continue
+    if ends and ends[-1] == i:
+      ends[-1] = i + 1
+    else:
+      begins.append(i)
+      ends.append(i + 1)
+  return begins, ends
+
+"""
+Begin and end iterations of the first idle span (see idle_spans) that ends
+after iteration i, the pattern starting over every period iterations.
+"""
+def next_idle_span(spans, period, i):
+  begins, ends = spans
+  base, i = divmod(i, period)
+  k = bisect.bisect_right(ends, i)
+  if k == len(ends):
+    base, k = base + 1, 0
+  return base * period + begins[k], base * period + ends[k]
+
+# bound on the number of states remembered for the cycle detection
+MAX_CYCLE_STATES = 1 << 16
+# the state is checked when the pattern starts over, at most once every so many iterations
+MIN_CYCLE_STRIDE = 256
+# In run(), skipping fewer SFrames than this costs more than simulating them:
+# shorter runs of zeros are not checked, and when a check skips less, the next
+# ones are put off for twice as many SFrames as the last time, up to MAX_IDLE_BACKOFF.
+MIN_IDLE_SKIP    = 16
+MAX_IDLE_BACKOFF = 4096
+
+# Source of Simulation.run(), see _compile_run.
+# Each block is the same as in Simulation.__next__, only on local variables.
+_RUN_HEAD = """
+def run(_sim, _start, _stop):
+  sframe         = _sim.sframe
+  _schedfun      = _sim.schedfun
+  _apply         = _schedfun.apply
+  _allocate      = sframe.allocate
+  _print_results = _sim.print_results
+  _record        = getattr(_print_results, "record", None)
+  _traffic       = _sim.traffic_values
+  txq            = _sim.txq
+  old_txq        = _sim.old_txq
+  _total_traffic = _sim.total_traffic
+  _total_drop    = _sim.total_drop
+  _total_cells   = _sim.total_cells
+  _total_used    = _sim.total_used_cells
+  config         = _sim.config
+  _max_txq       = config.max_txq
+"""
+
+_RUN_LOOP = """
+  if _traffic is None:
+    _traffic = _islice(_cycle(_sim.traffic_pattern), _start % _sim.traffic_period, None)
+  cells = sframe.cells_allocated
+  used  = sframe.cells_used
+  for iter_idx, traffic in zip(range(_start, _stop), _traffic):
+"""
+
+# With skip_idle, stop before an iteration where Simulation.__idle may skip
+# (it is called there by run). The first one was checked before the call.
+_RUN_IDLE = """
+    if traffic == 0 and txq == 0 and sframe.sixp_count == 0 and iter_idx != _start:
+      if _sim.traffic_values is not None:
+        # the value of this iteration was read, put it back
+        _sim.traffic_values = _chain((traffic,), _traffic)
+      _stop = iter_idx
+      break
+"""
+
+_RUN_STEP = """
+    if sframe.sixp_count != 0:
+      sframe.slotframe_end()
+      cells = sframe.cells_allocated
+    old_txq = txq
+    drop    = 0
+
+    _total_traffic += traffic
+
+    txq += traffic
+    if txq > _max_txq:
+      drop         = txq - _max_txq
+      txq          = _max_txq
+      _total_drop += drop
+
+    used  = cells if txq > cells else txq
+    txq  -= used
+"""
+
+# apply() gets the slotframe as it is in __next__
+_RUN_APPLY = """
+    sframe.cells_used = used
+    res      = _apply(iter_idx, sframe, traffic, drop, txq, old_txq)
+    decision = res["decision"]
+    cells    = sframe.cells_allocated
+"""
+
+_RUN_TOTALS = """
+    if decision != 0:
+      _allocate(decision)
+
+    _total_cells += cells
+    _total_used  += used
+"""
+
+_RUN_RECORD = """
+    avgtraf = float(_total_traffic) / (iter_idx + 1)
+    _record((iter_idx, traffic, avgtraf, avgtraf - cells, _total_traffic, sframe.total_sixp,
+             _total_drop, drop, old_txq, txq, cells, used, cells - used), res)
+"""
+
+_RUN_PRINT = """
+    avgtraf             = float(_total_traffic) / (iter_idx + 1)
+    res["iter"]         = iter_idx
+    res["traffic"]      = traffic
+    res["tottraf"]      = _total_traffic
+    res["totdrop"]      = _total_drop
+    res["totsixp"]      = sframe.total_sixp
+    res["avgtraf"]      = avgtraf
+    res["errtraf"]      = avgtraf - cells
+    res["drop"]         = drop
+    res["txq_old"]      = old_txq
+    res["txq_new"]      = txq
+    res["cells"]        = cells
+    res["cells_used"]   = used
+    res["cells_unused"] = cells - used
+    res["sixp"]         = sframe.sixp_count
+    _print_results.print(_schedfun, res)
+"""
+
+_RUN_TAIL = """
+  sframe.cells_used       = used
+  _sim.txq                = txq
+  _sim.old_txq            = old_txq
+  _sim.total_traffic      = _total_traffic
+  _sim.total_drop         = _total_drop
+  _sim.total_cells        = _total_cells
+  _sim.total_used_cells   = _total_used
+  _sim.total_unused_cells = _total_cells - _total_used
+  _sim.iter_idx           = _stop
+"""
+
+def _indent(source, spaces):
+  return "".join(" " * spaces + line if line.strip() else line
+                 for line in source.splitlines(True))
+
+_run_cache = {}
+
+"""
+Build the function that runs the iterations [start, stop) of a simulation,
+that is __next__ without the checks that only depend on the options of the
+simulation. It is specialized for the print method and, when nothing is
+printed nor recorded, the scheduling function can have its apply() inlined
+(see SchedulingFunction.inline).
+"""
+def _compile_run(simulation, idle=False):
+  schedfun = simulation.schedfun
+  if simulation.recording:
+    output = "null" if simulation.print_results.record is None else "record"
+  else:
+    output = "null" if simulation.print_results is PrintNull else "print"
+  inline = schedfun.inline() if output == "null" else None
+
+  key = (type(schedfun), output, idle, None if inline is None else (tuple(inline[0]), inline[1]))
+  run = _run_cache.get(key)
+  if run is not None:
+    return run
+
+  source = _RUN_HEAD
+  if inline is not None:
+    attrs, code = inline
+    source += "".join("  %s = _schedfun.%s\n" % (a, a) for a in attrs)
+  source += _RUN_LOOP
+  if idle:
+    source += _RUN_IDLE
+  source += _RUN_STEP
+  if inline is None:
+    source += _RUN_APPLY
+  else:
+    source += "\n" + _indent(code.strip("\n") + "\n", 4)
+  source += _RUN_TOTALS
+  if output == "record":
+    source += _RUN_RECORD
+  elif output == "print":
+    source += _RUN_PRINT
+  source += _RUN_TAIL
+  if inline is not None:
+    source += "".join("  _schedfun.%s = %s\n" % (a, a) for a in attrs)
+
+  # inlined code sees the module of its scheduling function
+  env = dict(sys.modules[type(schedfun).__module__].__dict__)
+  env.update(_cycle=itertools.cycle, _islice=itertools.islice, _chain=itertools.chain)
+  exec(compile(source, "<run %s>" % type(schedfun).__module__, "exec"), env)
+  run = _run_cache[key] = env["run"]
+  return run
 
 class Simulation(object):
-  def __init__(self, max_iter, sixp_delay, traffic_pattern, schedfun, print_results_fun):
+  """
+  The traffic pattern is a list of values that repeats, or a traffic.Source
+  whose values are generated as they are read (long runs in constant memory).
+
+  With fast_forward, the state of the simulation is remembered each time the
+  traffic pattern starts over. Once a state comes back, the simulation is in a
+  limit cycle and we skip as many whole cycles as we can, adding their totals
+  instead of simulating them. The totals and windows are exact, but the
+  iterations that were skipped are not yielded, hence this is only allowed
+  when nothing is printed or recorded for each iteration.
+
+  With skip_idle, the stretches of SFrames without traffic, with an empty TxQ
+  and without pending 6P request are skipped up to the next decision of the
+  scheduling function (see SchedulingFunction.skip_idle). Nothing happens there
+  but the decay of its estimators, which it computes in closed form. Unlike
+  fast_forward, the result may differ from a plain run by floating point rounding.
+
+  With a timing (phases.PhaseTimer), the time spent in each phase of an
+  iteration is accumulated there and reported after the end of the print method.
+  With a memory (memory.MemoryTracker), the traced memory is sampled every
+  memory.every iterations and summarized after the end of the print method.
+  """
+  def __init__(self, max_iter, sixp_delay, traffic_pattern, schedfun, print_results_fun, windows=None,
+               fast_forward=False, skip_idle=False, config=None, timing=None, memory=None):
+    self.config          = DEFAULT_CONFIG if config is None else config
     self.max_iter        = max_iter
     self.traffic_pattern = traffic_pattern
     self.schedfun        = schedfun
     self.sixp_delay      = sixp_delay
-    self.sixp_requests   = []
     self.print_results   = print_results_fun
+    self.timing          = timing
+    self.memory          = memory
+
+    # the pattern is a list that repeats or a traffic.Source,
+    # whose period is None when its values never repeat
+    self.streaming      = hasattr(traffic_pattern, "block")
+    self.traffic_period = traffic_pattern.period if self.streaming else len(traffic_pattern)
+    self.window_specs    = default_windows() if windows is None else windows
+
+    # recorders take the values of each iteration as they are,
+    # we do not build the result dict for them
+    self.recording = isinstance(print_results_fun, Recorder)
+
+    # fast_forward waits for the pattern to start over, it never does without a period
+    self.fast_forward = fast_forward and max_iter is not None and max_iter > 0 and \
+                        self.traffic_period is not None
+    self.skip_idle    = skip_idle and max_iter is not None and max_iter > 0
+    if self.skip_idle and self.traffic_period is None:
+      raise ValueError("skip_idle needs a traffic pattern with a period")
+    if (self.fast_forward or self.skip_idle) and print_results_fun is not PrintNull and \
+       not (self.recording and print_results_fun.record is None):
+      raise ValueError("fast_forward and skip_idle skip iterations, use PrintNull or RecordNull")
 
     self.print_results.start(schedfun)
+    if timing is not None:
+      timing.start(self)
+      # the iterations read the clock, those without a timing do not check for one
+      self.__class__ = _TimedSimulation
 
   def __iter__(self):
     # current state of the SFrame
     self.iter_idx = 0
     self.txq      = 0
     self.old_txq  = 0 # SFun often need that
-    self.sframe   = Slotframe(self.sixp_delay)
+    self.sframe   = Slotframe(self.sixp_delay, self.config)
+
+    # values of a traffic.Source are read in sequence, see __seek
+    self.traffic_values = self.traffic_pattern.values(0) if self.streaming else None
 
     # stuff for stats
     self.total_sixp         = 0
@@ -182,22 +701,194 @@ class Simulation(object):
     self.total_unused_cells = 0
     self.total_used_cells   = 0
 
-    self.total_sixp_at3600            = 0
-    self.total_sixp_after3600         = 0
-    self.total_drop_after3600         = 0
-    self.total_traffic_after3600      = 0
-    self.total_cells_after3600        = 0
-    self.total_unused_cells_after3600 = 0
-    self.total_used_cells_after3600   = 0
+    # The windows are not accumulated one by one. We take a snapshot
+    # of the totals when an iteration starts or stops one of them,
+    # a window is the difference between the snapshots at its bounds.
+    self.windows    = [ w.copy() for w in self.window_specs ]
+    self.boundaries = sorted({ w.start for w in self.windows } |
+                             { w.stop for w in self.windows if w.stop is not None })
+    self.snapshots  = {}
+    self.next_boundary = self.boundaries[0] if self.boundaries else -1
 
+    # see fast_forward
+    period = self.traffic_period
+    self.cycle_stride     = period * -(-MIN_CYCLE_STRIDE // period) if self.fast_forward else 0
+    self.cycle_states     = {}
+    self.next_cycle_check = 0 if self.fast_forward else -1
+
+    # see skip_idle
+    self.idle_runs       = None
+    if self.skip_idle and not hasattr(self.traffic_pattern, "run"):
+      pattern = self.traffic_pattern.block(0, period).tolist() if self.streaming else self.traffic_pattern
+      self.idle_runs = zero_runs(pattern)
+    self.next_idle_check = 0 if self.skip_idle else -1
+
+    # see memory
+    self.next_memory_sample = -1
+    if self.memory is not None:
+      self.memory.start(self)
+      self.next_memory_sample = 0
 
     return self # IMA iterator
 
+  """
+  Current totals, in the order of TOTALS.
+  """
+  def totals(self):
+    return [
+      self.sframe.total_sixp_requests(),
+      self.total_drop,
+      self.total_traffic,
+      self.total_cells,
+      self.total_unused_cells,
+      self.total_used_cells ]
+
+  def __snapshot(self):
+    self.snapshots[self.iter_idx] = self.totals()
+    self.boundaries.pop(0)
+    self.next_boundary = self.boundaries[0] if self.boundaries else -1
+
+  """
+  Everything that determines the next iterations when the pattern starts over.
+  """
+  def __state(self):
+    return (self.txq,
+            self.sframe.get_cells_allocated(),
+            self.sframe.sixp_requests(),
+            self.schedfun.state())
+
+  def __cycle(self):
+    self.next_cycle_check = self.iter_idx + self.cycle_stride
+
+    try:
+      key = self.__state()
+    except NotImplementedError:
+      # we cannot tell when the scheduling function is in a cycle
+      self.next_cycle_check = -1
+      return
+    seen = self.cycle_states.get(key)
+    if seen is None:
+      if len(self.cycle_states) >= MAX_CYCLE_STATES:
+        self.cycle_states.clear()
+      self.cycle_states[key] = (self.iter_idx, self.totals())
+      return
+
+    # skip whole cycles, but stop at the next window boundary
+    # so that it takes its snapshot at the right iteration
+    first_iter, first_totals = seen
+    period = self.iter_idx - first_iter
+    limit  = self.max_iter + 1
+    if self.next_boundary >= self.iter_idx:
+      limit = min(limit, self.next_boundary)
+    cycles = (limit - self.iter_idx) // period
+    if cycles <= 0:
+      return
+
+    sixp, drop, traffic, cells, unused_cells, used_cells = [
+      cycles * (b - a) for a, b in zip(first_totals, self.totals()) ]
+    self.sframe.total_sixp  += sixp
+    self.total_drop         += drop
+    self.total_traffic      += traffic
+    self.total_cells        += cells
+    self.total_unused_cells += unused_cells
+    self.total_used_cells   += used_cells
+
+    self.iter_idx        += cycles * period
+    self.next_cycle_check = self.iter_idx + self.cycle_stride
+    if self.next_idle_check >= 0:
+      self.next_idle_check = self.iter_idx + 1
+    self.__seek()
+
+  def __sample_memory(self):
+    self.next_memory_sample = self.iter_idx + self.memory.every
+    self.memory.sample(self)
+
+  def __idle(self, min_skip=2):
+    self.next_idle_check = self.iter_idx + 1
+    if self.txq != 0 or self.sframe.pending_sixp_requests() != 0:
+      return
+    n = self.__zero_run()
+    if n == 0:
+      return
+
+    # stop at the end and at the next window boundary
+    n = min(n, self.max_iter + 1 - self.iter_idx)
+    if self.next_boundary >= self.iter_idx:
+      n = min(n, self.next_boundary - self.iter_idx)
+    if n < min_skip:
+      return
+
+    self.sframe.slotframe_end() # nothing pending, this only frees the cells
+    try:
+      skipped = self.schedfun.skip_idle(self.sframe, n)
+    except NotImplementedError:
+      self.next_idle_check = -1
+      return
+    if skipped == 0:
+      return
+
+    cells = self.sframe.get_cells_allocated()
+    self.total_cells        += skipped * cells
+    self.total_unused_cells += skipped * cells
+    self.old_txq             = 0
+    self.iter_idx           += skipped
+    self.next_idle_check     = self.iter_idx + 1 # this one has a decision
+    self.__seek()
+
+    # keep checking for cycles where the pattern starts over
+    if self.next_cycle_check >= 0 and self.next_cycle_check < self.iter_idx:
+      period = self.traffic_period
+      self.next_cycle_check = -(-self.iter_idx // period) * period
+
+  """
+  Number of SFrames without traffic from the current iteration on, from the
+  run boundaries of the pattern when it has them (see traffic.RunLength).
+  """
+  def __zero_run(self):
+    if self.idle_runs is None:
+      value, stop = self.traffic_pattern.run(self.iter_idx)
+      return stop - self.iter_idx if value == 0 else 0
+    return self.idle_runs[self.iter_idx % len(self.idle_runs)]
+
+  """
+  Read the values of a traffic.Source from the current iteration on,
+  after iterations were skipped, and sample the memory there if a sample was skipped.
+  """
+  def __seek(self):
+    if self.streaming:
+      self.traffic_values = self.traffic_pattern.values(self.iter_idx)
+    if 0 <= self.next_memory_sample < self.iter_idx:
+      self.next_memory_sample = self.iter_idx
+
+  def __close_windows(self):
+    final = self.totals()
+    for w in self.windows:
+      begin = self.snapshots.get(w.start, final)
+      end   = final if w.stop is None else self.snapshots.get(w.stop, final)
+      w.set_totals([ b - a for a, b in zip(begin, end) ])
+
   def __next__(self):
+    if self.iter_idx == self.next_idle_check:
+      self.__idle()
+
+    if self.iter_idx == self.next_cycle_check:
+      self.__cycle()
+
+    if self.iter_idx == self.next_boundary:
+      self.__snapshot()
+
+    if self.iter_idx == self.next_memory_sample:
+      self.__sample_memory()
+
     if self.max_iter is not None and self.max_iter > 0 and self.iter_idx > self.max_iter:
       self.total_sixp = self.sframe.total_sixp_requests()
-      self.total_sixp_after3600 = self.total_sixp - self.total_sixp_at3600
-      self.print_results.end(self)
+      self.__close_windows()
+      try:
+        self.print_results.end(self)
+      finally:
+        # stops tracemalloc, even if the end of the print method fails
+        if self.memory is not None:
+          self.memory.end(self)
       raise StopIteration
 
     # reset everything
@@ -206,18 +897,19 @@ class Simulation(object):
     drop         = 0
 
     # traffic that arrive at this slotframe
-    traffic = self.traffic_pattern[self.iter_idx % len(self.traffic_pattern)]
-    self.total_traffic           += traffic
-    self.total_traffic_after3600 += traffic if self.iter_idx > 3600 else 0
+    if self.streaming:
+      traffic = next(self.traffic_values)
+    else:
+      traffic = self.traffic_pattern[self.iter_idx % self.traffic_period]
+    self.total_traffic += traffic
 
     # impact of this traffic on the TxQ and drop
     self.txq += traffic
-    if self.txq > MAX_TXQ:
-      drop     = self.txq - MAX_TXQ
-      self.txq = MAX_TXQ
+    if self.txq > self.config.max_txq:
+      drop     = self.txq - self.config.max_txq
+      self.txq = self.config.max_txq
       # stats
-      self.total_drop           += drop
-      self.total_drop_after3600 += drop if self.iter_idx > 3600 else 0
+      self.total_drop += drop
 
     # how much of the traffic could we send in this SFrame
     self.txq -= self.sframe.traffic(self.txq)
@@ -236,6 +928,30 @@ class Simulation(object):
     if decision != 0:
       self.sframe.allocate(decision)
 
+    self.total_cells        += self.sframe.get_cells_allocated()
+    self.total_unused_cells += self.sframe.get_cells_unused()
+    self.total_used_cells   += self.sframe.get_cells_used()
+
+    if self.recording:
+      record = self.print_results.record
+      if record is not None:
+        avgtraf = float(self.total_traffic) / (self.iter_idx + 1)
+        record((self.iter_idx,
+                traffic,
+                avgtraf,
+                avgtraf - self.sframe.get_cells_allocated(),
+                self.total_traffic,
+                self.sframe.total_sixp_requests(),
+                self.total_drop,
+                drop,
+                self.old_txq,
+                self.txq,
+                self.sframe.get_cells_allocated(),
+                self.sframe.get_cells_used(),
+                self.sframe.get_cells_unused()), res)
+      self.iter_idx += 1
+      return res
+
     # for now results only contains the scheduling function metrics
     # along with its final decision
     # we add the simulation metrics here
@@ -256,20 +972,230 @@ class Simulation(object):
     res["cells_unused"] = self.sframe.get_cells_unused()
     res["sixp"]         = self.sframe.pending_sixp_requests()
 
+    self.print_results.print(self.schedfun, res)
+    self.iter_idx += 1
+    return res
+
+  """
+  Same as __next__, with the clock read between its phases (see phases and
+  _TimedSimulation).
+  """
+  def __next_timed(self):
+    # the clock is read between the phases
+    timing = self.timing
+    timing.begin()
+
+    if self.iter_idx == self.next_idle_check:
+      self.__idle()
+
+    if self.iter_idx == self.next_cycle_check:
+      self.__cycle()
+
+    if self.iter_idx == self.next_boundary:
+      self.__snapshot()
+
+    if self.iter_idx == self.next_memory_sample:
+      self.__sample_memory()
+    timing.lap(phases.CHECKS)
+
+    if self.max_iter is not None and self.max_iter > 0 and self.iter_idx > self.max_iter:
+      self.total_sixp = self.sframe.total_sixp_requests()
+      self.__close_windows()
+      try:
+        self.print_results.end(self)
+        timing.lap(phases.END)
+        timing.end(self)
+      finally:
+        if self.memory is not None:
+          self.memory.end(self)
+      raise StopIteration
+
+    # reset everything
+    self.sframe.slotframe_end()
+    self.old_txq = self.txq
+    drop         = 0
+    timing.lap(phases.SLOTFRAME_END)
+
+    # traffic that arrive at this slotframe
+    if self.streaming:
+      traffic = next(self.traffic_values)
+    else:
+      traffic = self.traffic_pattern[self.iter_idx % self.traffic_period]
+    self.total_traffic += traffic
+    timing.lap(phases.TRAFFIC)
+
+    # impact of this traffic on the TxQ and drop
+    self.txq += traffic
+    if self.txq > self.config.max_txq:
+      drop     = self.txq - self.config.max_txq
+      self.txq = self.config.max_txq
+      # stats
+      self.total_drop += drop
+
+    # how much of the traffic could we send in this SFrame
+    self.txq -= self.sframe.traffic(self.txq)
+    timing.lap(phases.QUEUE)
+
+    res = self.schedfun.apply(
+      self.iter_idx, # Give some kind of SFrame Number
+      self.sframe,   # The slotframe
+      traffic,       # The traffic that was intended for this SFrame (not counting the drop)
+      drop,          # Number of drop in this SFrame
+      self.txq,      # Current size of TxQ
+      self.old_txq   # TxQ of the last SFrame
+    )
+    timing.lap(phases.APPLY)
+
+
+    decision = res["decision"]
+    if decision != 0:
+      self.sframe.allocate(decision)
+
     self.total_cells        += self.sframe.get_cells_allocated()
     self.total_unused_cells += self.sframe.get_cells_unused()
     self.total_used_cells   += self.sframe.get_cells_used()
-    if self.iter_idx > 3600:
-      self.total_cells_after3600        += self.sframe.get_cells_allocated()
-      self.total_unused_cells_after3600 += self.sframe.get_cells_unused()
-      self.total_used_cells_after3600   += self.sframe.get_cells_used()
-    elif self.iter_idx == 3600:
-      self.total_sixp_at3600 = self.sframe.total_sixp_requests()
+    timing.lap(phases.TOTALS)
+
+    if self.recording:
+      record = self.print_results.record
+      if record is not None:
+        avgtraf = float(self.total_traffic) / (self.iter_idx + 1)
+        row = (self.iter_idx,
+               traffic,
+               avgtraf,
+               avgtraf - self.sframe.get_cells_allocated(),
+               self.total_traffic,
+               self.sframe.total_sixp_requests(),
+               self.total_drop,
+               drop,
+               self.old_txq,
+               self.txq,
+               self.sframe.get_cells_allocated(),
+               self.sframe.get_cells_used(),
+               self.sframe.get_cells_unused())
+        timing.lap(phases.RESULTS)
+        record(row, res)
+        timing.lap(phases.PRINT)
+      self.iter_idx += 1
+      timing.iterations += 1
+      return res
+
+    # for now results only contains the scheduling function metrics
+    # along with its final decision
+    # we add the simulation metrics here
+    avgtraf             = float(self.total_traffic) / (self.iter_idx + 1)
+    errtraf             = avgtraf - self.sframe.get_cells_allocated()
+    res["iter"]         = self.iter_idx
+    res["traffic"]      = traffic
+    res["tottraf"]      = self.total_traffic
+    res["totdrop"]      = self.total_drop
+    res["totsixp"]      = self.sframe.total_sixp_requests()
+    res["avgtraf"]      = avgtraf
+    res["errtraf"]      = errtraf
+    res["drop"]         = drop
+    res["txq_old"]      = self.old_txq
+    res["txq_new"]      = self.txq
+    res["cells"]        = self.sframe.get_cells_allocated()
+    res["cells_used"]   = self.sframe.get_cells_used()
+    res["cells_unused"] = self.sframe.get_cells_unused()
+    res["sixp"]         = self.sframe.pending_sixp_requests()
+    timing.lap(phases.RESULTS)
 
     self.print_results.print(self.schedfun, res)
     self.iter_idx += 1
+    timing.lap(phases.PRINT)
+    timing.iterations += 1
     return res
 
+  """
+  Run the whole simulation at once and return its Summary (with params).
+  Same results and output as iterating over it, but several times faster
+  as the loop is specialized for this simulation (see _compile_run).
+  """
+  def run(self, params=None):
+    if self.max_iter is None or self.max_iter <= 0:
+      raise ValueError("run() needs a max_iter")
+
+    iter(self)
+    if self.timing is not None:
+      # the timing is done at each iteration
+      for _ in self:
+        pass
+      return Summary(params, self)
+
+    # The loop only stops for the checks that __next__ does at given iterations.
+    # With skip_idle, it also stops at the idle spans of the pattern, where
+    # run_idle stops before the iterations that may be skipped, unless the idle
+    # checks are put off (see MIN_IDLE_SKIP).
+    run      = _compile_run(self)
+    run_idle = None
+    spans    = None
+    if self.next_idle_check >= 0:
+      run_idle = _compile_run(self, idle=True)
+      if self.idle_runs is not None:
+        spans = idle_spans(self.idle_runs, MIN_IDLE_SKIP)
+        if not spans[0]:
+          run_idle = None
+    backoff = 1
+    resume  = 0
+    while True:
+      if run_idle is not None and self.iter_idx >= resume:
+        if spans is not None:
+          begin, end = next_idle_span(spans, len(self.idle_runs), self.iter_idx)
+        if spans is None or begin <= self.iter_idx:
+          start = self.iter_idx
+          self.__idle(MIN_IDLE_SKIP)
+          if self.next_idle_check < 0:
+            # the scheduling function cannot skip
+            run_idle = None
+          elif self.iter_idx - start >= MIN_IDLE_SKIP:
+            backoff = max(backoff // 2, 1)
+          elif self.txq == 0 and self.sframe.pending_sixp_requests() == 0:
+            # it was idle and did not skip enough
+            backoff = min(2 * backoff, MAX_IDLE_BACKOFF)
+            resume  = self.iter_idx + backoff
+      if self.iter_idx == self.next_cycle_check:
+        self.__cycle()
+      if self.iter_idx == self.next_boundary:
+        self.__snapshot()
+      if self.iter_idx == self.next_memory_sample:
+        self.__sample_memory()
+      if self.iter_idx > self.max_iter:
+        break
+      stop = self.max_iter + 1
+      for check in (self.next_cycle_check, self.next_boundary, self.next_memory_sample):
+        if check > self.iter_idx:
+          stop = min(stop, check)
+      if run_idle is None:
+        run(self, self.iter_idx, stop)
+      elif self.iter_idx < resume:
+        run(self, self.iter_idx, min(stop, resume))
+      elif spans is None:
+        run_idle(self, self.iter_idx, stop)
+      else:
+        # the checks above may have moved iter_idx
+        begin, end = next_idle_span(spans, len(self.idle_runs), self.iter_idx)
+        if self.iter_idx < begin:
+          run(self, self.iter_idx, min(stop, begin))
+        else:
+          run_idle(self, self.iter_idx, min(stop, end))
+
+    self.total_sixp = self.sframe.total_sixp_requests()
+    self.__close_windows()
+    try:
+      self.print_results.end(self)
+    finally:
+      if self.memory is not None:
+        self.memory.end(self)
+    return Summary(params, self)
+
+"""
+A Simulation with a timing: its iterations are those of __next_timed, which
+reads the clock between the phases of __next__.
+"""
+class _TimedSimulation(Simulation):
+  __next__ = Simulation._Simulation__next_timed
+
 class PrintMethod(object):
   DEFAULT_SIM_ORDER = [
     "iter",
@@ -285,6 +1211,7 @@ class PrintMethod(object):
     "cells",
     "cells_used",
     "cells_unused" ]
+  DEFAULT_SIM_FIELDS = frozenset(DEFAULT_SIM_ORDER)
 
   @staticmethod
   def start(schedfun):
@@ -306,13 +1233,6 @@ class PrintMethod(object):
   def _pct_cells(sim, value):
     return ((100. * value) / sim.total_cells)
 
-  @staticmethod
-  def _pct_traffic_after3600(sim, value):
-    return ((100. * value) / sim.total_traffic_after3600)
-
-  @staticmethod
-  def _pct_cells_after3600(sim, value):
-    return ((100. * value) / sim.total_cells_after3600)
 
 class PrintNull(PrintMethod):
   @staticmethod
@@ -359,17 +1279,15 @@ class PrintHuman(PrintMethod):
       PrintHuman._print_field_as_human(name, value, "% +3d")
     else:
       PrintHuman._print_field_as_human(name, value, "%s")
-  @staticmethod
-  def print_field_as_human_and_delete(res, name):
-    PrintHuman.print_field_as_human(res, name)
-    del res[name]
 
+  # res is also what the simulation returns, we print it without touching it
   @staticmethod
   def print(schedfun, res):
     for k in PrintMethod.DEFAULT_SIM_ORDER:
-      PrintHuman.print_field_as_human_and_delete(res, k)
-    for k in res.keys():
       PrintHuman.print_field_as_human(res, k)
+    for k in res.keys():
+      if k not in PrintMethod.DEFAULT_SIM_FIELDS:
+        PrintHuman.print_field_as_human(res, k)
 
     print('')
 
@@ -396,33 +1314,371 @@ class PrintPlot(PrintMethod):
     print('')
 
   @staticmethod
-  def end(sim):
-    print("#")
-    print("# Final report:")
-    print("#   total_traffic     :", sim.total_traffic)
-    print("#   total_sixp        :", sim.total_sixp)
-    print("#   total_drop        :", sim.total_drop)
-    print("#   total_cells       :", sim.total_cells)
-    print("#   total_unused_cells:", sim.total_unused_cells)
-    print("#   total_used_cells  :", sim.total_used_cells)
-    print("#")
-    print("#   pct_sixp          :", PrintMethod._pct_traffic(sim, sim.total_sixp))
-    print("#   pct_drop          :", PrintMethod._pct_traffic(sim, sim.total_drop))
-    print("#   pct_unused_cells  :", PrintMethod._pct_cells(sim, sim.total_unused_cells))
-    print("#   pct_used_cells    :", PrintMethod._pct_cells(sim, sim.total_used_cells))
-    print("#")
-    print("#")
-    print("#")
-    print("# After t=3600:")
-    print("#   total_traffic     :", sim.total_traffic_after3600)
-    print("#   total_sixp        :", sim.total_sixp_after3600)
-    print("#   total_drop        :", sim.total_drop_after3600)
-    print("#   total_cells       :", sim.total_cells_after3600)
-    print("#   total_unused_cells:", sim.total_unused_cells_after3600)
-    print("#   total_used_cells  :", sim.total_used_cells_after3600)
-    print("#")
-    print("#   pct_sixp          :", PrintMethod._pct_traffic_after3600(sim, sim.total_sixp_after3600))
-    print("#   pct_drop          :", PrintMethod._pct_traffic_after3600(sim, sim.total_drop_after3600))
-    print("#   pct_unused_cells  :", PrintMethod._pct_cells_after3600(sim, sim.total_unused_cells_after3600))
-    print("#   pct_used_cells    :", PrintMethod._pct_cells_after3600(sim, sim.total_used_cells_after3600))
+  def end(sim, file=None):
+    print("#", file=file)
+    print("# Final report:", file=file)
+    print("#   total_traffic     :", sim.total_traffic, file=file)
+    print("#   total_sixp        :", sim.total_sixp, file=file)
+    print("#   total_drop        :", sim.total_drop, file=file)
+    print("#   total_cells       :", sim.total_cells, file=file)
+    print("#   total_unused_cells:", sim.total_unused_cells, file=file)
+    print("#   total_used_cells  :", sim.total_used_cells, file=file)
+    print("#", file=file)
+    print("#   pct_sixp          :", PrintMethod._pct_traffic(sim, sim.total_sixp), file=file)
+    print("#   pct_drop          :", PrintMethod._pct_traffic(sim, sim.total_drop), file=file)
+    print("#   pct_unused_cells  :", PrintMethod._pct_cells(sim, sim.total_unused_cells), file=file)
+    print("#   pct_used_cells    :", PrintMethod._pct_cells(sim, sim.total_used_cells), file=file)
+    for w in sim.windows:
+      print("#", file=file)
+      print("#", file=file)
+      print("#", file=file)
+      print("# %s:" % w.name, file=file)
+      print("#   total_traffic     :", w.total_traffic, file=file)
+      print("#   total_sixp        :", w.total_sixp, file=file)
+      print("#   total_drop        :", w.total_drop, file=file)
+      print("#   total_cells       :", w.total_cells, file=file)
+      print("#   total_unused_cells:", w.total_unused_cells, file=file)
+      print("#   total_used_cells  :", w.total_used_cells, file=file)
+      print("#", file=file)
+      print("#   pct_sixp          :", PrintMethod._pct_traffic(w, w.total_sixp), file=file)
+      print("#   pct_drop          :", PrintMethod._pct_traffic(w, w.total_drop), file=file)
+      print("#   pct_unused_cells  :", PrintMethod._pct_cells(w, w.total_unused_cells), file=file)
+      print("#   pct_used_cells    :", PrintMethod._pct_cells(w, w.total_used_cells), file=file)
+
+"""
+Base of the buffered print methods: the rows are written to out (sys.stdout
+as it is when the simulation starts by default) chunk rows at a time. With
+threaded, the chunks are written by a background thread, at most queue_size
+of them waiting. Everything is written by the end of the simulation, the
+final report included. They are instances, one per simulation.
+
+sys.stdout is left alone. What the scheduling function prints on its own
+(e.g. show_alloc) goes through write, in place between the rows: the print
+method is the out of the scheduling function until close. When the simulation
+may stop halfway, use the print method as a context manager, the rows buffered
+so far are written on the way out:
+
+  with sim.BufferedPlot() as out:
+    for _ in sim.Simulation(..., out):
+      pass
+"""
+class BufferedPrint(PrintMethod):
+  CHUNK      = 4096
+  QUEUE_SIZE = 16
+
+  def __init__(self, out=None, chunk=CHUNK, threaded=False, queue_size=QUEUE_SIZE):
+    self.out        = out
+    self.chunk      = chunk
+    self.threaded   = threaded
+    self.queue_size = queue_size
+    self.pending    = []
+    self.writer     = None
+    self.file       = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+  def start(self, schedfun):
+    self.file    = sys.stdout if self.out is None else self.out
+    self.pending = []
+    self.error   = None
+    self.schedfun, self.schedfun_out = schedfun, schedfun.out
+    schedfun.out = self
+    if self.threaded:
+      self.queue  = queue.Queue(self.queue_size)
+      self.writer = threading.Thread(target=self.__write_chunks, daemon=True)
+      self.writer.start()
+    self.write(self.header(schedfun))
+
+  def header(self, schedfun):
+    return ""
+
+  def write(self, text):
+    self.pending.append(text)
+    if len(self.pending) >= self.chunk:
+      self.flush()
+
+  def flush(self):
+    pending, self.pending = self.pending, []
+    if self.writer is None:
+      self.file.write("".join(pending))
+      return
+    if self.error is not None:
+      raise self.error
+    self.queue.put(pending)
+
+  def __write_chunks(self):
+    while True:
+      pending = self.queue.get()
+      if pending is None:
+        return
+      if self.error is None:
+        try:
+          self.file.write("".join(pending))
+        except Exception as e:
+          self.error = e
+
+  """
+  Write what is left and stop the writer thread. Only the first call after
+  start does something, so that end and the context manager can both call it.
+  """
+  def close(self):
+    if self.file is None:
+      return
+    pending, self.pending = self.pending, []
+    try:
+      if self.writer is None:
+        self.file.write("".join(pending))
+      else:
+        self.queue.put(pending)
+        self.queue.put(None)
+        self.writer.join()
+        self.writer = None
+        if self.error is not None:
+          raise self.error
+      self.file.flush()
+    finally:
+      self.file = None
+      self.schedfun.out = self.schedfun_out
+
+  def footer(self, sim, file):
+    pass
+
+  # the final report goes through the buffer too, even when it fails halfway
+  def end(self, sim):
+    report = io.StringIO()
+    try:
+      self.footer(sim, report)
+    finally:
+      self.write(report.getvalue())
+      self.close()
+
+"""
+Same text as PrintPlot. The format of a row is built once, for the schema
+of the scheduling function.
+"""
+class BufferedPlot(BufferedPrint):
+  def header(self, schedfun):
+    schema      = PrintMethod.DEFAULT_SIM_ORDER + schedfun.schema()
+    self.fields = operator.itemgetter(*schema)
+    self.format = "%s " * len(schema) + "\n"
+    return "# " + "".join(k + " " for k in schema) + "\n"
+
+  def print(self, schedfun, res):
+    self.write(self.format % self.fields(res))
+
+  def footer(self, sim, file):
+    PrintPlot.end(sim, file)
+
+"""
+Same text as PrintHuman. The format of a row is built once for each set of
+fields of the results and types of their values (see print_field_as_human).
+"""
+class BufferedHuman(BufferedPrint):
+  def header(self, schedfun):
+    self.layouts = {}
+    return ""
+
+  @staticmethod
+  def field_format(name, kind):
+    name = name.replace("%", "%%")
+    if kind == type(1.0):
+      return name + "=% +3.3f "
+    elif kind == type(1):
+      return name + "=% +3d "
+    return name + "=%s "
+
+  def print(self, schedfun, res):
+    keys   = tuple(res)
+    layout = self.layouts.get(keys)
+    if layout is None:
+      names  = PrintMethod.DEFAULT_SIM_ORDER + [ k for k in keys if k not in PrintMethod.DEFAULT_SIM_FIELDS ]
+      layout = self.layouts[keys] = (names, operator.itemgetter(*names), {})
+    names, fields, formats = layout
+
+    values = fields(res)
+    kinds  = tuple(map(type, values))
+    format = formats.get(kinds)
+    if format is None:
+      format = formats[kinds] = "".join(map(BufferedHuman.field_format, names, kinds)) + "\n"
+    self.write(format % values)
+
+"""
+Recorders are print methods that keep the results instead of printing them.
+The simulation hands them the values of DEFAULT_SIM_ORDER for each iteration
+as a tuple, along with the scheduling function result, instead of building
+the result dict. In that case the iterator only yields the scheduling
+function result. A recorder with no record method records nothing at all.
+"""
+class Recorder(PrintMethod):
+  record = None
+
+  def start(self, schedfun):
+    pass
+
+  def print(self, schedfun, res):
+    pass
+
+  def end(self, sim):
+    pass
+
+class RecordNull(Recorder):
+  pass
+
+"""
+Record each field of each iteration into a typed column
+(array.array, 'q' for integers and 'd' for floats) preallocated for max_iter iterations.
+The columns are available with columns() at the end of the simulation.
+"""
+class RecordColumns(Recorder):
+  SIM_TYPECODES = {
+    "iter"        : "q",
+    "traffic"     : "q",
+    "avgtraf"     : "d",
+    "errtraf"     : "d",
+    "tottraf"     : "q",
+    "totsixp"     : "q",
+    "totdrop"     : "q",
+    "drop"        : "q",
+    "txq_old"     : "q",
+    "txq_new"     : "q",
+    "cells"       : "q",
+    "cells_used"  : "q",
+    "cells_unused": "q" }
+
+  def __init__(self, max_iter):
+    self.size = max_iter + 1 if max_iter is not None and max_iter > 0 else 1024
+    self.rows = 0
+
+  def start(self, schedfun):
+    self.schema      = PrintMethod.DEFAULT_SIM_ORDER + schedfun.schema()
+    self.sim_columns = [ self.__column(RecordColumns.SIM_TYPECODES[k])
+                         for k in PrintMethod.DEFAULT_SIM_ORDER ]
+    # the type of the scheduling function fields is only known
+    # once we have seen them, see record
+    self.sf_fields  = schedfun.schema()
+    self.sf_columns = None
+    self.rows       = 0
+
+  def __column(self, typecode):
+    return array.array(typecode, bytes(array.array(typecode).itemsize * self.size))
+
+  def __grow(self):
+    for col in self.sim_columns + (self.sf_columns or []):
+      col.extend(array.array(col.typecode, bytes(col.itemsize * self.size)))
+    self.size *= 2
+
+  def record(self, row, res):
+    i = self.rows
+    if i >= self.size:
+      self.__grow()
+
+    for col, value in zip(self.sim_columns, row):
+      col[i] = value
+
+    if self.sf_columns is None:
+      self.sf_columns = [ self.__column("d" if isinstance(res[k], float) else "q")
+                          for k in self.sf_fields ]
+    for j, k in enumerate(self.sf_fields):
+      try:
+        self.sf_columns[j][i] = res[k]
+      except TypeError:
+        # a float in an integer column, widen the column
+        self.sf_columns[j] = array.array("d", self.sf_columns[j])
+        self.sf_columns[j][i] = res[k]
+
+    self.rows = i + 1
+
+  """
+  Recorded columns by field name, trimmed to the recorded iterations.
+  """
+  def columns(self):
+    cols = self.sim_columns + (self.sf_columns or [])
+    return { k: col[:self.rows] for k, col in zip(self.schema, cols) }
+
+"""
+Percentage of value in total, nan when there is no total (no traffic, no cells).
+"""
+def percent(value, total):
+  return (100. * value) / total if total != 0 else math.nan
+
+"""
+Summary of a simulation, that is the totals and percentages
+that the experiments print at the end of each run.
+It is made from a completed Simulation or from one of its windows.
+"""
+class Summary(object):
+  def __init__(self, params, simulation):
+    self.params = params
+    (self.total_sixp,
+     self.total_drop,
+     self.total_traffic,
+     self.total_cells,
+     self.total_unused_cells,
+     self.total_used_cells) = simulation.totals()
+
+    self.pct_sixp         = percent(self.total_sixp, self.total_traffic)
+    self.pct_drop         = percent(self.total_drop, self.total_traffic)
+    self.pct_unused_cells = percent(self.total_unused_cells, self.total_cells)
+    self.pct_used_cells   = percent(self.total_used_cells, self.total_cells)
+
+  def __repr__(self):
+    return "Summary%r" % (self.params,)
+
+# The traffic pattern is shipped once to each worker instead of once per run.
+_sweep_traffic_pattern = None
+
+def _sweep_init(traffic_pattern):
+  global _sweep_traffic_pattern
+  _sweep_traffic_pattern = traffic_pattern
+
+def _sweep_simulate(traffic_pattern, task):
+  sf_factory, params, sixp_delay, max_iter, window, config = task
+
+  if isinstance(params, dict):
+    schedfun = sf_factory(**params)
+  else:
+    schedfun = sf_factory(*params)
+  windows    = [] if window is None else [ window ]
+  simulation = Simulation(max_iter, sixp_delay, traffic_pattern, schedfun, PrintNull, windows,
+                          fast_forward=True, config=config)
+
+  summary = simulation.run(params)
+  return summary if window is None else Summary(params, simulation.windows[0])
+
+def _sweep_run(task):
+  return _sweep_simulate(_sweep_traffic_pattern, task)
+
+"""
+Run one simulation for each parameter set of the grid and return their Summary.
+Each parameter set is given to sf_factory (as positional arguments, or keyword
+arguments for a dict) to build the scheduling function. The runs are spread over
+a pool of processes, so sf_factory must be picklable (a class or a module level
+function). The summaries come back in the order of the grid.
+When a Window is given, the summaries only count the iterations of that window.
+All the runs share the same Config (default one if None).
+
+With threads, the runs are spread over a pool of threads instead. They all read
+the same traffic pattern and nothing needs to be pickled, but with the GIL they
+take turns rather than running in parallel.
+The simulations do not share any mutable state: each one has its own scheduling
+function, Slotframe and copies of the windows, the Config and the traffic
+pattern are only read.
+"""
+def sweep(sf_factory, grid, traffic_pattern, sixp_delay, max_iter, window=None, max_workers=None,
+          config=None, threads=False):
+  tasks = [ (sf_factory, params, sixp_delay, max_iter, window, config) for params in grid ]
+
+  if threads:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+      return list(executor.map(functools.partial(_sweep_simulate, traffic_pattern), tasks))
 
+  # forked workers would print again whatever is still buffered
+  sys.stdout.flush()
+  with ProcessPoolExecutor(max_workers=max_workers,
+                           initializer=_sweep_init,
+                           initargs=(traffic_pattern,)) as executor:
+    return list(executor.map(_sweep_run, tasks))
@@ -0,0 +1,343 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import numpy as np
+
+# Vectorized counterpart of sim.Simulation.
+# It advances N independent simulations in lockstep over the same traffic
+# pattern. Each simulation is one lane of the arrays below, so a sweep over
+# N parameter sets costs one pass over the pattern instead of N.
+# The results are the same as running each sim.Simulation one after the other.
+
+"""
+Array versions of sim.ewmm and sim.ewmm2.
+sim.ewma is already elementwise and works on arrays as is.
+"""
+def ewmm(e, x, alpha):
+  return np.where(x >= e, x, (1 - alpha) * e)
+
+def ewmm2(e, x, alpha):
+  return np.where(x >= e, x, np.maximum(0, e - alpha))
+
+class SchedulingFunction(object):
+  # number of simulations handled by this scheduling function
+  size = 1
+
+  def schema(self):
+    raise NotImplementedError
+  def apply_batch(self,
+      iter_idx,  # Give some kind of SFrame Number
+      sframe,    # The batch of slotframes
+      traffic,   # The traffic that was intended for this SFrame (not counting the drop)
+      drop,      # Number of drop in this SFrame (one per simulation)
+      txq,       # Current size of TxQ (one per simulation)
+      old_txq):  # TxQ of the last SFrame (one per simulation)
+    raise NotImplementedError
+
+"""
+Runs one scalar sim.SchedulingFunction per simulation of the batch.
+It is the fallback for scheduling functions without an array implementation,
+it is not faster than sim.Simulation but lets them take part in a batch.
+"""
+class Each(SchedulingFunction):
+  def __init__(self, schedfuns):
+    self.schedfuns = list(schedfuns)
+    self.size      = len(self.schedfuns)
+
+  def apply_batch(self, iter_idx, sframe, traffic, drop, txq, old_txq):
+    rows = []
+    for lane, schedfun in enumerate(self.schedfuns):
+      rows.append(schedfun.apply(iter_idx, LaneSlotframe(sframe, lane), traffic,
+                                 int(drop[lane]), int(txq[lane]), int(old_txq[lane])))
+    return { k: np.array([ row[k] for row in rows ]) for k in self.schema() }
+
+  def schema(self):
+    return self.schedfuns[0].schema()
+
+"""
+View of one simulation in a batch of slotframes with the sim.Slotframe accessors.
+"""
+class LaneSlotframe(object):
+  def __init__(self, sframe, lane):
+    self.sframe = sframe
+    self.lane   = lane
+    self.config = sframe.config
+
+  @property
+  def cells_allocated(self):
+    return int(self.sframe.cells_allocated[self.lane])
+  @cells_allocated.setter
+  def cells_allocated(self, n):
+    self.sframe.cells_allocated[self.lane] = n
+
+  def get_cells_allocated(self):
+    return self.cells_allocated
+  def get_cells_used(self):
+    return int(self.sframe.cells_used[self.lane])
+  def get_cells_unused(self):
+    return self.get_cells_allocated() - self.get_cells_used()
+
+class Slotframe(object):
+  def __init__(self, size, sixp_delay, config=sim.DEFAULT_CONFIG):
+    self.size            = size
+    self.config          = config
+    self.cells_allocated = np.full(size, config.min_cells, dtype=np.int64)
+    self.cells_used      = np.zeros(size, dtype=np.int64)
+    self.sixp_delay      = sixp_delay
+    self.total_sixp      = np.zeros(size, dtype=np.int64)
+
+    # Pending 6P requests of each simulation, oldest first.
+    # Same layout as sim.Slotframe, one row per simulation
+    # and sixp_count valid entries in each row.
+    capacity = sixp_delay + 2
+    self.sixp_ttl      = np.zeros((size, capacity), dtype=np.int64)
+    self.sixp_decision = np.zeros((size, capacity), dtype=np.int64)
+    self.sixp_count    = np.zeros(size, dtype=np.int64)
+
+  # access by SF
+  def get_cells_allocated(self):
+    return self.cells_allocated
+  def get_cells_used(self):
+    return self.cells_used
+  def get_cells_unused(self):
+    return self.cells_allocated - self.cells_used
+
+  """
+  Allocation of deallocation (use negative number to deallocate).
+  One decision per simulation, a null decision does not issue any request.
+  """
+  def allocate(self, n):
+    lanes = np.flatnonzero(n)
+    if len(lanes) == 0:
+      return
+    pos = self.sixp_count[lanes]
+    if pos.max() >= self.sixp_ttl.shape[1]:
+      self.__grow()
+    self.sixp_ttl[lanes, pos]      = self.sixp_delay
+    self.sixp_decision[lanes, pos] = n[lanes]
+    self.sixp_count[lanes]        += 1
+    self.total_sixp[lanes]        += 1
+
+  # accessed by Simulation
+  def slotframe_end(self):
+    self.__apply_sixp_requests()
+    self.cells_used[:] = 0
+
+  """
+  We want to send n packets in this slotframe.
+  Returns the number of packets left that were actually sent
+  """
+  def traffic(self, n):
+    self.cells_used = np.minimum(n, self.cells_allocated)
+    return self.cells_used
+
+  def pending_sixp_requests(self):
+    return self.sixp_count
+
+  def total_sixp_requests(self):
+    return self.total_sixp
+
+  def __grow(self):
+    pad = np.zeros_like(self.sixp_ttl)
+    self.sixp_ttl      = np.hstack((self.sixp_ttl, pad))
+    self.sixp_decision = np.hstack((self.sixp_decision, pad))
+
+  """
+  Same walk as sim.Slotframe, including its side effect: the request that
+  follows an expired one in the list is skipped for this slotframe because
+  the list is shortened while being enumerated.
+  """
+  def __apply_sixp_requests(self):
+    depth = self.sixp_count.max()
+    if depth == 0:
+      return
+
+    skip    = np.zeros(self.size, dtype=bool)
+    expired = np.zeros((self.size, depth), dtype=bool)
+    for k in range(depth):
+      active = (k < self.sixp_count) & ~skip
+      ttl    = self.sixp_ttl[:, k]
+      fire   = active & (ttl == 0)
+      self.sixp_ttl[:, k] = np.where(active, ttl - 1, ttl)
+      if fire.any():
+        cells = self.cells_allocated + np.where(fire, self.sixp_decision[:, k], 0)
+        self.cells_allocated = np.clip(cells, self.config.min_cells, self.config.max_cells)
+      expired[:, k] = fire
+      skip = fire
+
+    if expired.any():
+      keep  = (np.arange(depth) < self.sixp_count[:, None]) & ~expired
+      order = np.argsort(~keep, axis=1, kind="stable")
+      self.sixp_ttl[:, :depth]      = np.take_along_axis(self.sixp_ttl[:, :depth], order, axis=1)
+      self.sixp_decision[:, :depth] = np.take_along_axis(self.sixp_decision[:, :depth], order, axis=1)
+      self.sixp_count = keep.sum(axis=1)
+
+"""
+Totals of one of the simulations of a batch.
+It has the same totals and windows as a completed sim.Simulation
+so that it can be given to PrintMethod.end or sim.Summary.
+"""
+class Result(object):
+  def __init__(self, simulation, lane):
+    (self.total_sixp,
+     self.total_drop,
+     self.total_traffic,
+     self.total_cells,
+     self.total_unused_cells,
+     self.total_used_cells) = Result.lane(simulation.totals(), lane)
+
+    self.windows = []
+    for w in simulation.windows:
+      window = w.copy()
+      window.set_totals(Result.lane(w.totals(), lane))
+      self.windows.append(window)
+
+  @staticmethod
+  def lane(totals, lane):
+    return [ int(v if np.isscalar(v) else v[lane]) for v in totals ]
+
+  def totals(self):
+    return [ getattr(self, k) for k in sim.TOTALS ]
+
+class Simulation(object):
+  def __init__(self, max_iter, sixp_delay, traffic_pattern, schedfun, windows=None, config=None):
+    self.config          = sim.DEFAULT_CONFIG if config is None else config
+    self.max_iter        = max_iter
+    self.traffic_pattern = traffic_pattern
+    self.schedfun        = schedfun
+    self.sixp_delay      = sixp_delay
+    self.size            = schedfun.size
+    # a list that repeats or a traffic.Source, as in sim.Simulation
+    self.streaming       = hasattr(traffic_pattern, "block")
+    self.window_specs    = sim.default_windows() if windows is None else windows
+
+  def __iter__(self):
+    size = self.size
+
+    # current state of the SFrames
+    self.iter_idx = 0
+    self.txq      = np.zeros(size, dtype=np.int64)
+    self.old_txq  = np.zeros(size, dtype=np.int64)
+    self.sframe   = Slotframe(size, self.sixp_delay, self.config)
+    self.traffic_values = self.traffic_pattern.values(0) if self.streaming else None
+
+    # stuff for stats
+    # the traffic is the same for all simulations
+    self.total_sixp         = np.zeros(size, dtype=np.int64)
+    self.total_drop         = np.zeros(size, dtype=np.int64)
+    self.total_traffic      = 0
+    self.total_cells        = np.zeros(size, dtype=np.int64)
+    self.total_unused_cells = np.zeros(size, dtype=np.int64)
+    self.total_used_cells   = np.zeros(size, dtype=np.int64)
+
+    # windows are snapshots of the totals, as in sim.Simulation
+    self.windows    = [ w.copy() for w in self.window_specs ]
+    self.boundaries = sorted({ w.start for w in self.windows } |
+                             { w.stop for w in self.windows if w.stop is not None })
+    self.snapshots  = {}
+    self.next_boundary = self.boundaries[0] if self.boundaries else -1
+
+    return self # IMA iterator
+
+  """
+  Current totals, in the order of sim.TOTALS, one value per simulation.
+  """
+  def totals(self):
+    return [
+      self.sframe.total_sixp_requests().copy(),
+      self.total_drop.copy(),
+      self.total_traffic,
+      self.total_cells.copy(),
+      self.total_unused_cells.copy(),
+      self.total_used_cells.copy() ]
+
+  def __snapshot(self):
+    self.snapshots[self.iter_idx] = self.totals()
+    self.boundaries.pop(0)
+    self.next_boundary = self.boundaries[0] if self.boundaries else -1
+
+  def __close_windows(self):
+    final = self.totals()
+    for w in self.windows:
+      begin = self.snapshots.get(w.start, final)
+      end   = final if w.stop is None else self.snapshots.get(w.stop, final)
+      w.set_totals([ b - a for a, b in zip(begin, end) ])
+
+  def __next__(self):
+    if self.iter_idx == self.next_boundary:
+      self.__snapshot()
+
+    if self.max_iter is not None and self.max_iter > 0 and self.iter_idx > self.max_iter:
+      self.total_sixp = self.sframe.total_sixp_requests().copy()
+      self.__close_windows()
+      raise StopIteration
+
+    # reset everything
+    self.sframe.slotframe_end()
+    self.old_txq = self.txq
+
+    # traffic that arrive at this slotframe
+    if self.streaming:
+      traffic = next(self.traffic_values)
+    else:
+      traffic = self.traffic_pattern[self.iter_idx % len(self.traffic_pattern)]
+    self.total_traffic += traffic
+
+    # impact of this traffic on the TxQ and drop
+    txq  = self.txq + traffic
+    drop = np.maximum(txq - self.config.max_txq, 0)
+    txq  = np.minimum(txq, self.config.max_txq)
+    self.total_drop += drop
+
+    # how much of the traffic could we send in this SFrame
+    self.txq = txq - self.sframe.traffic(txq)
+
+    res = self.schedfun.apply_batch(
+      self.iter_idx, # Give some kind of SFrame Number
+      self.sframe,   # The slotframes
+      traffic,       # The traffic that was intended for this SFrame (not counting the drop)
+      drop,          # Number of drop in this SFrame
+      self.txq,      # Current size of TxQ
+      self.old_txq   # TxQ of the last SFrame
+    )
+
+    self.sframe.allocate(res["decision"])
+
+    cells_allocated = self.sframe.get_cells_allocated()
+    cells_used      = self.sframe.get_cells_used()
+    self.total_cells        += cells_allocated
+    self.total_unused_cells += cells_allocated - cells_used
+    self.total_used_cells   += cells_used
+
+    self.iter_idx += 1
+    return res
+
+  """
+  Totals of each simulation, in the order of the scheduling function lanes.
+  """
+  def results(self):
+    return [ Result(self, lane) for lane in range(self.size) ]
@@ -0,0 +1,257 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import bisect
+import json
+import struct
+import sys
+import numpy as np
+
+# Binary columnar trace of a simulation, an alternative to the text of PrintPlot.
+#
+# Layout of a trace file:
+#   MAGIC
+#   header length (uint32) + JSON header (schema and block size)
+#   blocks of BLOCK rows, each column stored one after the other:
+#     integers: first value then the deltas between rows, in the narrowest
+#               integer type that holds them (most of them fit in one byte)
+#     floats  : raw float64
+#   JSON trailer (block index and final report)
+#   trailer offset (uint64)
+#
+# The block index gives the first iteration of each block and where each of
+# its columns lives, so that a window of iterations only reads the blocks it
+# overlaps. The file is accessed through numpy.memmap.
+
+MAGIC = b"SFTRACE1"
+BLOCK = 4096
+
+DELTA_DTYPES = [ np.int8, np.int16, np.int32, np.int64 ]
+
+def _delta_dtype(deltas):
+  if len(deltas) == 0:
+    return np.int8
+  lo, hi = deltas.min(), deltas.max()
+  for dtype in DELTA_DTYPES:
+    info = np.iinfo(dtype)
+    if lo >= info.min and hi <= info.max:
+      return dtype
+  return np.int64
+
+"""
+Write a trace one block at a time.
+Each column of a block is either made of integers or of floats. Python ints
+found in a float column are remembered so that the text export prints them
+the same way PrintPlot did.
+"""
+class TraceWriter(object):
+  def __init__(self, path, schema, block=BLOCK):
+    self.schema = schema
+    self.block  = block
+    self.index  = []
+    self.rows   = 0
+    self.out    = open(path, "wb")
+
+    header = json.dumps({ "schema": schema, "block": block }).encode()
+    self.out.write(MAGIC)
+    self.out.write(struct.pack("<I", len(header)))
+    self.out.write(header)
+
+  def write_block(self, columns):
+    n = len(columns[0])
+    entry = { "first": int(columns[0][0]), "rows": n, "columns": [] }
+
+    for values in columns:
+      if all(type(v) is int for v in values):
+        values = np.array(values, dtype=np.int64)
+        deltas = np.diff(values)
+        dtype  = _delta_dtype(deltas)
+        col    = { "kind": "i", "base": int(values[0]), "dtype": np.dtype(dtype).name,
+                   "offset": self.out.tell() }
+        self.out.write(deltas.astype(dtype).tobytes())
+      else:
+        ints = [ i for i, v in enumerate(values) if type(v) is int ]
+        col  = { "kind": "f", "offset": self.out.tell(), "ints": ints }
+        self.out.write(np.array(values, dtype=np.float64).tobytes())
+      entry["columns"].append(col)
+
+    self.index.append(entry)
+    self.rows += n
+
+  def close(self, report=None):
+    trailer = json.dumps({ "rows": self.rows, "index": self.index, "report": report }).encode()
+    offset  = self.out.tell()
+    self.out.write(trailer)
+    self.out.write(struct.pack("<Q", offset))
+    self.out.close()
+
+"""
+Recorder writing the results of the simulation to a trace file as it goes.
+Only one block of rows is held in memory.
+"""
+class RecordTrace(sim.Recorder):
+  def __init__(self, path, block=BLOCK):
+    self.path  = path
+    self.block = block
+
+  def start(self, schedfun):
+    self.sf_fields = schedfun.schema()
+    self.writer    = TraceWriter(self.path, sim.PrintMethod.DEFAULT_SIM_ORDER + self.sf_fields, self.block)
+    self.rows      = []
+
+  def record(self, row, res):
+    self.rows.append(row + tuple(res[k] for k in self.sf_fields))
+    if len(self.rows) == self.block:
+      self.__flush()
+
+  def __flush(self):
+    if self.rows:
+      self.writer.write_block([ list(col) for col in zip(*self.rows) ])
+      self.rows = []
+
+  def end(self, sim):
+    self.__flush()
+    # totals of the simulation and its windows, for the final report
+    self.writer.close({
+      "totals" : sim.totals(),
+      "windows": [ { "name": w.name, "start": w.start, "stop": w.stop, "totals": w.totals() }
+                   for w in sim.windows ] })
+
+"""
+The final report of the trailer, with the totals and windows of the simulation.
+"""
+class Report(object):
+  def __init__(self, report):
+    self.windows = []
+    for w in report["windows"]:
+      window = sim.Window(w["start"], w["stop"], w["name"])
+      window.set_totals(w["totals"])
+      self.windows.append(window)
+
+    (self.total_sixp,
+     self.total_drop,
+     self.total_traffic,
+     self.total_cells,
+     self.total_unused_cells,
+     self.total_used_cells) = report["totals"]
+
+  def totals(self):
+    return [ getattr(self, k) for k in sim.TOTALS ]
+
+class Trace(object):
+  def __init__(self, path):
+    self.data = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(self.data[:len(MAGIC)]) != MAGIC:
+      raise ValueError("%s: not a simulation trace" % path)
+
+    (length,)    = struct.unpack("<I", bytes(self.data[len(MAGIC):len(MAGIC) + 4]))
+    header       = json.loads(bytes(self.data[len(MAGIC) + 4:len(MAGIC) + 4 + length]))
+    (offset,)    = struct.unpack("<Q", bytes(self.data[-8:]))
+    trailer      = json.loads(bytes(self.data[offset:-8]))
+
+    self.schema = header["schema"]
+    self.block  = header["block"]
+    self.rows   = trailer["rows"]
+    self.index  = trailer["index"]
+    self.report = Report(trailer["report"]) if trailer["report"] is not None else None
+    self.firsts = [ entry["first"] for entry in self.index ]
+
+  def __len__(self):
+    return self.rows
+
+  """
+  Blocks overlapping the iterations [start, stop).
+  """
+  def __blocks(self, start, stop):
+    lo = max(0, bisect.bisect_right(self.firsts, start) - 1)
+    hi = len(self.index) if stop is None else bisect.bisect_left(self.firsts, stop)
+    return range(lo, hi)
+
+  def __decode(self, entry, j):
+    col = entry["columns"][j]
+    n   = entry["rows"]
+    if col["kind"] == "i":
+      dtype  = np.dtype(col["dtype"])
+      deltas = np.frombuffer(self.data, dtype=dtype, count=n - 1, offset=col["offset"])
+      values = np.empty(n, dtype=np.int64)
+      values[0] = col["base"]
+      np.cumsum(deltas, out=values[1:])
+      values[1:] += col["base"]
+      return values
+    return np.frombuffer(self.data, dtype=np.float64, count=n, offset=col["offset"])
+
+  """
+  Values of a column for the iterations [start, stop).
+  """
+  def column(self, name, start=0, stop=None):
+    j = self.schema.index(name)
+    parts = []
+    for b in self.__blocks(start, stop):
+      entry  = self.index[b]
+      values = self.__decode(entry, j)
+      iters  = self.__decode(entry, 0)
+      lo = np.searchsorted(iters, start)
+      hi = len(iters) if stop is None else np.searchsorted(iters, stop)
+      parts.append(values[lo:hi])
+    if not parts:
+      return np.empty(0)
+    return np.concatenate(parts)
+
+  """
+  Write the iterations [start, stop) in the text layout of sim.PrintPlot,
+  followed by its final report. Blocks are decoded and written one by one.
+  """
+  def export(self, out=sys.stdout, start=0, stop=None):
+    out.write("# " + "".join(k + " " for k in self.schema) + "\n")
+
+    for b in self.__blocks(start, stop):
+      entry = self.index[b]
+      cols  = []
+      for j, col in enumerate(entry["columns"]):
+        values = self.__decode(entry, j).tolist()
+        if col["kind"] == "f":
+          for i in col["ints"]:
+            values[i] = int(values[i])
+        cols.append(values)
+
+      iters = cols[0]
+      lo = bisect.bisect_left(iters, start)
+      hi = len(iters) if stop is None else bisect.bisect_left(iters, stop)
+      out.write("".join("".join(str(v) + " " for v in row) + "\n"
+                        for row in zip(*(col[lo:hi] for col in cols))))
+
+    if self.report is not None:
+      sim.PrintPlot.end(self.report, out)
+
+# Export a trace to the text layout the gnuplot scripts read:
+#   python simtrace.py xp.trace [start [stop]] > xp.data
+if __name__ == "__main__":
+  if len(sys.argv) < 2:
+    sys.exit("usage: %s trace [start [stop]]" % sys.argv[0])
+  start = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+  stop  = int(sys.argv[3]) if len(sys.argv) > 3 else None
+  Trace(sys.argv[1]).export(sys.stdout, start, stop)
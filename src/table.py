@@ -0,0 +1,243 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import simtrace
+import itertools
+
+# Simulation by table lookups, for the scheduling functions whose state is made
+# of integers (SF_Fixed, SF_DQSF_1SF, SF_DUMB, SF_MSF_Legacy) or is quantized.
+#
+# An iteration of Simulation.__next__ is a pure function of the TxQ, the cells
+# allocated, the pending 6P requests, the state of the SF and the traffic. The
+# engine numbers the states as it meets them and remembers, for each state and
+# traffic value, the next state and what the iteration adds to the totals. The
+# first time a transition is met it is computed by running the iteration on a
+# Slotframe (after SchedulingFunction.set_state), then it is a lookup.
+#
+# With quantum, the floats of the SF state are rounded to multiples of quantum
+# after each iteration: a quantized variant of the SF (its estimators have a
+# fixed precision) whose states are finite, such as the EWMA and EWMM SFs.
+# The quantum has to be small against the steps of the estimators (the alphas
+# of the ewmm2 decay of BUDGET2), or they never move away from a multiple of it.
+#
+# The SF must not depend on iter_idx. The engine is kept from one run to the
+# next (same SF parameters, 6P delay and Config), its table only grows.
+
+# default bound on the number of states of a table
+MAX_STATES = 1 << 20
+
+# The totals added by a transition are packed in a single integer, one field of
+# FIELD bits each, so that an iteration only does one addition.
+FIELD = 48
+MASK  = (1 << FIELD) - 1
+
+def _pack(traffic, drop, sixp, cells, used):
+  return traffic | drop << FIELD | sixp << 2 * FIELD | cells << 3 * FIELD | used << 4 * FIELD
+
+"""
+Packed totals in the order of sim.TOTALS.
+"""
+def _unpack(total):
+  traffic, drop, sixp, cells, used = [ (total >> k * FIELD) & MASK for k in range(5) ]
+  return [ sixp, drop, traffic, cells, cells - used, used ]
+
+"""
+One iteration of Simulation.__next__ from state, (TxQ, cells allocated, pending
+6P requests as Slotframe.sixp_requests), with traffic. The SF is in the state of
+that SFrame. Returns the next state and (drop, sixp, cells, used) of the iteration.
+"""
+def step(schedfun, sframe, state, traffic):
+  txq, cells, sixp = state
+  sframe.cells_allocated = cells
+  sframe.sixp_count      = len(sixp)
+  for k, (ttl, decision) in enumerate(sixp):
+    sframe.sixp_ttl[k]      = ttl
+    sframe.sixp_decision[k] = decision
+
+  sframe.slotframe_end()
+  old_txq = txq
+  txq    += traffic
+  drop    = max(txq - sframe.config.max_txq, 0)
+  txq    -= drop
+  txq    -= sframe.traffic(txq)
+
+  decision = schedfun.apply(1, sframe, traffic, drop, txq, old_txq)["decision"]
+  if decision != 0:
+    sframe.allocate(decision)
+
+  state = (txq, sframe.get_cells_allocated(), sframe.sixp_requests())
+  return state, (drop, int(decision != 0), sframe.get_cells_allocated(), sframe.get_cells_used())
+
+"""
+Table of the transitions of schedfun, see above. Raises ValueError once it has
+more than max_states states.
+"""
+class TableEngine(object):
+  def __init__(self, schedfun, sixp_delay, config=None, quantum=None, max_states=MAX_STATES):
+    self.schedfun   = schedfun
+    self.config     = sim.DEFAULT_CONFIG if config is None else config
+    self.quantum    = quantum
+    self.max_states = max_states
+    self.sframe     = sim.Slotframe(sixp_delay, self.config)
+
+    # for each state, by traffic value: the next state (-1 until it is known)
+    # and the packed totals of the iteration
+    self.index  = {}
+    self.states = []
+    self.next   = []
+    self.totals = []
+    self.width  = 1
+    self.start  = self.__id((0, self.config.min_cells, (), self.__quantize(schedfun.state())))
+
+  def __quantize(self, state):
+    if self.quantum is None:
+      return state
+    q = self.quantum
+    return tuple(round(v / q) * q if isinstance(v, float) else v for v in state)
+
+  def __id(self, state):
+    i = self.index.get(state)
+    if i is None:
+      if len(self.states) >= self.max_states:
+        if self.quantum is None:
+          hint = "give a quantum to the floats of the SF state"
+        else:
+          hint = "coarsen the quantum (%r)" % self.quantum
+        raise ValueError("%s: more than %d states, raise max_states or %s"
+                         % (type(self.schedfun).__module__, self.max_states, hint))
+      i = self.index[state] = len(self.states)
+      self.states.append(state)
+      self.next.append([ -1 ] * self.width)
+      self.totals.append([ 0 ] * self.width)
+    return i
+
+  def __widen(self, width):
+    for row in self.next:
+      row.extend([ -1 ] * (width - self.width))
+    for row in self.totals:
+      row.extend([ 0 ] * (width - self.width))
+    self.width = width
+
+  def __learn(self, i, traffic):
+    if traffic >= self.width:
+      self.__widen(traffic + 1)
+    txq, cells, sixp, sf_state = self.states[i]
+    self.schedfun.set_state(sf_state)
+    state, (drop, sixp, cells, used) = step(self.schedfun, self.sframe, (txq, cells, sixp), traffic)
+    j = self.__id(state + (self.__quantize(self.schedfun.state()),))
+    self.next[i][traffic]   = j
+    self.totals[i][traffic] = _pack(traffic, drop, sixp, cells, used)
+    return j
+
+  """
+  n iterations from state i with the traffic values.
+  Returns the state reached and the packed totals of these iterations.
+  """
+  def __advance(self, i, values, n):
+    total = 0
+    nxt   = self.next
+    tot   = self.totals
+    for traffic in itertools.islice(values, n):
+      try:
+        j = nxt[i][traffic]
+      except IndexError:
+        j = -1
+      if j < 0:
+        j = self.__learn(i, traffic)
+      total += tot[i][traffic]
+      i = j
+    return i, total
+
+  def __len__(self):
+    return len(self.states)
+
+  """
+  Simulate the traffic pattern (a list or a traffic.Source) over max_iter
+  iterations, as a sim.Simulation of the SF would, and return its final
+  report as a simtrace.Report (totals and windows).
+  With a periodic pattern, the state is checked each time the pattern starts
+  over and the whole cycles are skipped once a state comes back, as with
+  Simulation fast_forward.
+  """
+  def run(self, traffic_pattern, max_iter, windows=None):
+    windows  = sim.default_windows() if windows is None else windows
+    stop     = max_iter + 1
+    bounds   = sorted({ w.start for w in windows if w.start < stop } |
+                      { w.stop for w in windows if w.stop is not None and w.stop < stop })
+
+    streaming = hasattr(traffic_pattern, "block")
+    period    = traffic_pattern.period if streaming else len(traffic_pattern)
+    if streaming:
+      values = lambda start: traffic_pattern.values(start)
+    else:
+      values = lambda start: itertools.islice(itertools.cycle(traffic_pattern), start % period, None)
+
+    stride = None if period is None else period * -(-sim.MIN_CYCLE_STRIDE // period)
+    seen   = {}
+
+    i         = self.start
+    total     = 0
+    iter_idx  = 0
+    snapshots = {}
+    it        = values(0)
+    while True:
+      while bounds and bounds[0] == iter_idx:
+        snapshots[bounds.pop(0)] = total
+      if iter_idx >= stop:
+        break
+      if stride is not None and iter_idx % stride == 0:
+        if len(seen) >= sim.MAX_CYCLE_STATES:
+          seen.clear()
+        first = seen.setdefault(i, (iter_idx, total))
+        if first[0] != iter_idx:
+          # skip whole cycles up to the next window boundary
+          length = iter_idx - first[0]
+          limit  = bounds[0] if bounds else stop
+          cycles = (limit - iter_idx) // length
+          if cycles > 0:
+            total    += cycles * (total - first[1])
+            iter_idx += cycles * length
+            it        = values(iter_idx)
+            seen      = {}
+            continue
+      n = stop - iter_idx
+      if bounds:
+        n = bounds[0] - iter_idx
+      if stride is not None:
+        n = min(n, stride - iter_idx % stride)
+      i, delta  = self.__advance(i, it, n)
+      total    += delta
+      iter_idx += n
+
+    final = _unpack(total)
+    report = { "totals": final, "windows": [] }
+    for w in windows:
+      begin = _unpack(snapshots[w.start]) if w.start in snapshots else final
+      end   = final if w.stop is None or w.stop not in snapshots else _unpack(snapshots[w.stop])
+      report["windows"].append({ "name": w.name, "start": w.start, "stop": w.stop,
+                                 "totals": [ b - a for a, b in zip(begin, end) ] })
+    return simtrace.Report(report)
@@ -0,0 +1,443 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import bisect
+import hashlib
+import itertools
+import math
+import numbers
+import numpy as np
+
+# Traffic patterns as sources that generate their values chunk by chunk with
+# NumPy, instead of a list built up front with one value per slotframe.
+# A Simulation accepts a Source wherever it accepts a list.
+#
+#   traffic.concat((traffic.Constant(2), 3600),
+#                  (traffic.Ramp(2, 8, 720), None))
+#   traffic.Poisson(1.5, seed=42) + traffic.Burst(20, every=120)
+#
+# Sources are immutable, any slice of their values is computed on its own,
+# so they can be shared by threads and sent to other processes as is. Random
+# sources draw each chunk from a generator seeded by (seed, chunk index): the
+# values do not depend on how they are read and are the same from one run to
+# the other for a given seed. They keep the last chunk they drew (read-only,
+# swapped in one assignment), which is not part of their values nor pickled.
+
+# values generated at once
+CHUNK = 1 << 16
+
+class Source(object):
+  # the values repeat with this period, None if they never do
+  period = None
+
+  """
+  Values of the slotframes [start, stop) as an int64 array.
+  """
+  def block(self, start, stop):
+    raise NotImplementedError
+
+  """
+  Arrays of the values from start on, endlessly. All of them are aligned
+  on size but the first one.
+  """
+  def chunks(self, start=0, size=CHUNK):
+    stop = (start // size + 1) * size
+    while True:
+      yield self.block(start, stop)
+      start, stop = stop, stop + size
+
+  """
+  Values from start on as Python integers, endlessly.
+  """
+  def values(self, start=0):
+    return itertools.chain.from_iterable(chunk.tolist() for chunk in self.chunks(start))
+
+  def __getitem__(self, i):
+    return int(self.block(i, i + 1)[0])
+
+  """
+  Hash of what the values depend on: the class and the attributes of the
+  source, the contents of its arrays and the digests of nested sources.
+  """
+  def digest(self):
+    h = hashlib.sha256(type(self).__name__.encode())
+    for name, value in sorted(vars(self).items()):
+      if name.startswith("_"):
+        continue
+      h.update(name.encode())
+      _update(h, value)
+    return h.hexdigest()
+
+  def __add__(self, other):
+    return Superpose(self, other)
+
+  def __mul__(self, factor):
+    return Scale(self, factor)
+
+  __rmul__ = __mul__
+
+def _update(h, value):
+  if isinstance(value, Source):
+    h.update(value.digest().encode())
+  elif isinstance(value, np.ndarray):
+    h.update(value.dtype.str.encode())
+    for i in range(0, len(value), CHUNK):
+      h.update(np.ascontiguousarray(value[i:i + CHUNK]))
+  elif isinstance(value, (list, tuple)):
+    h.update(b"[")
+    for v in value:
+      _update(h, v)
+    h.update(b"]")
+  else:
+    h.update(repr(value).encode())
+    h.update(b",")
+
+def _lcm(periods):
+  period = 1
+  for p in periods:
+    period = period * p // math.gcd(period, p)
+  return period
+
+def _positions(start, stop):
+  return np.arange(start, stop, dtype=np.int64)
+
+class Constant(Source):
+  period = 1
+
+  def __init__(self, value):
+    self.value = value
+
+  def block(self, start, stop):
+    return np.full(stop - start, self.value, dtype=np.int64)
+
+  def __repr__(self):
+    return "Constant(%r)" % self.value
+
+"""
+A list of values that repeats, as a list given to a Simulation.
+"""
+class Pattern(Source):
+  def __init__(self, values):
+    self.array  = np.asarray(values, dtype=np.int64)
+    self.period = len(self.array)
+
+  def block(self, start, stop):
+    return self.array[_positions(start, stop) % self.period]
+
+  def __repr__(self):
+    return "Pattern(<%d values>)" % self.period
+
+"""
+A pattern that repeats, given as runs of (value, length), for the patterns
+made of long constant stretches that would take one list item per slotframe.
+Reading a value is O(log runs), reading them in sequence O(1) each.
+"""
+class RunLength(Source):
+  def __init__(self, runs):
+    self.runs = []
+    for value, length in runs:
+      if length <= 0:
+        continue
+      if self.runs and self.runs[-1][0] == value:
+        self.runs[-1] = (value, self.runs[-1][1] + length)
+      else:
+        self.runs.append((value, length))
+    if not self.runs:
+      raise ValueError("a pattern needs at least one slotframe")
+    self.starts = [ 0 ]
+    for _, length in self.runs:
+      self.starts.append(self.starts[-1] + length)
+    self.period = self.starts.pop()
+    self.array  = np.array([ value for value, _ in self.runs ], dtype=np.int64)
+
+  """
+  Runs of a list of values.
+  """
+  @classmethod
+  def encode(cls, values):
+    return cls((value, len(list(group))) for value, group in itertools.groupby(values))
+
+  def __len__(self):
+    return self.period
+
+  def __getitem__(self, i):
+    return self.runs[bisect.bisect_right(self.starts, i % self.period) - 1][0]
+
+  """
+  Value at slotframe i and the first slotframe after i with another value
+  (inf if the pattern is a single value).
+  """
+  def run(self, i):
+    if len(self.runs) == 1:
+      return self.runs[0][0], math.inf
+    k     = bisect.bisect_right(self.starts, i % self.period) - 1
+    value = self.runs[k][0]
+    stop  = i - i % self.period + self.starts[k] + self.runs[k][1]
+    if k == len(self.runs) - 1 and self.runs[0][0] == value:
+      # the last run goes on with the first one
+      stop += self.runs[0][1]
+    return value, stop
+
+  def block(self, start, stop):
+    k = np.searchsorted(self.starts, _positions(start, stop) % self.period, side="right") - 1
+    return self.array[k]
+
+  def values(self, start=0):
+    k = bisect.bisect_right(self.starts, start % self.period) - 1
+    first = self.runs[k][0], self.starts[k] + self.runs[k][1] - start % self.period
+    rest  = itertools.cycle(self.runs[k + 1:] + self.runs[:k + 1])
+    return itertools.chain.from_iterable(itertools.repeat(value, length)
+                                         for value, length in itertools.chain([ first ], rest))
+
+  def __repr__(self):
+    return "RunLength(<%d runs, %d values>)" % (len(self.runs), self.period)
+
+"""
+high during on slotframes, then low during off slotframes, and so on.
+"""
+class OnOff(Source):
+  def __init__(self, on, off, high, low=0):
+    self.on     = on
+    self.off    = off
+    self.high   = high
+    self.low    = low
+    self.period = on + off
+
+  def block(self, start, stop):
+    on = _positions(start, stop) % self.period < self.on
+    return np.where(on, self.high, self.low).astype(np.int64)
+
+  def __repr__(self):
+    return "OnOff(%r, %r, %r, %r)" % (self.on, self.off, self.high, self.low)
+
+"""
+size packets during duration slotframes, every so many slotframes.
+"""
+class Burst(OnOff):
+  def __init__(self, size, every, duration=1):
+    OnOff.__init__(self, duration, every - duration, size)
+
+  def __repr__(self):
+    return "Burst(%r, every=%r, duration=%r)" % (self.high, self.period, self.on)
+
+"""
+From start to stop over duration slotframes, rounded to the nearest integer,
+then stop forever. With a duration of 0, it is stop from the first slotframe on.
+"""
+class Ramp(Source):
+  def __init__(self, start, stop, duration):
+    if duration < 0:
+      raise ValueError("a ramp needs a duration >= 0")
+    self.start    = start
+    self.stop     = stop
+    self.duration = duration
+
+  def block(self, start, stop):
+    if self.duration == 0:
+      return np.full(stop - start, round(self.stop), dtype=np.int64)
+    t    = np.minimum(_positions(start, stop), self.duration).astype(np.float64)
+    real = self.start + (self.stop - self.start) * t / self.duration
+    return np.rint(real).astype(np.int64)
+
+  def __repr__(self):
+    return "Ramp(%r, %r, %r)" % (self.start, self.stop, self.duration)
+
+"""
+mean + amplitude * cos(2 pi t / period), truncated as int() does and
+at least 0. When period is a whole number of slotframes, t is taken
+modulo period and the values repeat exactly.
+"""
+class Sinusoid(Source):
+  def __init__(self, mean, amplitude, period, phase=0):
+    self.mean      = mean
+    self.amplitude = amplitude
+    self.length    = period
+    self.phase     = phase
+    self.period    = int(period) if isinstance(period, numbers.Integral) else None
+
+  def block(self, start, stop):
+    t = _positions(start, stop) + self.phase
+    if self.period is not None:
+      # the same values each period, whatever the rounding of the cosine
+      t %= self.period
+    t    = t.astype(np.float64)
+    real = self.mean + self.amplitude * np.cos(t * 2 * math.pi / self.length)
+    return np.maximum(np.trunc(real), 0).astype(np.int64)
+
+  def __repr__(self):
+    return "Sinusoid(%r, %r, %r, phase=%r)" % (self.mean, self.amplitude, self.length, self.phase)
+
+"""
+Base of the random sources, see generate.
+"""
+class RandomSource(Source):
+  # (index, values) of the last chunk drawn
+  _last = None
+
+  def __init__(self, seed=None):
+    # without a seed we draw one, so that the values of a source are still
+    # the same each time they are read
+    self.seed = np.random.SeedSequence().entropy if seed is None else seed
+
+  """
+  CHUNK values drawn from rng.
+  """
+  def generate(self, rng):
+    raise NotImplementedError
+
+  """
+  Values of chunk i, drawn again only when it is not the last one drawn, so
+  that reading the values one by one does not draw CHUNK values each time.
+  """
+  def chunk(self, i):
+    last = self._last
+    if last is not None and last[0] == i:
+      return last[1]
+    values = self.generate(np.random.default_rng([ self.seed, i ])).astype(np.int64, copy=False)
+    values.flags.writeable = False
+    self._last = (i, values)
+    return values
+
+  def block(self, start, stop):
+    first  = start // CHUNK
+    last   = -(-stop // CHUNK)
+    chunks = [ self.chunk(i) for i in range(first, last) ]
+    if not chunks:
+      return np.zeros(0, dtype=np.int64)
+    values = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+    return values[start - first * CHUNK:stop - first * CHUNK]
+
+  def __getitem__(self, i):
+    return int(self.chunk(i // CHUNK)[i % CHUNK])
+
+  def __getstate__(self):
+    state = dict(vars(self))
+    state.pop("_last", None)
+    return state
+
+"""
+Integers between low and high, both included, as random.randint.
+"""
+class Uniform(RandomSource):
+  def __init__(self, low, high, seed=None):
+    RandomSource.__init__(self, seed)
+    self.low  = low
+    self.high = high
+
+  def generate(self, rng):
+    return rng.integers(self.low, self.high, CHUNK, endpoint=True)
+
+  def __repr__(self):
+    return "Uniform(%r, %r, seed=%r)" % (self.low, self.high, self.seed)
+
+class Poisson(RandomSource):
+  def __init__(self, lam, seed=None):
+    RandomSource.__init__(self, seed)
+    self.lam = lam
+
+  def generate(self, rng):
+    return rng.poisson(self.lam, CHUNK)
+
+  def __repr__(self):
+    return "Poisson(%r, seed=%r)" % (self.lam, self.seed)
+
+"""
+The parts one after the other, each one given as (source, duration) and read
+from its own start. The whole repeats, unless the duration of the last part
+is None, then it goes on forever.
+"""
+class Concat(Source):
+  def __init__(self, *parts):
+    if not parts:
+      raise ValueError("concat needs at least one part")
+    if any(duration is None for _, duration in parts[:-1]):
+      raise ValueError("only the last part may go on forever")
+    self.parts   = parts
+    self.offsets = [ 0 ]
+    for _, duration in parts[:-1]:
+      self.offsets.append(self.offsets[-1] + duration)
+    last = parts[-1][1]
+    self.period = None if last is None else self.offsets[-1] + last
+
+  def block(self, start, stop):
+    out = []
+    pos = start
+    while pos < stop:
+      t = pos if self.period is None else pos % self.period
+      k = bisect.bisect_right(self.offsets, t) - 1
+      source, duration = self.parts[k]
+      local = t - self.offsets[k]
+      n     = stop - pos if duration is None else min(stop - pos, duration - local)
+      out.append(source.block(local, local + n))
+      pos  += n
+    if not out:
+      return np.zeros(0, dtype=np.int64)
+    return out[0] if len(out) == 1 else np.concatenate(out)
+
+  def __repr__(self):
+    return "concat(%s)" % ", ".join("(%r, %r)" % part for part in self.parts)
+
+def concat(*parts):
+  return Concat(*parts)
+
+"""
+Sum of the sources, slotframe by slotframe.
+"""
+class Superpose(Source):
+  def __init__(self, *sources):
+    self.sources = sources
+    periods      = [ s.period for s in sources ]
+    self.period  = None if None in periods else _lcm(periods)
+
+  def block(self, start, stop):
+    out = self.sources[0].block(start, stop)
+    for source in self.sources[1:]:
+      out = out + source.block(start, stop)
+    return out
+
+  def __repr__(self):
+    return "superpose(%s)" % ", ".join(repr(s) for s in self.sources)
+
+def superpose(*sources):
+  return Superpose(*sources)
+
+"""
+Values of source times factor, rounded to the nearest integer (half to even).
+"""
+class Scale(Source):
+  def __init__(self, source, factor):
+    self.source = source
+    self.factor = factor
+    self.period = source.period
+
+  def block(self, start, stop):
+    return np.maximum(np.rint(self.source.block(start, stop) * self.factor), 0).astype(np.int64)
+
+  def __repr__(self):
+    return "scale(%r, %r)" % (self.source, self.factor)
+
+def scale(source, factor):
+  return Scale(source, factor)
@@ -57,7 +57,7 @@ schedfun   = SF_DQSF_EWMM_BUDGET2.SchedulingFunction(ALPHA0, ALPHA1, OVERPROVISI
 
 # Our previous implementation
 #schedfun   = SF_DQSF_1SF.SchedulingFunction(ALPHA, OVERPROVISION)
-simulation = sim.Simulation(MAX_ITER, SIXP_DELAY, TRAFFIC_PATTERN, schedfun, sim.PrintPlot)
+simulation = sim.Simulation(MAX_ITER, SIXP_DELAY, TRAFFIC_PATTERN, schedfun, sim.BufferedPlot())
 
 for _ in simulation:
   pass
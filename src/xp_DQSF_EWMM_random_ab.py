@@ -25,6 +25,7 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import sim
+import simbatch
 import SF_MSF_Legacy
 import SF_DQSF_1SF
 import SF_DQSF_EWMA
@@ -49,41 +50,33 @@ TRAFFIC_PATTERN = [ random.randint(0, 6) for i in range(MAX_ITER) ]
 def print_legend():
   print("# alpha beta    total_sixp total_drop total_traffic    total_cells total_unused_cells total_used_cells    pct_sixp pct_drop pct_unused_cells pct_used_cells")
 
-def print_stats(alpha, beta, simulation):
-  total_sixp       = simulation.sframe.total_sixp_requests()
-  pct_sixp         = (100. * total_sixp) / simulation.total_traffic
-  pct_drop         = (100. * simulation.total_drop) / simulation.total_traffic
-  pct_unused_cells = (100. * simulation.total_unused_cells) / simulation.total_cells
-  pct_used_cells   = (100. * simulation.total_used_cells) / simulation.total_cells
-  print(f"{alpha} {beta}    {total_sixp} {simulation.total_drop} {simulation.total_traffic}    {simulation.total_cells} {simulation.total_unused_cells} {simulation.total_used_cells}    {pct_sixp} {pct_drop} {pct_unused_cells} {pct_used_cells}")
-
-def test_traffic(alpha, beta):
-  # The last iteration EWMM BUDGET2
-  schedfun   = SF_DQSF_EWMM_BUDGET2.SchedulingFunction(alpha, beta, OVERPROVISION_CELLS, OVERPROVISION_TXQ)
-  simulation = sim.Simulation(MAX_ITER, SIXP_DELAY, TRAFFIC_PATTERN, schedfun, sim.PrintNull)
+def print_stats(summary):
+  alpha, beta = summary.params
+  print(f"{alpha} {beta}    {summary.total_sixp} {summary.total_drop} {summary.total_traffic}    {summary.total_cells} {summary.total_unused_cells} {summary.total_used_cells}    {summary.pct_sixp} {summary.pct_drop} {summary.pct_unused_cells} {summary.pct_used_cells}")
 
+def test_traffic(grid):
+  # The last iteration EWMM BUDGET2, all the parameter sets in one lockstep
+  # pass over the pattern (see simbatch)
+  alphas, betas = zip(*grid)
+  schedfun   = SF_DQSF_EWMM_BUDGET2.BatchSchedulingFunction(alphas, betas, OVERPROVISION_CELLS, OVERPROVISION_TXQ)
+  simulation = simbatch.Simulation(MAX_ITER, SIXP_DELAY, TRAFFIC_PATTERN, schedfun)
   for _ in simulation:
     pass
-
-  print_stats(alpha, beta, simulation)
+  for params, result in zip(grid, simulation.results()):
+    print_stats(sim.Summary(params, result))
 
 DEFAULT_ALPHA = ALPHA0
 DEFAULT_BETA  = ALPHA1
 
-print_legend()
+if __name__ == "__main__":
+  print_legend()
 
-# change alpha
-alpha_0    = 0.01
-alpha_step = 0.01
-print("# ==== change alpha ====")
-for i in range(100):
-  alpha = alpha_0 + i * alpha_step
-  beta  = DEFAULT_BETA
-  test_traffic(alpha, beta)
-print("# ==== change beta ====")
-beta_0    = 0.0005
-beta_step = 0.0005
-for i in range(200):
-  alpha = DEFAULT_ALPHA
-  beta  = beta_0 + i * beta_step
-  test_traffic(alpha, beta)
+  # change alpha
+  alpha_0    = 0.01
+  alpha_step = 0.01
+  print("# ==== change alpha ====")
+  test_traffic([ (alpha_0 + i * alpha_step, DEFAULT_BETA) for i in range(100) ])
+  print("# ==== change beta ====")
+  beta_0    = 0.0005
+  beta_step = 0.0005
+  test_traffic([ (DEFAULT_ALPHA, beta_0 + i * beta_step) for i in range(200) ])
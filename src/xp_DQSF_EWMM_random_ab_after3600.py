@@ -33,7 +33,6 @@ import SF_DQSF_EWMM_TXQ
 import SF_DQSF_EWMM_BUDGET2
 import math
 import random
-import copy
 
 SIXP_DELAY    = 2
 ALPHA         = 0.1
@@ -50,45 +49,31 @@ TRAFFIC_PATTERN = [ random.randint(0, 6) for i in range(MAX_ITER) ]
 def print_legend():
   print("# alpha beta    total_sixp total_drop total_traffic    total_cells total_unused_cells total_used_cells    pct_sixp pct_drop pct_unused_cells pct_used_cells")
 
-def print_stats(alpha, beta, simulation_at_3600, simulation):
-  total_sixp       = simulation.sframe.total_sixp_requests() - simulation_at_3600.sframe.total_sixp_requests()
-  pct_sixp         = (100. * total_sixp) / (simulation.total_traffic - simulation_at_3600.total_traffic)
-  pct_drop         = (100. * (simulation.total_drop - simulation_at_3600.total_drop)) / (simulation.total_traffic - simulation_at_3600.total_traffic)
-  pct_unused_cells = (100. * (simulation.total_unused_cells - simulation_at_3600.total_unused_cells)) / (simulation.total_cells - simulation_at_3600.total_cells)
-  pct_used_cells   = (100. * (simulation.total_used_cells - simulation_at_3600.total_used_cells)) / (simulation.total_cells - simulation_at_3600.total_cells)
-  print(f"{alpha} {beta}    {total_sixp} {simulation.total_drop-simulation_at_3600.total_drop} {simulation.total_traffic-simulation_at_3600.total_traffic}    {simulation.total_cells-simulation_at_3600.total_cells} {simulation.total_unused_cells-simulation_at_3600.total_unused_cells} {simulation.total_used_cells-simulation_at_3600.total_used_cells}    {pct_sixp} {pct_drop} {pct_unused_cells} {pct_used_cells}")
+def print_stats(summary):
+  alpha, beta = summary.params
+  print(f"{alpha} {beta}    {summary.total_sixp} {summary.total_drop} {summary.total_traffic}    {summary.total_cells} {summary.total_unused_cells} {summary.total_used_cells}    {summary.pct_sixp} {summary.pct_drop} {summary.pct_unused_cells} {summary.pct_used_cells}")
 
-simulation_at_3600 = None
-def test_traffic(alpha, beta):
+def budget2(alpha, beta):
   # The last iteration EWMM BUDGET2
-  schedfun   = SF_DQSF_EWMM_BUDGET2.SchedulingFunction(alpha, beta, OVERPROVISION_CELLS, OVERPROVISION_TXQ)
-  simulation = sim.Simulation(MAX_ITER, SIXP_DELAY, TRAFFIC_PATTERN, schedfun, sim.PrintNull)
+  return SF_DQSF_EWMM_BUDGET2.SchedulingFunction(alpha, beta, OVERPROVISION_CELLS, OVERPROVISION_TXQ)
 
-  for _ in simulation:
-    # ugly side-effect deep-knowledge hack
-    # don't do this at home
-    if simulation.iter_idx == 3600:
-      simulation_at_3600 = copy.deepcopy(simulation)
-
-  print_stats(alpha, beta, simulation_at_3600, simulation)
+def test_traffic(grid):
+  # each run is independent, spread them over the cores
+  for summary in sim.sweep(budget2, grid, TRAFFIC_PATTERN, SIXP_DELAY, MAX_ITER, window=sim.Window(3600)):
+    print_stats(summary)
 
 DEFAULT_ALPHA = ALPHA0
 DEFAULT_BETA  = ALPHA1
 
-print_legend()
+if __name__ == "__main__":
+  print_legend()
 
-# change alpha
-alpha_0    = 0.01
-alpha_step = 0.01
-print("# ==== change alpha ====")
-for i in range(100):
-  alpha = alpha_0 + i * alpha_step
-  beta  = DEFAULT_BETA
-  test_traffic(alpha, beta)
-print("# ==== change beta ====")
-beta_0    = 0.0005
-beta_step = 0.0005
-for i in range(200):
-  alpha = DEFAULT_ALPHA
-  beta  = beta_0 + i * beta_step
-  test_traffic(alpha, beta)
+  # change alpha
+  alpha_0    = 0.01
+  alpha_step = 0.01
+  print("# ==== change alpha ====")
+  test_traffic([ (alpha_0 + i * alpha_step, DEFAULT_BETA) for i in range(100) ])
+  print("# ==== change beta ====")
+  beta_0    = 0.0005
+  beta_step = 0.0005
+  test_traffic([ (DEFAULT_ALPHA, beta_0 + i * beta_step) for i in range(200) ])
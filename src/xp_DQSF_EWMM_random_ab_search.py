@@ -0,0 +1,67 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sim
+import search
+import SF_DQSF_EWMM_BUDGET2
+import xp_DQSF_EWMM_random_ab as ab
+
+# Same question as xp_DQSF_EWMM_random_ab.py (best alpha and beta of BUDGET2
+# over the same random traffic), answered with a search instead of the grids.
+
+OBJECTIVE = search.weighted(sixp=1., drop=1., unused=1.)
+
+def problem(sf_factory):
+  return search.Problem(sf_factory, ab.TRAFFIC_PATTERN, ab.SIXP_DELAY, ab.MAX_ITER, OBJECTIVE)
+
+if __name__ == "__main__":
+  ab.print_legend()
+
+  print("# ==== change alpha ====")
+  p = problem(ab.budget2)
+  params, value, summary = search.golden(p, lambda alpha: (alpha, ab.DEFAULT_BETA),
+                                         search.Dimension(0.01, 1., log=True))
+  ab.print_stats(summary)
+  print("# objective %s after %d simulations" % (value, len(p.history)))
+
+  print("# ==== change beta ====")
+  p = problem(ab.budget2)
+  params, value, summary = search.golden(p, lambda beta: (ab.DEFAULT_ALPHA, beta),
+                                         search.Dimension(0.0005, 0.1, log=True))
+  ab.print_stats(summary)
+  print("# objective %s after %d simulations" % (value, len(p.history)))
+
+  print("# ==== alpha0 alpha1 overprovision_cells overprovision_txq ====")
+  p = problem(SF_DQSF_EWMM_BUDGET2.SchedulingFunction)
+  params, value, summary = search.bayesian(p, [
+    search.Dimension(0.01, 1., log=True),
+    search.Dimension(0.0005, 0.1, log=True),
+    search.Dimension(0, 3, integer=True),
+    search.Dimension(0, sim.MAX_TXQ, integer=True) ], seed=1)
+  print("# %s %s %s %s    %s %s %s    %s %s %s" % (params + (
+    summary.total_sixp, summary.total_drop, summary.total_traffic,
+    summary.pct_sixp, summary.pct_drop, summary.pct_unused_cells)))
+  print("# objective %s after %d simulations" % (value, len(p.history)))
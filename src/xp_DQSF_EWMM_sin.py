@@ -65,7 +65,7 @@ schedfun   = SF_DQSF_EWMM_BUDGET2.SchedulingFunction(ALPHA0, ALPHA1, OVERPROVISI
 #schedfun   = SF_DQSF_EWMA.SchedulingFunction(ALPHA, OVERPROVISION)
 
 # Our previous implementation
-simulation = sim.Simulation(len(TRAFFIC_PATTERN), SIXP_DELAY, TRAFFIC_PATTERN, schedfun, sim.PrintPlot)
+simulation = sim.Simulation(len(TRAFFIC_PATTERN), SIXP_DELAY, TRAFFIC_PATTERN, schedfun, sim.BufferedPlot())
 
 for _ in simulation:
   pass
@@ -32,6 +32,7 @@ import SF_DQSF_EWMM
 import SF_DQSF_EWMM_TXQ
 import SF_DQSF_EWMM_BUDGET2
 import SF_Fixed
+import fixed
 import math
 import random
 
@@ -45,30 +46,27 @@ OVERPROVISION_TXQ   = math.floor(0.7*sim.MAX_TXQ)
 
 MAX_ITER = 86400
 
+# numbers of cells tried, and the two after the last one
+CANDIDATES = 100
+
 def find_highest_cell_usage(name, traffic_pattern):
+  # all the numbers of cells in one pass over the pattern
+  f         = fixed.FixedCells(range(0, CANDIDATES + 2), MAX_ITER, traffic_pattern)
+  after3600 = f.windows[0]
+  usage     = lambda i: (100. * int(after3600.total_used_cells[i])) / int(after3600.total_cells[i])
+
   highest_nb_cell    = -1
   highest_cell_usage = -1
-  for i in range(0, 100):
-    sf = SF_Fixed.SchedulingFunction(i)
-    s  = sim.Simulation(MAX_ITER, SIXP_DELAY, traffic_pattern, sf, sim.PrintNull)
-    for _ in s:
-      pass
-    if s.total_drop_after3600 == 0:
-      highest_nb_cell    = i
-      highest_cell_usage = (100. * s.total_used_cells_after3600) / s.total_cells_after3600
-      break
+  i = fixed.fewest_cells_without_drop(f)
+  if i is not None and i < CANDIDATES:
+    highest_nb_cell    = i
+    highest_cell_usage = usage(i)
+  else:
+    i = CANDIDATES - 1
   # with one extra cell for overprov
-  sf = SF_Fixed.SchedulingFunction(i+1)
-  s  = sim.Simulation(MAX_ITER, SIXP_DELAY, traffic_pattern, sf, sim.PrintNull)
-  for _ in s:
-    pass
-  highest_cell_usage_with_1over = (100. * s.total_used_cells_after3600) / s.total_cells_after3600
+  highest_cell_usage_with_1over = usage(i + 1)
   # with two
-  sf = SF_Fixed.SchedulingFunction(i+2)
-  s  = sim.Simulation(MAX_ITER, SIXP_DELAY, traffic_pattern, sf, sim.PrintNull)
-  for _ in s:
-    pass
-  highest_cell_usage_with_2over = (100. * s.total_used_cells_after3600) / s.total_cells_after3600
+  highest_cell_usage_with_2over = usage(i + 2)
 
 
   print(name, highest_nb_cell, highest_cell_usage, highest_cell_usage_with_1over, highest_cell_usage_with_2over)
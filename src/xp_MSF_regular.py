@@ -56,7 +56,7 @@ schedfun = SF_MSF_Legacy.SchedulingFunction(0.25, 0.75, 100)
 
 # Our previous implementation
 #schedfun   = SF_DQSF_1SF.SchedulingFunction(ALPHA, OVERPROVISION)
-simulation = sim.Simulation(MAX_ITER, SIXP_DELAY, TRAFFIC_PATTERN, schedfun, sim.PrintPlot)
+simulation = sim.Simulation(MAX_ITER, SIXP_DELAY, TRAFFIC_PATTERN, schedfun, sim.BufferedPlot())
 
 for _ in simulation:
   pass
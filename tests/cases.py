@@ -0,0 +1,120 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import contextlib
+import hashlib
+import io
+import math
+import random
+
+# Simulations shared by the tests and make_golden.py. They only use what the
+# simulator had before the optimizations (plain iteration with PrintPlot), so
+# that make_golden.py can run them on the sources of that version.
+
+MAX_ITER = 4000 # past the warm-up of the default window (After t=3600)
+DELAYS   = [ 0, 1, 2, 5 ] # pending 6P requests, see sim.Slotframe
+
+def _random_pattern(n):
+  rng = random.Random(1234)
+  return [ rng.randint(0, 6) for i in range(n) ]
+
+def _prog_pattern(n):
+  pattern = [ 2 ] * 3600
+  current = 2
+  for i in range(3600, 3600 + 120*6):
+    real = 2 + float(i - 3600) / 120
+    if abs(current - real) > 0.1:
+      current += 1 if current < real else -1
+    pattern.append(current)
+  return (pattern + [ 8 ] * n)[:n]
+
+PATTERNS = {
+  "regular" : lambda: [ 6 ],
+  "periodic": lambda: [ 6, 0 ],
+  "random"  : lambda: _random_pattern(MAX_ITER),
+  "bursty"  : lambda: [ 5, 5, 5, 5 ] + [ 0 ] * 120,
+  "verylow" : lambda: [ 1 ] + [ 0 ] * 120,
+  "sin"     : lambda: [ 4 ] * 3600 + [ int(4 + 3*math.cos(i*2*math.pi / 60)) for i in range(3600, MAX_ITER) ],
+  "prog"    : lambda: _prog_pattern(MAX_ITER),
+  "zero"    : lambda: [ 0 ] }
+
+def schedfuns():
+  import SF_DQSF_1SF
+  import SF_DQSF_EWMA
+  import SF_DQSF_EWMM
+  import SF_DQSF_EWMM_BUDGET2
+  import SF_DQSF_EWMM_TXQ
+  import SF_DUMB
+  import SF_Fixed
+  import SF_MSF_Legacy
+  return {
+    "SF_Fixed"            : lambda: SF_Fixed.SchedulingFunction(4),
+    "SF_DUMB"             : lambda: SF_DUMB.SchedulingFunction(0.1, 1),
+    "SF_DQSF_1SF"         : lambda: SF_DQSF_1SF.SchedulingFunction(0.1, 1),
+    "SF_DQSF_EWMA"        : lambda: SF_DQSF_EWMA.SchedulingFunction(0.1, 1),
+    "SF_DQSF_EWMM"        : lambda: SF_DQSF_EWMM.SchedulingFunction(0.1, 0.01, 1),
+    "SF_DQSF_EWMM_TXQ"    : lambda: SF_DQSF_EWMM_TXQ.SchedulingFunction(0.1, 0.01, 1),
+    "SF_DQSF_EWMM_BUDGET2": lambda: SF_DQSF_EWMM_BUDGET2.SchedulingFunction(0.1, 0.01, 1, 7),
+    "SF_DQSF_EWMM_BUDGET2_show_alloc":
+                            lambda: SF_DQSF_EWMM_BUDGET2.SchedulingFunction(0.1, 0.01, 1, 7, show_alloc=True),
+    "SF_MSF_Legacy"       : lambda: SF_MSF_Legacy.SchedulingFunction(0.25, 0.75, 100) }
+
+"""
+(schedfun, pattern, sixp_delay) of the golden outputs: every SF and pattern
+with the delay of the experiments, and the other delays on a few patterns.
+"""
+def cases():
+  for sf in schedfuns():
+    for pattern in PATTERNS:
+      yield sf, pattern, 2
+    for delay in DELAYS:
+      if delay != 2:
+        for pattern in ("random", "bursty", "prog"):
+          yield sf, pattern, delay
+
+"""
+Everything a simulation writes to stdout: PrintPlot rows, what the SF prints
+itself (show_alloc) and the final report with the default window. The
+simulation is made by make(max_iter, sixp_delay, pattern, schedfun) and run
+by drive (plain iteration by default).
+"""
+def output(make, sf, pattern, delay, drive=None):
+  out = io.StringIO()
+  with contextlib.redirect_stdout(out):
+    try:
+      simulation = make(MAX_ITER, delay, PATTERNS[pattern](), schedfuns()[sf]())
+      if drive is None:
+        for _ in simulation:
+          pass
+      else:
+        drive(simulation)
+    except ZeroDivisionError:
+      # percentages of a report without traffic or cells
+      print("ZeroDivisionError")
+  return out.getvalue()
+
+def digest(text):
+  return hashlib.sha256(text.encode()).hexdigest()
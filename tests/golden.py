@@ -0,0 +1,155 @@
+# Generated by make_golden.py, do not edit.
+GOLDEN = \
+{('SF_DQSF_1SF', 'bursty', 0): '64d462acd987793b3b03d9a25a732dcbcdd39a888e580aef25d9173565dabe4d',
+ ('SF_DQSF_1SF', 'bursty', 1): 'f952ab6244cd9a8acdc0370efb48674ef766d2c6a40eed4b9a70a32e308d7877',
+ ('SF_DQSF_1SF', 'bursty', 2): 'f3524a518011f505e7e0756695395119a9f9f9e2626d3c85716477157b0e4ddd',
+ ('SF_DQSF_1SF', 'bursty', 5): '146cfbb6ca716b7ae1cd99952ac3c5c0dc3e7f8ed6753b241afa5c80553bf31d',
+ ('SF_DQSF_1SF', 'periodic', 2): '2c4ff991cc6b3e2f66b17842fed41843054c1ad7a1e501658154614f71b26410',
+ ('SF_DQSF_1SF', 'prog', 0): 'f9996a2366aa237088e11c095796516597cf5d9018d60e96f2d8d7b1b9198226',
+ ('SF_DQSF_1SF', 'prog', 1): '5de99da4030602ef7184bebcc29b38817e42d7fad7cb70f4b609c8515f565d61',
+ ('SF_DQSF_1SF', 'prog', 2): '8536319963bbc16db33e4c386f4927911b6ddb9fa89ccb4d2bde181d21bc5586',
+ ('SF_DQSF_1SF', 'prog', 5): '001a096d973f7e84ea47e02c2c1784ea2b29ce7e2094075e34c5633cdf42b3f9',
+ ('SF_DQSF_1SF', 'random', 0): '0f50664828b5aa67df674bfc06de356979a8167c668410c747df1472b1bf8f49',
+ ('SF_DQSF_1SF', 'random', 1): '1fedde5a94f212d7a629733a0abae4ff72e3beebca7c0cda8f27e6c839a1d91b',
+ ('SF_DQSF_1SF', 'random', 2): '1bc80a6a39cf37e55b32b04bcb3a4852bbbed3e11649beeab3a31a8d0c3a0a3c',
+ ('SF_DQSF_1SF', 'random', 5): '382040735f9bbc585a127a9e45214cb9a30b0102f23b404207d3479c47aa4eb0',
+ ('SF_DQSF_1SF', 'regular', 2): '95a5813451932eead1df460c0575de71e0a5d1e7b600edb47f7244fe78ee333b',
+ ('SF_DQSF_1SF', 'sin', 2): '03e00c8974af024b7dbf905eea764cd09aed380a52d59f2386260eb5bb7304e1',
+ ('SF_DQSF_1SF', 'verylow', 2): 'e3b60a4c0a9c4b7dc4ffae2b97e06c9007d1aba0bfcefb2da9216297dacdfd98',
+ ('SF_DQSF_1SF', 'zero', 2): '57fc5895afb910e0720be1019b3deef37322bb18b24097d7594ae6dc3e323a5b',
+ ('SF_DQSF_EWMA', 'bursty', 0): '7ad371bb31c840bf86a9527ff7cbeedc54e6595ce112a780ba5372d4d1531e8d',
+ ('SF_DQSF_EWMA', 'bursty', 1): '9eda3e9067aa050aca86b872db36ebbf406ba8b21224fd77becb3138e66e944e',
+ ('SF_DQSF_EWMA', 'bursty', 2): '3e893442c32a58ba7a0416bc6859362bc83d190ad1eeff8f48c1025a3d5f6607',
+ ('SF_DQSF_EWMA', 'bursty', 5): '62ddc1ad5dc1345e3e1c5dbca933d3791638bdb8ad3754b62c031006a8f15ed3',
+ ('SF_DQSF_EWMA', 'periodic', 2): 'c632dff1d5a7e877799b5e078471dfa6b29702fb975f41899744d78058b5d033',
+ ('SF_DQSF_EWMA', 'prog', 0): 'e4c51070dc49f902fbe64f85098aca611264894cbfc8cb906f4dc67bcf55ad2e',
+ ('SF_DQSF_EWMA', 'prog', 1): '31a12d2f43ff12bd31d60b87a0ef50161c5c1906b1dbaf54d0906e22b36b91e1',
+ ('SF_DQSF_EWMA', 'prog', 2): 'b074f47e30357f848cca7c58823eba70cadf0f310a4171ebfa5b6ca9c091102a',
+ ('SF_DQSF_EWMA', 'prog', 5): 'c36455c46855667cdb61d086377e1222911db3a2f8c609eadaa5b91ad585e6da',
+ ('SF_DQSF_EWMA', 'random', 0): 'afd7104c9839d63d87460ff967d423aadb3404c584ebdc30387cd8ea331fd667',
+ ('SF_DQSF_EWMA', 'random', 1): '9e6c59e88e75e52113437ff0d2b74ef6009e5351b3b854bf6b68f9c715a87b86',
+ ('SF_DQSF_EWMA', 'random', 2): 'c724f350876468129346bab18591b52c5b4e04492c76909ed80dad9acbc64ecf',
+ ('SF_DQSF_EWMA', 'random', 5): '382a42e81cfce8b8afea9711248394405770d0146e94f4d88230860bd5570882',
+ ('SF_DQSF_EWMA', 'regular', 2): '2136232499a136d08cecb5c3205550a981eff90ba970adbf7177ccb26d38be7d',
+ ('SF_DQSF_EWMA', 'sin', 2): '3731a1ff0a6b20d703cbd8d217897248aa898707113dda81f457e727b4be7069',
+ ('SF_DQSF_EWMA', 'verylow', 2): 'fe5051a0c282405fdced0274fd7ef40645a6b2b397077e8dc4e2f4ac9e7f699c',
+ ('SF_DQSF_EWMA', 'zero', 2): '806b71753a4cb4d90e07e4b426f3698ca9611950a9e4e198216b03197098326d',
+ ('SF_DQSF_EWMM', 'bursty', 0): '46c8aacb0a3839c22136e9669f667e051c58fd81c745dd454c25287fead58936',
+ ('SF_DQSF_EWMM', 'bursty', 1): '5135f256825654b2365478e65363ecd4be56c5eba32588d8eb2e1c905795760f',
+ ('SF_DQSF_EWMM', 'bursty', 2): 'db7ee360176debbc786f8339c33baec68d8cb7a897635255a1c426f9283f2faa',
+ ('SF_DQSF_EWMM', 'bursty', 5): '707d77768f1a18454c0214d8c1959fbb8b8825cc82e9b6e97f60a64acac501a8',
+ ('SF_DQSF_EWMM', 'periodic', 2): '33b414c093e0e61b53ea064ef70c21f60e78bd0f9ca99d114ad9f93e974d4beb',
+ ('SF_DQSF_EWMM', 'prog', 0): '5157d59711ca9f43e96b65ce3bc732028c493d7fdbb3119833a150d910eb53e1',
+ ('SF_DQSF_EWMM', 'prog', 1): 'dbf217c6b0f59120676b9d4a8072509a9c44f1c20202ed02d5e649a00869dd18',
+ ('SF_DQSF_EWMM', 'prog', 2): 'd951ccb40d440dfc2b6ee3a5bfdba68d3485c10903964b9f28bfe4249acc2d4d',
+ ('SF_DQSF_EWMM', 'prog', 5): '5d0960c2dc32c334d26fe8a6ddd88f8f41d4e4d9af421a705fc35531d8a777ba',
+ ('SF_DQSF_EWMM', 'random', 0): '1f36727dc7a4bf073075a0007ab28722098ff05fb015f51a0093cc67724ff5b2',
+ ('SF_DQSF_EWMM', 'random', 1): '5f01d79df941abe73a6f86211ff8f84ef7e83a3d29fbbb839f7048c2c68e47c5',
+ ('SF_DQSF_EWMM', 'random', 2): 'bbc1253a3dcaa330405b0ca964ec43a808f64cd63896f31565efaa1dae5776f3',
+ ('SF_DQSF_EWMM', 'random', 5): '07888683ee1dbe20b23269a70c12bf913b1b787ee66501439610bb55bc98107c',
+ ('SF_DQSF_EWMM', 'regular', 2): '0c9cf1393cfd8face87818295c6464e1d98060b2d9133b69322308fb0edc0b8c',
+ ('SF_DQSF_EWMM', 'sin', 2): 'f4c67828e175905901ec1d6a30543d26ab0886569873fb8f4b5507d66bf95bec',
+ ('SF_DQSF_EWMM', 'verylow', 2): 'da2589626d353b52b0025bf8ee7ba1669dfb0e01fc3edc955fff43c12aed6ba9',
+ ('SF_DQSF_EWMM', 'zero', 2): '2ecbb3b3ab938aff6e5ffb1cab8415e17f57e68196159b7fd5b35aa47fba22cc',
+ ('SF_DQSF_EWMM_BUDGET2', 'bursty', 0): '24ef856ec65a6cf7e59274fdd66dd0a852110b8ed8418388e7a260b7a7da2dc6',
+ ('SF_DQSF_EWMM_BUDGET2', 'bursty', 1): '15de065cfa8c5cbdf57cc7295e2b7185cf9c62d8ee0745fd11ffa59dba864eab',
+ ('SF_DQSF_EWMM_BUDGET2', 'bursty', 2): '59d690d0cae34cf6ebc7d608817bbb2344302879f2c0a9046b1b4a56f219e1b8',
+ ('SF_DQSF_EWMM_BUDGET2', 'bursty', 5): 'd0890a6f1ed8b65db5ed1d871c48d5c47d0bd388f10f77914cc621f03db1da89',
+ ('SF_DQSF_EWMM_BUDGET2', 'periodic', 2): '1ccdf64829388b66674030a0157c030a1b675cef72a92b99286690e763795645',
+ ('SF_DQSF_EWMM_BUDGET2', 'prog', 0): 'a019a651d3f656ebafed24b987d5df63354c605cff222c234fb3cfb0fd943037',
+ ('SF_DQSF_EWMM_BUDGET2', 'prog', 1): 'c25355621f5a26097d0a4345a0f17d3dce53db8e228fea05d618816bb14180f0',
+ ('SF_DQSF_EWMM_BUDGET2', 'prog', 2): 'e1d8b232090711e4bf0a3d6903118e680a42381d82f2dc00bb65840d68a22d4c',
+ ('SF_DQSF_EWMM_BUDGET2', 'prog', 5): '7ab6b9818bd3130dbac1b9df237df3a91c550e0716291c0059f1c6e23870c626',
+ ('SF_DQSF_EWMM_BUDGET2', 'random', 0): '8911b0a4d369736c60986fa885ee134e04645e6705788cffe2825fae794eed30',
+ ('SF_DQSF_EWMM_BUDGET2', 'random', 1): '281a3e219919b7bdd95fc394eaecc3972b262618174ed15e0974c67d622f11fa',
+ ('SF_DQSF_EWMM_BUDGET2', 'random', 2): '8d3b9ebcc08306ede05682349a3869720959dc13120a0769be0909877fab21d1',
+ ('SF_DQSF_EWMM_BUDGET2', 'random', 5): 'e95dac53442d0ad0771e95d43c397a6d32152a2951b41965e9b8f288d32fa037',
+ ('SF_DQSF_EWMM_BUDGET2', 'regular', 2): 'c6afddf2ab4ae535028b2b61179d8b2f0cc52ad35c2d0ea5a501fe4e7073f50a',
+ ('SF_DQSF_EWMM_BUDGET2', 'sin', 2): 'f15928c61d831008bdfb676250da747d2854ee84ce8fcbf83f74e963c5f45c40',
+ ('SF_DQSF_EWMM_BUDGET2', 'verylow', 2): 'df70615d3521561613ca96df37a8eddaa174e182923eaa0f69fa8cda9c361c8f',
+ ('SF_DQSF_EWMM_BUDGET2', 'zero', 2): 'bf6ecd933ea20dc06f113c5ec32a33cd212685945d0dd36f39a79b7f68700b9b',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'bursty', 0): 'b77aad809ae0e601e42f623adf2a139a8150681c4c045b05d752d3b28eff2688',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'bursty', 1): '537073232ac818ae855ab0f0a30fb10b38bd1d409272652b060011482bac48b4',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'bursty', 2): '94a1939ec4c07fdff12d29c46938b9d8c6415bd6e22fc4405eed2358cb72571f',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'bursty', 5): 'd7e857bf3a7c8aa7317fe1b7619dc11a8be38b947c9d3ad305ef700a6f3e5a3b',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'periodic', 2): '7bf07cda7cedf161eb1495f011d747726706044ea518aa3bbb0c4588bf0b57ae',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'prog', 0): '77515d0896e037974a4a4bbe87738627d8730b1124a94d0b03eaaab61b7f463b',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'prog', 1): 'd13d88e28b6cd4b17ce0cfb7bf0021dae059ce028b0061971d9d07ca97694fb7',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'prog', 2): '66355acb391d79feafa7d68dcc98602820a9b30095a40cc6e20b455536da79ed',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'prog', 5): 'c07ad7f9c0efeb117a8f3c10da5eb9e8df220b0ede60af09c2180ed300ba0487',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'random', 0): 'c54583f1ac19f74e0ddd1babda42740623f3f680b9d81c070c024361e5b3b89f',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'random', 1): '0f2aeced9e49f0d6c3f828cf51b4cd0c708075314e02feb64506dde7d32744ca',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'random', 2): 'e9f0ad8478b2a739d7691fb418ce08277ac19034b222c5cd6903513aa777f975',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'random', 5): '7a53cedc4486019d75746c82f651e6dbd308b96d714605e3b6395b56940a2ea0',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'regular', 2): 'c391d02e8cc3ba6586392f0892313c656904cea55a42c8d665f5618aa33a7c2d',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'sin', 2): 'cfa86a12cbdd9b3a2b54ece4ce794796b80a768d9095e6c9afcbb0078e5da94e',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'verylow', 2): 'd9c428ac97fd586de4bdabdd5fdcc0d3a2569da70354ba8f92d18a68d285d408',
+ ('SF_DQSF_EWMM_BUDGET2_show_alloc', 'zero', 2): 'bf6ecd933ea20dc06f113c5ec32a33cd212685945d0dd36f39a79b7f68700b9b',
+ ('SF_DQSF_EWMM_TXQ', 'bursty', 0): '60ceaf96f6eea6e0d7f444c34fa77dfa0929f0c86e19c404f20c6753c9819998',
+ ('SF_DQSF_EWMM_TXQ', 'bursty', 1): '0e07ad48a9b1990b2666db53f60e0906ff87d90982848d4e0851371b7caee5e7',
+ ('SF_DQSF_EWMM_TXQ', 'bursty', 2): 'e810bdcdae60d48650b5d1c2740b76f387872e3c3c8ca15a54fb01bb0f334c0f',
+ ('SF_DQSF_EWMM_TXQ', 'bursty', 5): 'a4b08e98c18a74ffda6ccf6262e2288d811ee311809ef83d436d50904bfc3189',
+ ('SF_DQSF_EWMM_TXQ', 'periodic', 2): '152e35a3b05b25e8c310e3418e79d45f1527a47c887b7fb610530081c01528dd',
+ ('SF_DQSF_EWMM_TXQ', 'prog', 0): 'faec6ca6078755fc53ab7a82de919ff380beacd2417b577dbfa6f7926379945b',
+ ('SF_DQSF_EWMM_TXQ', 'prog', 1): '96083618a7a8d7f16833d8e330bfaee79f74de281ce395f96fcfa7c8d154c3a4',
+ ('SF_DQSF_EWMM_TXQ', 'prog', 2): '8e0ddbed331d2e6690c912cc93092a701ac32f56cdfc673c3e8cbf8d2478ec2f',
+ ('SF_DQSF_EWMM_TXQ', 'prog', 5): '16dca45c0ab1a0a39111c275276a906d84932795b6d593a870418c1064e4a238',
+ ('SF_DQSF_EWMM_TXQ', 'random', 0): '704881d76a22f51fb366863366392d2a85a11428f1efe14f07aded3dcd969cf7',
+ ('SF_DQSF_EWMM_TXQ', 'random', 1): '6dab0a8a141b2f0248719e1f850f866e297a79125d75941f88e98664b556dc54',
+ ('SF_DQSF_EWMM_TXQ', 'random', 2): 'a9d8e55149a4896a70345de5f95b992aa02c59706b5aab35ff207e23e42ae594',
+ ('SF_DQSF_EWMM_TXQ', 'random', 5): '1b40fe9a7d311fe79af2d27fb2d028ced38323a589581730fe0efe1442ad33eb',
+ ('SF_DQSF_EWMM_TXQ', 'regular', 2): 'a8e0d03382fd92780f916235ba300a7a9568a2781f9ac8612407445fea5bdc03',
+ ('SF_DQSF_EWMM_TXQ', 'sin', 2): '7a60b22ffb0e76aa52128d8fc7ebf40b2a38c74bcaffda354a81543b11842eeb',
+ ('SF_DQSF_EWMM_TXQ', 'verylow', 2): '83cbddf7396e4e5a35be9f7526f3c798b26ac090825361091ab255794ea318be',
+ ('SF_DQSF_EWMM_TXQ', 'zero', 2): '987220137ff6de8fa31d1c69de81fb4c764b75e7cead626306d6c7f0b210a435',
+ ('SF_DUMB', 'bursty', 0): '64d462acd987793b3b03d9a25a732dcbcdd39a888e580aef25d9173565dabe4d',
+ ('SF_DUMB', 'bursty', 1): 'f952ab6244cd9a8acdc0370efb48674ef766d2c6a40eed4b9a70a32e308d7877',
+ ('SF_DUMB', 'bursty', 2): 'f3524a518011f505e7e0756695395119a9f9f9e2626d3c85716477157b0e4ddd',
+ ('SF_DUMB', 'bursty', 5): '146cfbb6ca716b7ae1cd99952ac3c5c0dc3e7f8ed6753b241afa5c80553bf31d',
+ ('SF_DUMB', 'periodic', 2): '2c4ff991cc6b3e2f66b17842fed41843054c1ad7a1e501658154614f71b26410',
+ ('SF_DUMB', 'prog', 0): 'f9996a2366aa237088e11c095796516597cf5d9018d60e96f2d8d7b1b9198226',
+ ('SF_DUMB', 'prog', 1): '5de99da4030602ef7184bebcc29b38817e42d7fad7cb70f4b609c8515f565d61',
+ ('SF_DUMB', 'prog', 2): '8536319963bbc16db33e4c386f4927911b6ddb9fa89ccb4d2bde181d21bc5586',
+ ('SF_DUMB', 'prog', 5): '001a096d973f7e84ea47e02c2c1784ea2b29ce7e2094075e34c5633cdf42b3f9',
+ ('SF_DUMB', 'random', 0): '0f50664828b5aa67df674bfc06de356979a8167c668410c747df1472b1bf8f49',
+ ('SF_DUMB', 'random', 1): '1fedde5a94f212d7a629733a0abae4ff72e3beebca7c0cda8f27e6c839a1d91b',
+ ('SF_DUMB', 'random', 2): '1bc80a6a39cf37e55b32b04bcb3a4852bbbed3e11649beeab3a31a8d0c3a0a3c',
+ ('SF_DUMB', 'random', 5): '382040735f9bbc585a127a9e45214cb9a30b0102f23b404207d3479c47aa4eb0',
+ ('SF_DUMB', 'regular', 2): '95a5813451932eead1df460c0575de71e0a5d1e7b600edb47f7244fe78ee333b',
+ ('SF_DUMB', 'sin', 2): '03e00c8974af024b7dbf905eea764cd09aed380a52d59f2386260eb5bb7304e1',
+ ('SF_DUMB', 'verylow', 2): 'e3b60a4c0a9c4b7dc4ffae2b97e06c9007d1aba0bfcefb2da9216297dacdfd98',
+ ('SF_DUMB', 'zero', 2): '57fc5895afb910e0720be1019b3deef37322bb18b24097d7594ae6dc3e323a5b',
+ ('SF_Fixed', 'bursty', 0): '703abbee2066267b76d8c9637d70e66565521d5970ef935d009c7904fc87cd13',
+ ('SF_Fixed', 'bursty', 1): '703abbee2066267b76d8c9637d70e66565521d5970ef935d009c7904fc87cd13',
+ ('SF_Fixed', 'bursty', 2): '703abbee2066267b76d8c9637d70e66565521d5970ef935d009c7904fc87cd13',
+ ('SF_Fixed', 'bursty', 5): '703abbee2066267b76d8c9637d70e66565521d5970ef935d009c7904fc87cd13',
+ ('SF_Fixed', 'periodic', 2): 'c64cfe0370ae453a1e7453eb229c9ed9716a8d23b3abd27a15717fad5fa0cad3',
+ ('SF_Fixed', 'prog', 0): 'a0154cdbf0458a3bc2f6c91c8b460c2506b165f4c800f0377a2eac90ec3aa447',
+ ('SF_Fixed', 'prog', 1): 'a0154cdbf0458a3bc2f6c91c8b460c2506b165f4c800f0377a2eac90ec3aa447',
+ ('SF_Fixed', 'prog', 2): 'a0154cdbf0458a3bc2f6c91c8b460c2506b165f4c800f0377a2eac90ec3aa447',
+ ('SF_Fixed', 'prog', 5): 'a0154cdbf0458a3bc2f6c91c8b460c2506b165f4c800f0377a2eac90ec3aa447',
+ ('SF_Fixed', 'random', 0): '252bbda4b401fad3845fcdb49d0745458af3e9c307000f2375aff7b564f22b16',
+ ('SF_Fixed', 'random', 1): '252bbda4b401fad3845fcdb49d0745458af3e9c307000f2375aff7b564f22b16',
+ ('SF_Fixed', 'random', 2): '252bbda4b401fad3845fcdb49d0745458af3e9c307000f2375aff7b564f22b16',
+ ('SF_Fixed', 'random', 5): '252bbda4b401fad3845fcdb49d0745458af3e9c307000f2375aff7b564f22b16',
+ ('SF_Fixed', 'regular', 2): 'ee17903dfcf18b66a100d9a7d194e8bc217e57a3ac38d8ed076187bae11effaf',
+ ('SF_Fixed', 'sin', 2): 'c23831382a78cf390cef36bbd6682ddb47c0fc58251d8088de65e30f9802c115',
+ ('SF_Fixed', 'verylow', 2): '2d2d2f9c63900bfbb96a0ec0225bf9096a3a07d0f66834426a1ee41c047a79aa',
+ ('SF_Fixed', 'zero', 2): '9f5a8da9307b5c334d39bb89ec38d278ee622560ca16312803471bf6e40ccdc9',
+ ('SF_MSF_Legacy', 'bursty', 0): 'c6bb5762a69549e1ef60a4b3d38ab942c90590e1fee471513aaf35a0e04f5c94',
+ ('SF_MSF_Legacy', 'bursty', 1): '382766abde1ecefe97b9e41f4831f73ca432205e1a64ab498e418b23d97897e1',
+ ('SF_MSF_Legacy', 'bursty', 2): '74225a9115def4e4c185876f3ce511456a7ccce4bc8d7aa2f140f9a3376ccf4d',
+ ('SF_MSF_Legacy', 'bursty', 5): '9c9e786e4119d2efe72e133c689cebf01f6122518d1c2069e9f51017dbb86a32',
+ ('SF_MSF_Legacy', 'periodic', 2): '0663a6bb726f767cf8241ec4b5d608e4708a0df93ac7ff5e20dc052c7a791599',
+ ('SF_MSF_Legacy', 'prog', 0): '71b69084c94b77dbbc23d77ef498a63f9f5b037c84ad411fbfb65fc409ab3f56',
+ ('SF_MSF_Legacy', 'prog', 1): '8a64beb909200018884739acca60b1a6d24a85870e7af6dc63b3cc07fa57d62d',
+ ('SF_MSF_Legacy', 'prog', 2): 'cf9ac775e03682615d7079d6f14e6faf1f3e4ec0fc276d2d6b20561b8b1c23a0',
+ ('SF_MSF_Legacy', 'prog', 5): 'd4c2bfe98e4de226ff360b8779c825fe6fa5bc650897c2fc1861b6aeadc88d80',
+ ('SF_MSF_Legacy', 'random', 0): 'cecba960db2edd81dccf09d5f8e211e7834ccf37506efc3e3711df0965e3e17a',
+ ('SF_MSF_Legacy', 'random', 1): 'a558d0d8135552e3fc8cf938c84062db78b1b74888052b3fcd4558896957481d',
+ ('SF_MSF_Legacy', 'random', 2): '2ff7fe0a562518c00855af894bd24ee45f43d982a2818eb72b5d2f9822598a29',
+ ('SF_MSF_Legacy', 'random', 5): '59887d18c85e37f4f927bc630680e164b809eebe5e4f9dc4332ddfd1b3ab3cee',
+ ('SF_MSF_Legacy', 'regular', 2): '3caf20573a3c636bb9b28c73a202fa62a2df22144cd393e2b80d71a939891a0f',
+ ('SF_MSF_Legacy', 'sin', 2): '950317f0355df7e236b89b9c355acb301163d26f785d41bff12cb257cb70f405',
+ ('SF_MSF_Legacy', 'verylow', 2): '4fd11f2abbea9007945c42ecce9092951d98a1748849d5cc5e29fa1647997777',
+ ('SF_MSF_Legacy', 'zero', 2): 'f41bb2008c21a8d44e0274aa59317479eaef56d25bf826bd15fe1c69895176d3'}
@@ -0,0 +1,50 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import pprint
+import sys
+
+# Digests of the output of the simulator as it was before the optimizations,
+# which the tests compare each execution path against:
+#   git worktree add /tmp/baseline 29c8c73
+#   python tests/make_golden.py /tmp/baseline/src > tests/golden.py
+
+if __name__ == "__main__":
+  if len(sys.argv) != 2:
+    sys.exit("usage: %s baseline_src" % sys.argv[0])
+  sys.path.insert(0, os.path.abspath(sys.argv[1]))
+  import sim
+  import cases
+
+  golden = {}
+  for sf, pattern, delay in cases.cases():
+    text = cases.output(lambda *args: sim.Simulation(*args, sim.PrintPlot), sf, pattern, delay)
+    golden[(sf, pattern, delay)] = cases.digest(text)
+
+  print("# Generated by make_golden.py, do not edit.")
+  print("GOLDEN = \\")
+  pprint.pprint(golden, width=120)
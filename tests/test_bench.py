@@ -0,0 +1,81 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import bench
+import json
+import os
+import pytest
+import subprocess
+import sys
+
+BENCH = os.path.abspath(bench.__file__)
+
+def result(sf, pattern, sframes_per_second, peak_bytes=None):
+  return { "sf": sf, "pattern": pattern, "print": "PrintNull",
+           "seconds": 1. / sframes_per_second, "sframes_per_second": sframes_per_second,
+           "peak_bytes": peak_bytes }
+
+"""
+Exit code of bench.py compare between two runs of results.
+"""
+def compare(tmp_path, old, new, *args):
+  paths = []
+  for name, results in (("old.json", old), ("new.json", new)):
+    path = tmp_path / name
+    path.write_text(json.dumps({ "meta": {}, "results": results }))
+    paths.append(str(path))
+  return subprocess.run([ sys.executable, BENCH, "compare" ] + paths + list(args),
+                        stdout=subprocess.PIPE, universal_newlines=True)
+
+OLD = [ result("SF_Fixed", "regular", 1000., 5000), result("SF_DQSF_EWMA", "random", 500., 8000) ]
+
+@pytest.mark.parametrize("new,regressions", [
+  (OLD, 0),
+  ([ result("SF_Fixed", "regular", 950., 5000), result("SF_DQSF_EWMA", "random", 600., 8000) ], 0),
+  ([ result("SF_Fixed", "regular", 800., 5000), result("SF_DQSF_EWMA", "random", 500., 8000) ], 1),
+  ([ result("SF_Fixed", "regular", 1000., 5000), result("SF_DQSF_EWMA", "random", 500., 9000) ], 1),
+  ([ result("SF_Fixed", "regular", 10., 5000), result("SF_DQSF_EWMA", "random", 10., 9000) ], 2),
+  # cases missing from the old run are not compared
+  ([ result("SF_MSF_Legacy", "random", 10.) ], 0) ])
+def test_compare(tmp_path, new, regressions):
+  done = compare(tmp_path, OLD, new)
+  assert done.returncode == (1 if regressions else 0)
+  assert done.stdout.splitlines()[-1].startswith("# %d regression(s)" % regressions)
+
+def test_compare_threshold(tmp_path):
+  new = [ result("SF_Fixed", "regular", 800., 5000) ]
+  assert compare(tmp_path, OLD, new).returncode == 1
+  assert compare(tmp_path, OLD, new, "--threshold", "0.25").returncode == 0
+
+def test_compare_runs(tmp_path):
+  # the JSON written by a real run is read back by compare
+  out = tmp_path / "run.json"
+  subprocess.run([ sys.executable, BENCH, "--max-iter", "3700", "--repeat", "1", "--sf", "SF_Fixed",
+                   "--pattern", "regular", "--print", "PrintNull", "-o", str(out) ],
+                 check=True, stderr=subprocess.DEVNULL)
+  done = subprocess.run([ sys.executable, BENCH, "compare", str(out), str(out) ],
+                        stdout=subprocess.PIPE, universal_newlines=True)
+  assert done.returncode == 0
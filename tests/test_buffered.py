@@ -0,0 +1,119 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import sys
+import threading
+import pytest
+import sim
+
+import cases
+from golden import GOLDEN
+
+CASES = sorted(GOLDEN)
+
+def make(print_method):
+  return lambda max_iter, delay, pattern, schedfun: \
+    sim.Simulation(max_iter, delay, pattern, schedfun, print_method)
+
+def reference(sf, pattern, delay):
+  return cases.output(make(sim.PrintPlot), sf, pattern, delay)
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+@pytest.mark.parametrize("threaded", [ False, True ])
+def test_buffered_plot(sf, pattern, delay, threaded):
+  stdout = sys.stdout
+  text   = cases.output(make(sim.BufferedPlot(chunk=100, threaded=threaded, queue_size=2)),
+                        sf, pattern, delay)
+  assert sys.stdout is stdout
+  assert cases.digest(text) == GOLDEN[(sf, pattern, delay)]
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES[::7])
+def test_buffered_human(sf, pattern, delay):
+  text = cases.output(make(sim.BufferedHuman(chunk=100)), sf, pattern, delay)
+  assert text == cases.output(make(sim.PrintHuman), sf, pattern, delay)
+
+class Failing(sim.SchedulingFunction):
+  def __init__(self, schedfun, at):
+    self.schedfun = schedfun
+    self.at       = at
+
+  def apply(self, iter_idx, *args):
+    if iter_idx == self.at:
+      raise RuntimeError("failing at %d" % iter_idx)
+    return self.schedfun.apply(iter_idx, *args)
+
+  def schema(self):
+    return self.schedfun.schema()
+
+@pytest.mark.parametrize("threaded", [ False, True ])
+def test_exception(threaded):
+  expected = reference("SF_DQSF_EWMA", "random", 2).splitlines(True)[:1001]
+  out      = io.StringIO()
+  stdout   = sys.stdout
+  with pytest.raises(RuntimeError):
+    with sim.BufferedPlot(out, chunk=64, threaded=threaded) as method:
+      schedfun = Failing(cases.schedfuns()["SF_DQSF_EWMA"](), 1000)
+      for _ in sim.Simulation(cases.MAX_ITER, 2, cases.PATTERNS["random"](), schedfun, method):
+        pass
+  assert sys.stdout is stdout
+  # the header and the rows before the failure
+  assert out.getvalue() == "".join(expected)
+  assert method.writer is None
+
+def test_threads():
+  keys    = [ ("SF_DQSF_EWMA", "random", 2), ("SF_DQSF_EWMM_BUDGET2", "prog", 2),
+              ("SF_MSF_Legacy", "bursty", 5), ("SF_DQSF_1SF", "sin", 2),
+              ("SF_DQSF_EWMM_BUDGET2_show_alloc", "bursty", 2) ] * 2
+  outs    = [ io.StringIO() for _ in keys ]
+  stdout  = sys.stdout
+  def simulate(key, out, threaded):
+    sf, pattern, delay = key
+    method = sim.BufferedPlot(out, chunk=50, threaded=threaded)
+    with method:
+      for _ in sim.Simulation(cases.MAX_ITER, delay, cases.PATTERNS[pattern](),
+                              cases.schedfuns()[sf](), method):
+        pass
+  threads = [ threading.Thread(target=simulate, args=(key, out, i % 2 == 1))
+              for i, (key, out) in enumerate(zip(keys, outs)) ]
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+  assert sys.stdout is stdout
+  for key, out in zip(keys, outs):
+    assert cases.digest(out.getvalue()) == GOLDEN[key]
+
+# the SF prints into the print method until the end, and to sys.stdout again after
+def test_show_alloc_out():
+  out      = io.StringIO()
+  schedfun = cases.schedfuns()["SF_DQSF_EWMM_BUDGET2_show_alloc"]()
+  text     = cases.output(lambda max_iter, delay, pattern, _:
+                            sim.Simulation(max_iter, delay, pattern, schedfun, sim.BufferedPlot(out)),
+                          "SF_DQSF_EWMM_BUDGET2_show_alloc", "bursty", 2)
+  assert text == ""
+  assert cases.digest(out.getvalue()) == GOLDEN[("SF_DQSF_EWMM_BUDGET2_show_alloc", "bursty", 2)]
+  assert schedfun.out is None
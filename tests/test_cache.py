@@ -0,0 +1,140 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import inspect
+import math
+import numpy as np
+import os
+import pytest
+import sim
+import cache
+import replay
+import traffic
+import SF_DQSF_EWMA
+
+def entry(i):
+  simulation = sim.Simulation(10, 2, [ i % 7 ], SF_DQSF_EWMA.SchedulingFunction(0.1, 1), sim.PrintNull)
+  simulation.run()
+  return simulation
+
+def used(path):
+  return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+             if name.endswith(".json"))
+
+def test_get_put(tmp_path):
+  c = cache.Cache(str(tmp_path))
+  assert c.get("k") is None
+  stored = c.put("k", entry(1))
+  assert c.get("k").totals() == stored.totals() == entry(1).totals()
+  assert (c.hits, c.misses) == (1, 1)
+
+def test_evict(tmp_path, monkeypatch):
+  scans = []
+  scandir = os.scandir
+  monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or scandir(path))
+  simulation = entry(1)
+  c = cache.Cache(str(tmp_path))
+  c.put("size", simulation)
+  c.max_bytes = 20 * used(tmp_path)
+  c.clear()
+  del scans[:]
+  for i in range(100):
+    c.put("%03d" % i, simulation)
+    assert used(tmp_path) <= c.max_bytes
+  # listed when the size crosses max_bytes, not on each put
+  assert 0 < len(scans) < 20
+  assert c.size == used(tmp_path)
+  # least recently used first
+  assert c.get("099") is not None and c.get("000") is None
+
+def test_evicted_while_read(tmp_path, monkeypatch):
+  c = cache.Cache(str(tmp_path))
+  c.put("k", entry(1))
+  def utime(path):
+    os.remove(path)
+    raise FileNotFoundError(path)
+  monkeypatch.setattr(os, "utime", utime)
+  assert c.get("k") is None
+  assert (c.hits, c.misses) == (0, 1)
+
+def test_without_traffic(tmp_path):
+  c = cache.Cache(str(tmp_path))
+  for _ in range(2):
+    report  = c.report(SF_DQSF_EWMA.SchedulingFunction(0.1, 1), [ 0 ], 2, 4000)
+    summary = sim.Summary(None, report)
+    assert math.isnan(summary.pct_sixp) and math.isnan(summary.pct_drop)
+    summaries = c.sweep(SF_DQSF_EWMA.SchedulingFunction, [ (0.1, 1), (0.2, 1) ], [ 0 ], 2, 4000)
+    assert all(math.isnan(s.pct_drop) for s in summaries)
+  assert (c.hits, c.misses) == (3, 3)
+
+"""
+Key of a simulation of an EWMA SF on a traffic pattern.
+"""
+def key_of(c, traffic_pattern):
+  return c.key(SF_DQSF_EWMA.SchedulingFunction(0.1, 1), traffic_pattern, 2, 4000)
+
+"""
+Append a comment to a source file, with a modification time that changes
+whatever the resolution of the file system.
+"""
+def edit(path):
+  stat = os.stat(path)
+  with open(path, "a") as f:
+    f.write("# edited\n")
+  os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+def test_key_follows_source_module(tmp_path, monkeypatch):
+  module = tmp_path / "modules" / "tracesource.py"
+  module.parent.mkdir()
+  module.write_text("import traffic\n\nclass Trace(traffic.Pattern):\n  pass\n")
+  monkeypatch.syspath_prepend(str(module.parent))
+  import tracesource
+  c        = cache.Cache(str(tmp_path / "cache"))
+  patterns = [ tracesource.Trace([ 1, 0, 2 ]), traffic.Constant(2) + tracesource.Trace([ 1, 0, 2 ]),
+               traffic.concat((traffic.Constant(2), 3), (tracesource.Trace([ 1, 0 ]), None)) ]
+  others   = [ [ 1, 0, 2 ], traffic.Pattern([ 1, 0, 2 ]) ]
+  before = [ key_of(c, p) for p in patterns + others ]
+  edit(str(module))
+  after  = [ key_of(c, p) for p in patterns + others ]
+  assert all(a != b for a, b in zip(before[:len(patterns)], after))
+  assert before[len(patterns):] == after[len(patterns):]
+
+def test_key_follows_traffic(tmp_path, monkeypatch):
+  # traffic.py as read from a copy that can be edited
+  copy = tmp_path / "traffic.py"
+  copy.write_bytes(open(inspect.getsourcefile(traffic), "rb").read())
+  getsourcefile = inspect.getsourcefile
+  monkeypatch.setattr(inspect, "getsourcefile",
+                      lambda obj: str(copy) if getattr(obj, "__module__", None) == "traffic" else getsourcefile(obj))
+  c      = cache.Cache(str(tmp_path / "cache"))
+  trace  = replay.NodeTrace(np.array([ 1, 0, 0, 2 ], dtype=np.uint8))
+  before = [ key_of(c, p) for p in (traffic.Constant(2), trace, [ 2 ]) ]
+  edit(str(copy))
+  after  = [ key_of(c, p) for p in (traffic.Constant(2), trace, [ 2 ]) ]
+  assert before[0] != after[0] and before[1] != after[1]
+  assert before[2] == after[2]
+  # a replay.NodeTrace also depends on replay.py
+  assert cache._source_digest(replay.NodeTrace) in cache.pattern_code_digest(trace)
@@ -0,0 +1,86 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import bisect
+import functools
+import io
+
+import pytest
+import downsample
+import sim
+
+import cases
+from golden import GOLDEN
+
+CASES   = sorted(GOLDEN)[::10]
+BUCKETS = [ 1, 7, 100 ]
+
+def make(print_method):
+  return lambda max_iter, delay, pattern, schedfun: \
+    sim.Simulation(max_iter, delay, pattern, schedfun, print_method)
+
+@functools.lru_cache(maxsize=None)
+def full(sf, pattern, delay):
+  return cases.output(make(sim.PrintPlot), sf, pattern, delay)
+
+@functools.lru_cache(maxsize=None)
+def small(sf, pattern, delay, mode, bucket):
+  return cases.output(make(downsample.Downsample(bucket, mode)), sf, pattern, delay)
+
+"""
+Column of each row of a text in the layout of PrintPlot, by iteration.
+"""
+def column(text, name):
+  schema = None
+  iters, values = [], []
+  for line in text.splitlines():
+    fields = line.split()
+    if fields[:2] == [ "#", "iter" ]:
+      schema = fields[1:]
+    elif schema is not None and not line.startswith("#") and len(fields) == len(schema):
+      iters.append(int(fields[schema.index("iter")]))
+      values.append(fields[schema.index(name)])
+  return iters, values
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+@pytest.mark.parametrize("mode", downsample.MODES)
+@pytest.mark.parametrize("bucket", BUCKETS)
+def test_cells_steps(sf, pattern, delay, mode, bucket):
+  iters, cells  = column(full(sf, pattern, delay), "cells")
+  kept, at_kept = column(small(sf, pattern, delay, mode, bucket), "cells")
+  assert kept == sorted(kept)
+  assert kept[0] == iters[0]
+  for i, c in zip(iters, cells):
+    # value of the step function at i: that of the last row written up to i
+    assert at_kept[bisect.bisect_right(kept, i) - 1] == c
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+@pytest.mark.parametrize("mode", downsample.MODES)
+@pytest.mark.parametrize("bucket", BUCKETS)
+def test_downsample_file(sf, pattern, delay, mode, bucket):
+  out = io.StringIO()
+  downsample.downsample_file(io.StringIO(full(sf, pattern, delay)), out, bucket, mode)
+  assert out.getvalue() == small(sf, pattern, delay, mode, bucket)
@@ -0,0 +1,48 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import pytest
+import sim
+import fixed
+import SF_Fixed
+
+import cases
+
+@pytest.mark.parametrize("pattern", sorted(cases.PATTERNS))
+def test_fixed_cells(pattern):
+  ns = [ 7, 0, 3, 1, 12 ]
+  f  = fixed.FixedCells(ns, cases.MAX_ITER, cases.PATTERNS[pattern]())
+  for n, result in zip(ns, f.results()):
+    simulation = sim.Simulation(cases.MAX_ITER, 2, cases.PATTERNS[pattern](),
+                                SF_Fixed.SchedulingFunction(n), sim.PrintNull)
+    simulation.run()
+    assert result.totals() == simulation.totals()
+    assert [ w.totals() for w in result.windows ] == [ w.totals() for w in simulation.windows ]
+
+def test_fewest_cells_without_drop():
+  pattern = [ 5, 0, 0 ]
+  assert fixed.fewest_cells_without_drop(fixed.FixedCells([ 9, 2, 4, 0 ], 4000, pattern)) == 2
+  assert fixed.fewest_cells_without_drop(fixed.FixedCells([ 0, 1 ], 4000, pattern)) is None
@@ -0,0 +1,67 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import math
+import random
+import time
+import pytest
+import markov
+import sim
+import SF_DQSF_1SF
+import SF_Fixed
+
+def test_too_many_states():
+  start = time.perf_counter()
+  with pytest.raises(ValueError, match="sixp_delay=2: more than"):
+    markov.solve(SF_DQSF_1SF.SchedulingFunction(0.1, 1), markov.randint(0, 6), 2)
+  assert time.perf_counter() - start < 10
+  with pytest.raises(ValueError, match="more than 50 states"):
+    markov.solve(SF_DQSF_1SF.SchedulingFunction(0.1, 1), markov.randint(0, 6), 0, max_states=50)
+
+def test_without_traffic():
+  stationary = markov.solve(SF_DQSF_1SF.SchedulingFunction(0.1, 1), { 0: 1. }, 2)
+  assert math.isnan(stationary.pct_drop) and math.isnan(stationary.pct_sixp)
+
+# The stationary behavior is the limit of a long simulation on i.i.d. traffic.
+# Over SFRAMES slotframes, the totals of a simulation are within about 0.07
+# points of the percentages and 0.015 of the mean cells of the chain (seeds 1
+# to 3), the tolerances leave a margin of 3 to 4 times that.
+SFRAMES   = 200000
+PCT_TOL   = 0.25
+CELLS_TOL = 0.05
+
+@pytest.mark.parametrize("make,delay", [
+  (lambda: SF_DQSF_1SF.SchedulingFunction(0.1, 1), 0),
+  (lambda: SF_DQSF_1SF.SchedulingFunction(0.1, 1), 1),
+  (lambda: SF_Fixed.SchedulingFunction(3), 2) ])
+def test_long_simulation(make, delay):
+  stationary = markov.solve(make(), markov.randint(0, 6), delay)
+  rng        = random.Random(1)
+  pattern    = [ rng.randint(0, 6) for _ in range(SFRAMES) ]
+  summary    = sim.Simulation(SFRAMES - 1, delay, pattern, make(), sim.PrintNull).run()
+  assert stationary.pct_drop == pytest.approx(summary.pct_drop, abs=PCT_TOL)
+  assert stationary.pct_sixp == pytest.approx(summary.pct_sixp, abs=PCT_TOL)
+  assert stationary.cells == pytest.approx(summary.total_cells / SFRAMES, abs=CELLS_TOL)
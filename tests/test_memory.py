@@ -0,0 +1,88 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import contextlib
+import inspect
+import io
+import memory
+import pytest
+import sim
+import tracemalloc
+
+import cases
+
+def iterate(simulation):
+  for _ in simulation:
+    pass
+
+def run(simulation):
+  simulation.run()
+
+"""
+Allocates a block of SIZE bytes at each SFrame, and lets them all go once it
+holds KEEP of them: the heap hardly grows over the run.
+"""
+class Allocating(sim.SchedulingFunction):
+  SIZE = 1000
+  KEEP = 500
+
+  def __init__(self):
+    self.kept = []
+
+  def apply(self, iter_idx, sframe, traffic, drop, txq, old_txq):
+    if len(self.kept) == self.KEEP:
+      self.kept = []
+    self.kept.append(bytes(self.SIZE))
+    return { "decision": 0 }
+
+  def state(self):
+    return ()
+
+# the line of Allocating.apply that allocates
+ALLOCATES = "%s:%d" % (__name__, inspect.getsourcelines(Allocating.apply)[1] + 3)
+
+@pytest.mark.parametrize("drive", [ iterate, run ])
+def test_allocated_per_sframe(drive):
+  tracker = memory.MemoryTracker(every=50, report=False)
+  drive(sim.Simulation(cases.MAX_ITER, 2, [ 1 ], Allocating(), sim.PrintNull, memory=tracker))
+  lines = { where: (count, size) for where, count, size in tracker.lines }
+  count, size = lines[ALLOCATES]
+  # all but those of the intervals between two samples where the blocks are freed
+  assert 0.85 <= count <= 1
+  assert 0.85 * Allocating.SIZE <= size <= 1.1 * Allocating.SIZE
+  assert tracker.modules[__name__][1] >= size * cases.MAX_ITER
+  assert tracker.steady() < 2 * Allocating.KEEP * Allocating.SIZE
+
+# the report of PrintPlot.end fails without traffic
+@pytest.mark.parametrize("drive", [ iterate, run ])
+def test_end_raises(drive):
+  tracker    = memory.MemoryTracker(report=False)
+  simulation = sim.Simulation(cases.MAX_ITER, 2, [ 0 ], cases.schedfuns()["SF_DQSF_EWMA"](),
+                              sim.PrintPlot, memory=tracker)
+  with contextlib.redirect_stdout(io.StringIO()), pytest.raises(ZeroDivisionError):
+    drive(simulation)
+  assert not tracemalloc.is_tracing()
+  assert tracker.iterations == cases.MAX_ITER + 1
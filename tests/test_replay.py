@@ -0,0 +1,65 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import math
+import pickle
+import numpy as np
+import pytest
+import replay
+import traffic
+
+# value and next change the slow way, reading the range as it repeats
+def brute_run(series, i):
+  period = len(series)
+  value  = series[i % period]
+  for j in range(i + 1, i + 1 + period):
+    if series[j % period] != value:
+      return value, j
+  return value, math.inf
+
+SERIES = [ [ 3 ], [ 1, 1, 1 ], [ 1, 2 ], [ 0, 0, 5, 5, 5, 0 ], [ 4, 0, 0, 1, 4, 4 ],
+           np.random.default_rng(1).integers(0, 3, 500) // 2 ]
+
+@pytest.mark.parametrize("series", SERIES, ids=str)
+def test_run(series):
+  trace = replay.NodeTrace(np.asarray(series, dtype=np.uint8))
+  for i in range(3 * len(series)):
+    assert trace.run(i) == brute_run(list(series), i)
+
+def test_run_long(monkeypatch):
+  # changes found across several chunks
+  monkeypatch.setattr(traffic, "CHUNK", 7)
+  series = np.repeat(np.array([ 2, 0, 1, 0, 2 ], dtype=np.uint16), [ 10, 3, 1, 20, 5 ])
+  trace  = replay.NodeTrace(series)
+  assert list(trace.changes()) == [ 10, 13, 14, 34 ]
+  for i in range(2 * len(series)):
+    assert trace.run(i) == brute_run(series.tolist(), i)
+
+def test_changes_not_pickled():
+  trace = replay.NodeTrace(np.array([ 1, 2 ], dtype=np.uint8))
+  trace.run(0)
+  assert "_changes" not in vars(pickle.loads(pickle.dumps(trace)))
+  assert trace.digest() == replay.NodeTrace(np.array([ 1, 2 ], dtype=np.uint8)).digest()
@@ -0,0 +1,67 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import cases
+import math
+import pytest
+import search
+import SF_Fixed
+
+"""
+A Problem over a plain function of the parameter set, without simulations.
+"""
+class FunctionProblem(search.Problem):
+  def __init__(self, function):
+    search.Problem.__init__(self, None, None, None, None)
+    self.function = function
+
+  def evaluate(self, grid):
+    grid = [ tuple(params) for params in grid ]
+    for params in grid:
+      if params not in self.values:
+        self.values[params] = value = self.function(*params)
+        self.history.append((params, value, None))
+    return [ self.values[params] for params in grid ]
+
+@pytest.mark.parametrize("x0", [ 0.1, 2.345, 7.7, 9.99 ])
+def test_golden(x0):
+  problem = FunctionProblem(lambda x: (x - x0) ** 2 + 1)
+  params, value, _ = search.golden(problem, lambda x: (x,), search.Dimension(0, 10), tol=1e-6)
+  assert params[0] == pytest.approx(x0, abs=1e-4)
+  assert value == pytest.approx(1)
+  assert len(problem.history) <= 64
+
+def test_golden_log():
+  problem = FunctionProblem(lambda x: abs(math.log(x) - math.log(0.003)))
+  params, _, _ = search.golden(problem, lambda x: (x,), search.Dimension(1e-4, 1, log=True), tol=1e-6)
+  assert params[0] == pytest.approx(0.003, rel=1e-3)
+
+# 3 packets per SFrame: 3 fixed cells neither drop nor leave cells unused
+def test_golden_fixed():
+  problem = search.Problem(SF_Fixed.SchedulingFunction, [ 3 ], 0, cases.MAX_ITER, threads=True)
+  params, _, summary = search.golden(problem, lambda n: (n,), search.Dimension(1, 20, integer=True))
+  assert params == (3,)
+  assert summary.total_drop == 0
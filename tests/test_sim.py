@@ -0,0 +1,248 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import contextlib
+import functools
+import io
+import math
+import phases
+import pytest
+import sim
+import time
+import SF_Fixed
+
+import cases
+from golden import GOLDEN
+
+# Every way of running a simulation must give what the simulator gave before
+# the optimizations: PrintPlot rows, what the SF prints itself (show_alloc) and
+# the final report with the default window (After t=3600).
+
+CASES = sorted(GOLDEN)
+
+def make(print_method, **kwargs):
+  return lambda max_iter, delay, pattern, schedfun: \
+    sim.Simulation(max_iter, delay, pattern, schedfun, print_method, **kwargs)
+
+def iterate(simulation):
+  for _ in simulation:
+    pass
+
+"""
+Text of the final report of PrintPlot for a finished simulation.
+"""
+def report(simulation):
+  out = io.StringIO()
+  with contextlib.redirect_stdout(out):
+    try:
+      sim.PrintPlot.end(simulation)
+    except ZeroDivisionError:
+      print("ZeroDivisionError")
+  return out.getvalue()
+
+"""
+Output of the plain iteration with PrintPlot, checked against the golden one.
+"""
+@functools.lru_cache(maxsize=None)
+def reference(sf, pattern, delay):
+  text = cases.output(make(sim.PrintPlot), sf, pattern, delay)
+  assert cases.digest(text) == GOLDEN[(sf, pattern, delay)]
+  return text
+
+"""
+Final report of a simulation with PrintNull, run by drive.
+"""
+def report_of(sf, pattern, delay, drive, **kwargs):
+  result = []
+  def run(simulation):
+    drive(simulation)
+    result.append(report(simulation))
+  cases.output(make(sim.PrintNull, **kwargs), sf, pattern, delay, run)
+  return result[0] if result else "ZeroDivisionError\n"
+
+def assert_same_report(sf, pattern, delay, drive, **kwargs):
+  text = report_of(sf, pattern, delay, drive, **kwargs)
+  assert reference(sf, pattern, delay).endswith(text)
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+def test_iteration(sf, pattern, delay):
+  reference(sf, pattern, delay)
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+def test_fast_forward(sf, pattern, delay):
+  assert_same_report(sf, pattern, delay, iterate, fast_forward=True)
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+def test_fast_forward_run(sf, pattern, delay):
+  assert_same_report(sf, pattern, delay, lambda s: s.run(), fast_forward=True)
+
+# the comparisons above are only worth something if cycles are skipped
+@pytest.mark.parametrize("sf", [ "SF_Fixed", "SF_DQSF_1SF", "SF_DQSF_EWMA", "SF_MSF_Legacy" ])
+def test_fast_forward_skips(sf):
+  simulation = sim.Simulation(cases.MAX_ITER, 2, [ 6, 0 ], cases.schedfuns()[sf](),
+                              sim.PrintNull, fast_forward=True)
+  assert sum(1 for _ in simulation) < cases.MAX_ITER
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+def test_skip_idle(sf, pattern, delay):
+  assert_same_report(sf, pattern, delay, iterate, skip_idle=True)
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+def test_skip_idle_fast_forward(sf, pattern, delay):
+  assert_same_report(sf, pattern, delay, lambda s: s.run(), skip_idle=True, fast_forward=True)
+
+@pytest.mark.parametrize("sf", [ "SF_Fixed", "SF_DQSF_EWMA", "SF_DQSF_EWMM", "SF_MSF_Legacy" ])
+def test_skip_idle_skips(sf):
+  simulation = sim.Simulation(cases.MAX_ITER, 2, [ 1 ] + [ 0 ] * 120, cases.schedfuns()[sf](),
+                              sim.PrintNull, skip_idle=True)
+  assert sum(1 for _ in simulation) < cases.MAX_ITER
+
+# run() skips in its compiled loop, it does not fall back to the iteration
+@pytest.mark.parametrize("sf", [ "SF_Fixed", "SF_DQSF_EWMA", "SF_DQSF_EWMM_TXQ", "SF_MSF_Legacy" ])
+@pytest.mark.parametrize("pattern", [ [ 1 ] + [ 0 ] * 120, [ 5, 5, 5, 5 ] + [ 0 ] * 120, [ 6, 0, 0 ] ])
+def test_skip_idle_run(sf, pattern, monkeypatch):
+  def make(**kwargs):
+    return sim.Simulation(cases.MAX_ITER, 2, pattern, cases.schedfuns()[sf](), sim.PrintNull, **kwargs)
+  expected = make()
+  expected.run()
+  def fail(self):
+    raise AssertionError("run() iterated")
+  monkeypatch.setattr(sim.Simulation, "__next__", fail)
+  simulation = make(skip_idle=True)
+  simulation.run()
+  assert simulation.totals() == expected.totals()
+
+def test_idle_spans():
+  runs  = sim.zero_runs([ 0, 0, 1, 0, 0, 0, 0, 1, 0 ])
+  spans = sim.idle_spans(runs, 3)
+  assert spans == ([ 3, 8 ], [ 5, 9 ])
+  assert sim.next_idle_span(spans, 9, 0) == (3, 5)
+  assert sim.next_idle_span(spans, 9, 4) == (3, 5)
+  assert sim.next_idle_span(spans, 9, 5) == (8, 9)
+  assert sim.next_idle_span(spans, 9, 9) == (12, 14)
+
+def run(simulation):
+  simulation.run()
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+def test_run(sf, pattern, delay):
+  text = cases.output(make(sim.PrintPlot), sf, pattern, delay, run)
+  assert cases.digest(text) == GOLDEN[(sf, pattern, delay)]
+
+# with PrintNull, run() inlines the apply() of the EWMA/EWMM SFs (INLINE)
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+def test_run_inline(sf, pattern, delay):
+  assert_same_report(sf, pattern, delay, run)
+
+@pytest.mark.parametrize("sf", [ "SF_DQSF_EWMA", "SF_DQSF_EWMM", "SF_DQSF_EWMM_TXQ", "SF_DQSF_EWMM_BUDGET2" ])
+def test_inline_is_used(sf):
+  assert cases.schedfuns()[sf]().inline() is not None
+
+"""
+Rows of a PrintPlot output, as numbers.
+"""
+def rows(text):
+  lines  = text.splitlines()
+  schema = lines[0].split()[1:]
+  return [ [ float(v) for v in line.split() ] for line in lines[1:]
+           if not line.startswith("#") and len(line.split()) == len(schema) ]
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+@pytest.mark.parametrize("drive", [ iterate, run ])
+def test_record_columns(sf, pattern, delay, drive):
+  recorder = sim.RecordColumns(cases.MAX_ITER)
+  cases.output(make(recorder), sf, pattern, delay, drive)
+  columns  = recorder.columns()
+  recorded = [ list(map(float, row)) for row in zip(*(columns[k] for k in recorder.schema)) ]
+  assert recorded == rows(reference(sf, pattern, delay))
+
+# the timed iterations are the same as the others, with the clock read in between
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+def test_timing(sf, pattern, delay):
+  timer = phases.PhaseTimer(report=False)
+  text  = cases.output(make(sim.PrintPlot, timing=timer), sf, pattern, delay)
+  assert cases.digest(text) == GOLDEN[(sf, pattern, delay)]
+  assert timer.iterations == cases.MAX_ITER + 1
+  assert timer.calls[phases.CHECKS] == timer.iterations + 1
+  assert timer.calls[phases.PRINT] == timer.iterations
+  # the report of PrintPlot.end fails without traffic, as it always did
+  assert timer.calls[phases.END] == (0 if text.endswith("ZeroDivisionError\n") else 1)
+
+# Without a timing, __next__ reads no clock and does not check for a timer.
+# It is at least as fast as the timed iterations with a timer that does
+# nothing, which cost what a check before each phase did.
+def test_untimed_next():
+  assert "timing" not in sim.Simulation.__next__.__code__.co_names
+
+  class NullTimer(phases.PhaseTimer):
+    def begin(self):
+      pass
+    def lap(self, phase):
+      pass
+
+  def best(timing):
+    seconds = math.inf
+    for _ in range(5):
+      simulation = sim.Simulation(20000, 2, cases.PATTERNS["random"](), cases.schedfuns()["SF_DQSF_EWMA"](),
+                                  sim.PrintNull, timing=timing)
+      start = time.perf_counter()
+      iterate(simulation)
+      seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+  assert best(None) <= best(NullTimer(report=False))
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES[:8])
+def test_timing_record_columns(sf, pattern, delay):
+  timer    = phases.PhaseTimer(report=False)
+  recorder = sim.RecordColumns(cases.MAX_ITER)
+  cases.output(make(recorder, timing=timer), sf, pattern, delay, run)
+  columns  = recorder.columns()
+  recorded = [ list(map(float, row)) for row in zip(*(columns[k] for k in recorder.schema)) ]
+  assert recorded == rows(reference(sf, pattern, delay))
+  assert timer.calls[phases.RESULTS] == timer.calls[phases.PRINT] == cases.MAX_ITER + 1
+
+@pytest.mark.parametrize("sf", sorted(cases.schedfuns()))
+@pytest.mark.parametrize("options", [ {}, { "fast_forward": True }, { "skip_idle": True } ])
+def test_summary_without_traffic(sf, options):
+  simulation = sim.Simulation(cases.MAX_ITER, 2, [ 0 ], cases.schedfuns()[sf](), sim.PrintNull, **options)
+  summary    = simulation.run()
+  assert summary.total_traffic == 0
+  assert math.isnan(summary.pct_sixp) and math.isnan(summary.pct_drop)
+  if summary.total_cells == 0:
+    assert math.isnan(summary.pct_unused_cells) and math.isnan(summary.pct_used_cells)
+
+# With 3 packets per SFrame and 1 cell, the TxQ is full from early on and each
+# packet of room in a bigger TxQ is one drop less.
+@pytest.mark.parametrize("drive", [ iterate, run ])
+@pytest.mark.parametrize("max_txq", [ 1, 5, 20 ])
+def test_config_max_txq(drive, max_txq):
+  def drops(config):
+    simulation = sim.Simulation(cases.MAX_ITER, 2, [ 3 ], SF_Fixed.SchedulingFunction(1),
+                                sim.PrintNull, config=config)
+    drive(simulation)
+    assert simulation.txq <= (sim.MAX_TXQ if config is None else config.max_txq)
+    return simulation.total_drop
+  assert drops(sim.Config(max_txq=max_txq)) == drops(None) + sim.MAX_TXQ - max_txq
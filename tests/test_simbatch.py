@@ -0,0 +1,73 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import pytest
+import sim
+import simbatch
+
+import cases
+
+# parameter sets of each SF, one lane each
+PARAMS = {
+  "SF_Fixed"            : [ (4,), (1,), (9,) ],
+  "SF_DQSF_1SF"         : [ (0.1, 1), (0.3, 0) ],
+  "SF_DQSF_EWMA"        : [ (0.1, 1), (0.3, 0) ],
+  "SF_DQSF_EWMM"        : [ (0.1, 0.01, 1), (0.3, 0.05, 2) ],
+  "SF_DQSF_EWMM_TXQ"    : [ (0.1, 0.01, 1), (0.3, 0.05, 2) ],
+  "SF_DQSF_EWMM_BUDGET2": [ (0.1, 0.01, 1, 7), (0.3, 0.05, 0, 5) ],
+  "SF_MSF_Legacy"       : [ (0.25, 0.75, 100), (0.1, 0.9, 20) ] }
+
+def module(sf):
+  return __import__(sf)
+
+# the patterns and delays of cases.cases
+CASES = sorted({ (sf, pattern, delay) for sf, pattern, delay in cases.cases() if sf in PARAMS })
+
+@pytest.mark.parametrize("sf,pattern,delay", CASES)
+def test_batch(sf, pattern, delay):
+  params     = PARAMS[sf]
+  schedfun   = module(sf).BatchSchedulingFunction(*zip(*params))
+  simulation = simbatch.Simulation(cases.MAX_ITER, delay, cases.PATTERNS[pattern](), schedfun)
+  for _ in simulation:
+    pass
+  for p, result in zip(params, simulation.results()):
+    expected = sim.Simulation(cases.MAX_ITER, delay, cases.PATTERNS[pattern](),
+                              module(sf).SchedulingFunction(*p), sim.PrintNull)
+    expected.run()
+    assert result.totals() == expected.totals()
+    assert [ w.totals() for w in result.windows ] == [ w.totals() for w in expected.windows ]
+
+# the fallback for the SFs without an array implementation
+@pytest.mark.parametrize("pattern", [ "random", "bursty" ])
+def test_each(pattern):
+  make       = cases.schedfuns()["SF_DUMB"]
+  simulation = simbatch.Simulation(cases.MAX_ITER, 2, cases.PATTERNS[pattern](),
+                                   simbatch.Each([ make(), make() ]))
+  for _ in simulation:
+    pass
+  expected = sim.Simulation(cases.MAX_ITER, 2, cases.PATTERNS[pattern](), make(), sim.PrintNull)
+  expected.run()
+  assert [ r.totals() for r in simulation.results() ] == [ expected.totals() ] * 2
@@ -0,0 +1,73 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import math
+import pytest
+import sim
+import SF_DQSF_EWMA
+import SF_MSF_Legacy
+
+import cases
+
+def same(a, b):
+  return { k: v for k, v in vars(a).items() if not (isinstance(v, float) and math.isnan(v)) } == \
+         { k: v for k, v in vars(b).items() if not (isinstance(v, float) and math.isnan(v)) }
+
+def serial(sf_factory, grid, pattern, delay, window=None, config=None):
+  summaries = []
+  for params in grid:
+    schedfun   = sf_factory(**params) if isinstance(params, dict) else sf_factory(*params)
+    windows    = None if window is None else [ window ]
+    simulation = sim.Simulation(cases.MAX_ITER, delay, pattern, schedfun, sim.PrintNull, windows,
+                                config=config)
+    for _ in simulation:
+      pass
+    summaries.append(sim.Summary(params, simulation if window is None else simulation.windows[0]))
+  return summaries
+
+GRIDS = [
+  (SF_DQSF_EWMA.SchedulingFunction, [ (0.05 + 0.05 * i, 1) for i in range(6) ]),
+  (SF_MSF_Legacy.SchedulingFunction, [ { "low": 0.25, "high": 0.75, "max_numcells": n } for n in (10, 100) ]) ]
+
+@pytest.mark.parametrize("sf_factory,grid", GRIDS)
+@pytest.mark.parametrize("pattern", [ "random", "bursty", "zero" ])
+@pytest.mark.parametrize("threads", [ False, True ])
+def test_sweep(sf_factory, grid, pattern, threads):
+  expected  = serial(sf_factory, grid, cases.PATTERNS[pattern](), 2)
+  summaries = sim.sweep(sf_factory, grid, cases.PATTERNS[pattern](), 2, cases.MAX_ITER,
+                        max_workers=2, threads=threads)
+  assert [ s.params for s in summaries ] == grid
+  assert all(same(a, b) for a, b in zip(summaries, expected))
+
+@pytest.mark.parametrize("threads", [ False, True ])
+def test_sweep_window(threads):
+  window    = sim.Window(1000, 2000)
+  config    = sim.Config(max_txq=5)
+  sf_factory, grid = GRIDS[0]
+  expected  = serial(sf_factory, grid, cases.PATTERNS["random"](), 1, window, config)
+  summaries = sim.sweep(sf_factory, grid, cases.PATTERNS["random"](), 1, cases.MAX_ITER, window,
+                        max_workers=2, config=config, threads=threads)
+  assert all(same(a, b) for a, b in zip(summaries, expected))
@@ -0,0 +1,103 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import pytest
+import sim
+import table
+import SF_DQSF_1SF
+import SF_DQSF_EWMA
+import SF_Fixed
+import SF_MSF_Legacy
+
+import cases
+
+SCHEDFUNS = {
+  "SF_Fixed"     : lambda: SF_Fixed.SchedulingFunction(4),
+  "SF_DQSF_1SF"  : lambda: SF_DQSF_1SF.SchedulingFunction(0.1, 1),
+  "SF_MSF_Legacy": lambda: SF_MSF_Legacy.SchedulingFunction(0.25, 0.75, 100) }
+
+WINDOWS = lambda: [ sim.Window(0, 1000), sim.Window(1500), sim.Window(3601, name="After t=3600") ]
+
+"""
+The SF with the floats of its state rounded to multiples of quantum after each
+iteration, as TableEngine does with a quantum.
+"""
+class Quantized(sim.SchedulingFunction):
+  def __init__(self, schedfun, quantum):
+    self.schedfun = schedfun
+    self.quantum  = quantum
+    self.__quantize()
+
+  def __quantize(self):
+    q = self.quantum
+    self.schedfun.set_state(tuple(round(v / q) * q if isinstance(v, float) else v
+                                  for v in self.schedfun.state()))
+
+  def apply(self, iter_idx, sframe, traffic, drop, txq, old_txq):
+    res = self.schedfun.apply(iter_idx, sframe, traffic, drop, txq, old_txq)
+    self.__quantize()
+    return res
+
+  def state(self):
+    return self.schedfun.state()
+
+def assert_same(engine, schedfun, pattern, delay):
+  report     = engine.run(pattern, cases.MAX_ITER, WINDOWS())
+  simulation = sim.Simulation(cases.MAX_ITER, delay, pattern, schedfun, sim.PrintNull, WINDOWS())
+  simulation.run()
+  assert report.totals() == simulation.totals()
+  assert [ w.totals() for w in report.windows ] == [ w.totals() for w in simulation.windows ]
+
+# a quantum only changes the floats of the states: none for SF_Fixed and
+# SF_DQSF_1SF, the used cells of SF_MSF_Legacy once it takes its share off
+@pytest.mark.parametrize("sf", sorted(SCHEDFUNS))
+@pytest.mark.parametrize("pattern", [ "regular", "random", "bursty", "sin", "prog" ])
+@pytest.mark.parametrize("delay", [ 0, 2 ])
+@pytest.mark.parametrize("quantum", [ None, 3 ])
+def test_engine(sf, pattern, delay, quantum):
+  def reference():
+    schedfun = SCHEDFUNS[sf]()
+    return schedfun if quantum is None else Quantized(schedfun, quantum)
+  engine = table.TableEngine(SCHEDFUNS[sf](), delay, quantum=quantum)
+  assert_same(engine, reference(), cases.PATTERNS[pattern](), delay)
+  # a second run only looks its transitions up
+  states = len(engine)
+  assert_same(engine, reference(), cases.PATTERNS[pattern](), delay)
+  assert len(engine) == states
+
+@pytest.mark.parametrize("pattern", [ "random", "sin" ])
+@pytest.mark.parametrize("quantum", [ 0.05, 2 ])
+def test_engine_floats(pattern, quantum):
+  make   = lambda: SF_DQSF_EWMA.SchedulingFunction(0.1, 1)
+  engine = table.TableEngine(make(), 2, quantum=quantum)
+  assert_same(engine, Quantized(make(), quantum), cases.PATTERNS[pattern](), 2)
+
+def test_too_many_states():
+  with pytest.raises(ValueError, match="more than 50 states, raise max_states or give a quantum"):
+    table.TableEngine(SF_DQSF_EWMA.SchedulingFunction(0.1, 1), 2, max_states=50).run(cases.PATTERNS["random"](), 1000)
+  with pytest.raises(ValueError, match=r"more than 50 states, raise max_states or coarsen the quantum \(0.001\)"):
+    table.TableEngine(SF_DQSF_EWMA.SchedulingFunction(0.1, 1), 2, quantum=0.001,
+                      max_states=50).run(cases.PATTERNS["random"](), 1000)
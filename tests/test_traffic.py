@@ -0,0 +1,160 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import itertools
+import math
+import numpy as np
+import pickle
+import pytest
+import traffic
+
+SOURCES = [ traffic.Uniform(0, 6, seed=1), traffic.Poisson(1.5, seed=2),
+            traffic.Poisson(1.5, seed=2) + traffic.Burst(20, every=120) ]
+
+def fresh(source):
+  return pickle.loads(pickle.dumps(source))
+
+@pytest.mark.parametrize("source", SOURCES, ids=repr)
+def test_getitem(source):
+  # across a chunk boundary, forwards then back
+  at     = list(range(traffic.CHUNK - 3, traffic.CHUNK + 3)) + [ 5, traffic.CHUNK + 1, 2 * traffic.CHUNK ]
+  values = [ source[i] for i in at ]
+  assert values == [ int(fresh(source).block(i, i + 1)[0]) for i in at ]
+  assert all(type(v) is int for v in values)
+
+@pytest.mark.parametrize("source", SOURCES, ids=repr)
+def test_block(source):
+  expected = fresh(source).block(10, 3 * traffic.CHUNK)
+  source[traffic.CHUNK + 7]
+  assert (source.block(10, 3 * traffic.CHUNK) == expected).all()
+  assert (source.block(traffic.CHUNK, traffic.CHUNK + 5) == expected[traffic.CHUNK - 10:traffic.CHUNK - 5]).all()
+
+def test_chunk_is_kept():
+  source = traffic.Poisson(1.5, seed=3)
+  drawn  = []
+  generate = source.generate
+  source.generate = lambda rng: drawn.append(1) or generate(rng)
+  for i in range(1000):
+    source[i]
+  assert len(drawn) == 1
+  with pytest.raises(ValueError):
+    source.block(0, 10)[0] = 1
+
+def test_cache_is_not_state():
+  source = traffic.Uniform(0, 6, seed=4)
+  digest = source.digest()
+  source[0]
+  assert source.digest() == digest
+  assert "_last" not in vars(fresh(source))
+
+# value and next change the slow way, reading the pattern as it repeats
+def brute_run(values, i):
+  period = len(values)
+  value  = values[i % period]
+  for j in range(i + 1, i + 1 + period):
+    if values[j % period] != value:
+      return value, j
+  return value, math.inf
+
+RUNS = [ [ (3, 1) ], [ (1, 3) ], [ (1, 1), (2, 1) ], [ (0, 2), (5, 3), (0, 1) ],
+         [ (4, 1), (0, 2), (1, 1), (4, 2) ], [ (2, 10), (0, 3), (0, 2), (1, 1), (0, 20), (2, 5) ],
+         [ (0, 4), (7, 0), (0, 3), (6, 2) ] ]
+
+@pytest.mark.parametrize("runs", RUNS, ids=str)
+def test_run_length(runs):
+  pattern = traffic.RunLength(runs)
+  values  = [ value for value, length in runs for _ in range(length) ]
+  assert len(pattern) == len(values)
+  for i in range(3 * len(values)):
+    assert pattern[i] == values[i % len(values)]
+    assert pattern.run(i) == brute_run(values, i)
+  assert list(pattern.block(5, 5 + 2 * len(values))) == [ values[i % len(values)] for i in range(5, 5 + 2 * len(values)) ]
+
+def test_run_length_encode():
+  values = [ 0, 0, 5, 5, 5, 0, 1 ]
+  assert traffic.RunLength.encode(values).runs == [ (0, 2), (5, 3), (0, 1), (1, 1) ]
+
+"""
+Check the values of a source against values(t), the slotframe t of the same
+pattern expanded as a list: by block, item by item and in sequence.
+"""
+def assert_values(source, values, n=300):
+  expected = [ values(t) for t in range(n) ]
+  assert source.block(0, n).tolist() == expected
+  assert source.block(37, 250).tolist() == expected[37:250]
+  assert [ source[t] for t in range(n) ] == expected
+  assert list(itertools.islice(source.values(11), n - 11)) == expected[11:]
+  if source.period is not None:
+    assert all(expected[t] == expected[t % source.period] for t in range(n))
+
+@pytest.mark.parametrize("start,stop,duration", [ (2, 8, 6), (8, 2, 25), (0, 5, 7), (1, 2.5, 0), (3, 3, 10) ])
+def test_ramp(start, stop, duration):
+  def value(t):
+    if duration == 0:
+      return round(stop)
+    return round(start + (stop - start) * min(t, duration) / duration)
+  assert_values(traffic.Ramp(start, stop, duration), value)
+
+def test_ramp_negative_duration():
+  with pytest.raises(ValueError):
+    traffic.Ramp(2, 8, -1)
+
+@pytest.mark.parametrize("period", [ 60, np.int64(60), 7, 60.5 ])
+@pytest.mark.parametrize("phase", [ 0, 5 ])
+def test_sinusoid(period, phase):
+  source = traffic.Sinusoid(4.2, 2.5, period, phase)
+  if isinstance(period, float):
+    assert source.period is None
+    value = lambda t: max(int(4.2 + 2.5 * math.cos((t + phase) * 2 * math.pi / period)), 0)
+  else:
+    assert source.period == period and type(source.period) is int
+    value = lambda t: max(int(4.2 + 2.5 * math.cos(((t + phase) % period) * 2 * math.pi / period)), 0)
+  assert_values(source, value)
+
+def test_sinusoid_not_negative():
+  assert_values(traffic.Sinusoid(1.3, 4.1, 20), lambda t: max(int(1.3 + 4.1 * math.cos(t * 2 * math.pi / 20)), 0))
+
+def test_on_off():
+  assert_values(traffic.OnOff(3, 2, 5, 1), lambda t: [ 5, 5, 5, 1, 1 ][t % 5])
+  assert_values(traffic.Burst(20, every=6, duration=2), lambda t: [ 20, 20, 0, 0, 0, 0 ][t % 6])
+  assert_values(traffic.Burst(7, every=120), lambda t: 7 if t % 120 == 0 else 0)
+
+def test_concat():
+  first = [ 2, 2, 2, 1, 0, 1, 0 ]
+  assert_values(traffic.concat((traffic.Constant(2), 3), (traffic.Pattern([ 1, 0 ]), 4)),
+                lambda t: first[t % 7])
+  # each part from its own start, the last one forever
+  assert_values(traffic.concat((traffic.Pattern([ 1, 0 ]), 3), (traffic.Ramp(0, 10, 100), None)),
+                lambda t: [ 1, 0, 1 ][t] if t < 3 else round(10 * min(t - 3, 100) / 100))
+
+def test_superpose():
+  pattern = [ 1, 2, 3 ]
+  source  = traffic.OnOff(3, 2, 5, 1) + traffic.Pattern(pattern)
+  assert source.period == 15
+  assert_values(source, lambda t: [ 5, 5, 5, 1, 1 ][t % 5] + pattern[t % 3])
+  source = traffic.superpose(traffic.Constant(1), traffic.Ramp(0, 4, 8), 2 * traffic.Pattern(pattern))
+  assert source.period is None
+  assert_values(source, lambda t: 1 + round(4 * min(t, 8) / 8) + 2 * pattern[t % 3])
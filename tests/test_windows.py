@@ -0,0 +1,75 @@
+# BSD 2-Clause License
+#
+# Copyright (c) 2021-2022, David Hauweele <david@hauweele.net>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import pytest
+import sim
+
+import cases
+
+WINDOWS = lambda: [ sim.Window(0, 100), sim.Window(1000, 2000), sim.Window(1500, 1501),
+                    sim.Window(3999), sim.Window(5000) ] + sim.Window.every(700, cases.MAX_ITER + 1)
+
+"""
+Totals of each window, in the order of sim.TOTALS, from the rows of every iteration.
+"""
+def expected(columns, windows):
+  last   = len(columns["iter"])
+  totals = []
+  for w in windows:
+    start = min(w.start, last)
+    stop  = last if w.stop is None else min(w.stop, last)
+    sixp  = lambda i: columns["totsixp"][i - 1] if i > 0 else 0
+    span  = range(start, stop)
+    totals.append([ sixp(stop) - sixp(start) ] +
+                  [ sum(columns[k][i] for i in span) for k in ("drop", "traffic", "cells", "cells_unused", "cells_used") ])
+  return totals
+
+@pytest.mark.parametrize("sf", [ "SF_DQSF_EWMA", "SF_DQSF_EWMM_BUDGET2", "SF_MSF_Legacy", "SF_DQSF_1SF" ])
+@pytest.mark.parametrize("pattern", [ "random", "bursty", "prog" ])
+@pytest.mark.parametrize("options", [ {}, { "fast_forward": True }, { "skip_idle": True } ])
+def test_windows(sf, pattern, options):
+  recorder = sim.RecordColumns(cases.MAX_ITER)
+  rows     = sim.Simulation(cases.MAX_ITER, 2, cases.PATTERNS[pattern](), cases.schedfuns()[sf](), recorder)
+  for _ in rows:
+    pass
+  columns  = recorder.columns()
+  assert len(columns["iter"]) == cases.MAX_ITER + 1
+
+  for drive in ("iterate", "run"):
+    simulation = sim.Simulation(cases.MAX_ITER, 2, cases.PATTERNS[pattern](), cases.schedfuns()[sf](),
+                                sim.PrintNull, WINDOWS(), **options)
+    if drive == "run":
+      simulation.run()
+    else:
+      for _ in simulation:
+        pass
+    assert [ w.totals() for w in simulation.windows ] == expected(columns, WINDOWS())
+
+def test_every():
+  windows = sim.Window.every(3600, 10000, start=100)
+  assert [ (w.start, w.stop) for w in windows ] == [ (100, 3700), (3700, 7300), (7300, 10000) ]
+  assert windows[0].name == "From t=100 to t=3700"
+  assert sim.default_windows()[0].name == "After t=3600"